@@ -4,19 +4,59 @@ Aquí se definen los ViewSets de la API para clientes y cotizaciones.
 
 Endpoints expuestos (registrados en `urls_api.py`):
  - /api/clientes/      -> ClienteViewSet (lista, crear, actualizar, eliminar)
+ - /api/clientes/autocompletar/ -> ClienteViewSet.autocompletar (búsqueda por prefijo)
  - /api/cotizaciones/  -> QuotationViewSet (usa el modelo Quotation de quotations app)
+ - /api/cotizaciones/lote/ -> QuotationViewSet.crear_lote (POST, creación en lote)
+ - /api/cotizaciones/cambiar-estado/ -> QuotationViewSet.cambiar_estado (POST, cambio masivo)
+ - /api/cotizaciones/<id>/revisiones/ -> QuotationViewSet.revisiones (historial de ediciones)
+ - /api/analitica/mensual/ -> ResumenMensualViewSet (totales mensuales, solo lectura)
+ - /api/analitica/embudo/  -> EmbudoViewSet (conversión y tiempo en cada estado)
+ - /api/diagnostico/conexiones/ -> ConexionesViewSet (pool y conexiones del worker, solo staff)
+ - /api/diagnostico/tiempos/ -> TiemposViewSet (histogramas de tiempos por etapa del worker, solo staff)
 
 Cada ViewSet usa SearchFilter para permitir búsquedas simples por nombre,
-correo o descripción.
+correo o descripción. Las lecturas (list, retrieve, analítica) van a las
+réplicas configuradas (ver quotation_project/replicas.py).
+
+Los GET JSON de /api/clientes/ y /api/cotizaciones/ los atienden vistas
+asíncronas (`lista_asincrona`) que usan el ORM asíncrono; el resto de cada
+ruta sigue en el ViewSet (ver quotation_project/asincronia.py).
 """
 
-from rest_framework import viewsets, filters
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from django.db.models import Sum
+from django.views.decorators.csrf import csrf_exempt
+from quotation_project.conexiones import estadisticas_conexiones
+from quotation_project.replicas import LecturaEnReplicaMixin, en_replica
+from quotation_project.tiempos import estadisticas_tiempos
 from .models import Cliente
-from quotations.models import Quotation
-from .serializers import ClienteSerializer, QuotationSerializer
+from quotations.models import Quotation, ResumenMensual, RevisionCotizacion
+from quotations.business_logic.bulk_quotations import crear_cotizaciones_en_lote
+from quotations.business_logic.clientes import LIMITE_POR_DEFECTO, buscar_clientes
+from quotations.business_logic.eliminacion import eliminar_cliente, eliminar_cotizaciones
+from quotations.business_logic.embudo import obtener_embudo
+from quotations.business_logic.estados import cambiar_estados
+from quotations.business_logic.revisiones import reconstruir_version
+from quotations.utils.respuesta_calculo import RespuestaJSON
+from .serializers import (
+    ClienteSerializer,
+    QuotationSerializer,
+    QuotationEntradaSerializer,
+    CambioEstadoSerializer,
+)
 
+# Máximo de cotizaciones aceptadas en una sola llamada a /api/cotizaciones/lote/
+MAX_COTIZACIONES_POR_LOTE = 1000
 
-class ClienteViewSet(viewsets.ModelViewSet):
+
+class ClienteViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     """API para gestionar clientes.
 
     Provee las operaciones CRUD sobre `interfaz_crud.models.Cliente` y utiliza
@@ -26,14 +66,266 @@ class ClienteViewSet(viewsets.ModelViewSet):
     serializer_class = ClienteSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['nombre', 'correo']
+    acciones_en_replica = ('list', 'retrieve', 'autocompletar')
+
+    def perform_destroy(self, instance):
+        # Borrado lógico (ver quotations/business_logic/eliminacion.py)
+        eliminar_cliente(instance.pk)
 
+    @action(detail=False, methods=['get'])
+    def autocompletar(self, request):
+        """Clientes cuyo nombre o correo empieza por `q`, los más activos primero.
 
-class QuotationViewSet(viewsets.ModelViewSet):
+        Parámetros GET: q (prefijo) y limite (10 por defecto, máximo 50).
+        """
+        try:
+            limite = int(request.query_params.get('limite', LIMITE_POR_DEFECTO))
+        except ValueError:
+            return Response({'error': 'limite debe ser un número entero'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(buscar_clientes(request.query_params.get('q', ''), limite))
+
+
+class QuotationViewSet(LecturaEnReplicaMixin, viewsets.ModelViewSet):
     """API para gestionar cotizaciones.
 
     Provee las operaciones CRUD sobre `quotations.models.Quotation`.
     """
-    queryset = Quotation.objects.all().order_by('-fecha_creacion')
+    # El serializer lee cliente.nombre: sin select_related sería una consulta por fila
+    queryset = Quotation.objects.select_related('cliente').order_by('-fecha_creacion')
     serializer_class = QuotationSerializer
     filter_backends = [filters.SearchFilter]
-    search_fields = ['cliente__nombre']
\ No newline at end of file
+    search_fields = ['cliente__nombre']
+    acciones_en_replica = ('list', 'retrieve', 'revisiones')
+
+    def perform_destroy(self, instance):
+        # Borrado lógico (ver quotations/business_logic/eliminacion.py)
+        eliminar_cotizaciones([instance.pk])
+
+    @action(detail=False, methods=['post'], url_path='lote')
+    def crear_lote(self, request):
+        """Calcula y guarda muchas cotizaciones en una sola transacción.
+
+        Recibe una lista JSON de entradas (ver `QuotationEntradaSerializer`).
+        La cabecera opcional `Idempotency-Key` identifica el lote: al
+        reintentarlo, las entradas ya guardadas se devuelven con
+        `creada: false` en lugar de duplicarse.
+        """
+        if not isinstance(request.data, list):
+            return Response({'error': 'Se esperaba una lista de cotizaciones'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > MAX_COTIZACIONES_POR_LOTE:
+            return Response({'error': f'Máximo {MAX_COTIZACIONES_POR_LOTE} cotizaciones por lote'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = QuotationEntradaSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        resultado = crear_cotizaciones_en_lote(
+            serializer.validated_data,
+            clave_lote=request.headers.get('Idempotency-Key')
+        )
+        if not resultado['success']:
+            codigo = (status.HTTP_409_CONFLICT if resultado['error_type'] == 'conflict'
+                      else status.HTTP_400_BAD_REQUEST)
+            return Response({'errores': resultado['errores']}, status=codigo)
+
+        creadas = any(c['creada'] for c in resultado['cotizaciones'])
+        return Response(resultado['cotizaciones'],
+                        status=status.HTTP_201_CREATED if creadas else status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='cambiar-estado')
+    def cambiar_estado(self, request):
+        """Cambia el estado de varias cotizaciones con un único UPDATE.
+
+        Cuerpo: {"ids": [...], "estado": "enviada"} (estado opcional; sin él
+        cada cotización avanza en el ciclo pendiente → enviada → aprobada).
+        Devuelve el resultado de cada id.
+        """
+        serializer = CambioEstadoSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filas = cambiar_estados(serializer.validated_data['ids'],
+                                serializer.validated_data.get('estado'))
+        return Response(filas)
+
+    @action(detail=True, methods=['get'])
+    def revisiones(self, request, pk=None):
+        """Historial de ediciones de la cotización.
+
+        Sin parámetros lista las revisiones (número, fecha y campos que
+        cambiaron). Con ?version=N devuelve los valores completos de esa versión.
+        """
+        version = request.query_params.get('version')
+        if version is not None:
+            try:
+                datos = reconstruir_version(int(pk), int(version))
+            except ValueError:
+                return Response({'detail': 'version debe ser un número entero'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            except RevisionCotizacion.DoesNotExist as e:
+                return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'numero': int(version), 'datos': datos})
+
+        filas = (RevisionCotizacion.objects.filter(cotizacion_id=pk)
+                 .order_by('numero').values('numero', 'fecha', 'es_completa', 'datos'))
+        return Response([
+            {
+                'numero': f['numero'],
+                'fecha': f['fecha'],
+                'completa': f['es_completa'],
+                'campos': None if f['es_completa'] else sorted(f['datos']),
+            }
+            for f in filas
+        ])
+
+
+class ResumenMensualViewSet(LecturaEnReplicaMixin, viewsets.ViewSet):
+    """Analítica mensual de cotizaciones leída solo de `resumen_mensual`.
+
+    Parámetros GET opcionales:
+      - desde, hasta: mes en formato YYYY-MM (inclusive)
+      - estado: pendiente | enviada | aprobada
+      - cliente: id del cliente
+      - agrupar: estado (por defecto) | cliente | total
+    """
+
+    AGRUPACIONES = {
+        'estado': ['mes', 'estado'],
+        'cliente': ['mes', 'cliente_id', 'cliente__nombre'],
+        'total': ['mes'],
+    }
+
+    def list(self, request):
+        params = request.query_params
+        agrupar = params.get('agrupar', 'estado')
+        if agrupar not in self.AGRUPACIONES:
+            return Response({'error': f"agrupar debe ser uno de {', '.join(self.AGRUPACIONES)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        filas = ResumenMensual.objects.all()
+        try:
+            if params.get('desde'):
+                filas = filas.filter(mes__gte=datetime.strptime(params['desde'], '%Y-%m').date())
+            if params.get('hasta'):
+                filas = filas.filter(mes__lte=datetime.strptime(params['hasta'], '%Y-%m').date())
+            if params.get('cliente'):
+                filas = filas.filter(cliente_id=int(params['cliente']))
+        except (ValueError, TypeError):
+            return Response({'error': 'Parámetros inválidos: use YYYY-MM para fechas y un id numérico de cliente'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if params.get('estado'):
+            filas = filas.filter(estado=params['estado'])
+
+        campos = self.AGRUPACIONES[agrupar]
+        filas = (filas.values(*campos)
+                 .annotate(cantidad=Sum('cantidad_cotizaciones'),
+                           costo_total=Sum('suma_costo_total'),
+                           precio_utilidad_28=Sum('suma_precio_utilidad_28'))
+                 .filter(cantidad__gt=0)
+                 .order_by(*campos))
+
+        datos = []
+        for fila in filas:
+            fila['mes'] = fila['mes'].strftime('%Y-%m')
+            if 'cliente__nombre' in fila:
+                fila['nombre_cliente'] = fila.pop('cliente__nombre')
+                fila['cliente'] = fila.pop('cliente_id')
+            fila['costo_total'] = round(fila['costo_total'] or 0, 2)
+            fila['precio_utilidad_28'] = round(fila['precio_utilidad_28'] or 0, 2)
+            datos.append(fila)
+        return Response(datos)
+
+
+class EmbudoViewSet(LecturaEnReplicaMixin, viewsets.ViewSet):
+    """Embudo pendiente → enviada → aprobada de las cotizaciones creadas en un rango.
+
+    Parámetros GET opcionales: desde, hasta (YYYY-MM-DD). Por defecto, los
+    últimos 90 días. Devuelve tasas de conversión y percentiles (p50, p90,
+    p95) de horas en cada estado; el cálculo se cachea por día.
+    """
+
+    def list(self, request):
+        params = request.query_params
+        try:
+            desde = datetime.strptime(params['desde'], '%Y-%m-%d').date() if params.get('desde') else None
+            hasta = datetime.strptime(params['hasta'], '%Y-%m-%d').date() if params.get('hasta') else None
+        except ValueError:
+            return Response({'error': 'Use el formato YYYY-MM-DD para desde y hasta'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if desde and hasta and desde > hasta:
+            return Response({'error': 'desde no puede ser posterior a hasta'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(obtener_embudo(desde, hasta))
+
+
+class ConexionesViewSet(viewsets.ViewSet):
+    """Métricas de conexiones a la base de datos del worker que atiende la petición.
+
+    Cada proceso tiene su propio pool: para ver todos, consultar varias veces
+    o desde cada worker (el campo `pid` los distingue). Solo para staff:
+    expone detalles internos del despliegue.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(estadisticas_conexiones())
+
+
+class TiemposViewSet(viewsets.ViewSet):
+    """Histogramas de tiempos por etapa del worker que atiende la petición.
+
+    Vacío si TIEMPOS_ETAPAS está desactivado (ver quotation_project/tiempos.py).
+    Solo para staff, como ConexionesViewSet.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response(estadisticas_tiempos())
+
+
+def lista_asincrona(clase_viewset, basename):
+    """Vista asíncrona para los GET JSON de la lista de `clase_viewset`.
+
+    Autentica y filtra (?search=) como el ViewSet, lee con el ORM asíncrono
+    (en réplica si 'list' está en `acciones_en_replica`) y serializa con su
+    serializer. Las escrituras, el navegador de la API (Accept: text/html),
+    ?format=, las listas paginadas y los errores de permisos pasan al
+    ViewSet de DRF, que es síncrono.
+    """
+    vista_drf = sync_to_async(clase_viewset.as_view(
+        {'get': 'list', 'post': 'create'}, basename=basename, detail=False,
+    ))
+
+    # La protección CSRF de las escrituras la aplica DRF
+    @csrf_exempt
+    async def vista(request):
+        if (request.method != 'GET' or 'format' in request.GET
+                or 'text/html' in request.headers.get('Accept', '')):
+            return await vista_drf(request)
+
+        viewset = clase_viewset(basename=basename, detail=False, action_map={'get': 'list'})
+        viewset.args, viewset.kwargs, viewset.headers = (), {}, {}
+        viewset.request = viewset.initialize_request(request)
+        try:
+            # Autenticación y permisos pueden consultar la sesión
+            await sync_to_async(viewset.initial)(viewset.request)
+        except APIException:
+            return await vista_drf(request)
+        if viewset.paginator is not None:
+            return await vista_drf(request)
+
+        consulta = viewset.filter_queryset(viewset.get_queryset())
+        if 'list' in clase_viewset.acciones_en_replica:
+            with en_replica():
+                objetos = [objeto async for objeto in consulta]
+        else:
+            objetos = [objeto async for objeto in consulta]
+        return RespuestaJSON(viewset.get_serializer(objetos, many=True).data)
+
+    return vista
+
+
+lista_clientes = lista_asincrona(ClienteViewSet, 'cliente')
+lista_cotizaciones = lista_asincrona(QuotationViewSet, 'quotation')
@@ -13,3 +13,15 @@ class ClienteForm(forms.ModelForm):
             'direccion': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Dirección (calle, número, ciudad)'}),
             'descripcion': forms.Textarea(attrs={'class': 'form-control', 'placeholder': 'Descripción adicional...', 'rows': 3}), # Añadimos widget para 'descripcion'
         }
+
+    def clean_correo(self):
+        # La unicidad del correo es condicional (solo entre clientes no
+        # eliminados) y la validación de restricciones del modelo la omite
+        # porque `fecha_eliminacion` no es parte del formulario.
+        correo = self.cleaned_data['correo']
+        existentes = Cliente.objects.filter(correo=correo)
+        if self.instance.pk:
+            existentes = existentes.exclude(pk=self.instance.pk)
+        if existentes.exists():
+            raise forms.ValidationError('Ya existe un cliente con este correo.')
+        return correo
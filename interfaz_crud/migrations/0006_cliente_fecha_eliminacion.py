@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0005_cliente_descripcion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='fecha_eliminacion',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Momento en que se eliminó el cliente (vacío si está activo)', null=True, verbose_name='Fecha de eliminación'),
+        ),
+        migrations.AlterField(
+            model_name='cliente',
+            name='correo',
+            field=models.EmailField(help_text='Correo electrónico del cliente (debe ser único entre los clientes activos)', max_length=254),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('fecha_eliminacion__isnull', False)), fields=['fecha_eliminacion'], name='cliente_eliminados_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='cliente',
+            constraint=models.UniqueConstraint(condition=models.Q(('fecha_eliminacion__isnull', True)), fields=('correo',), name='cliente_correo_unico', violation_error_message='Ya existe un cliente con este correo.'),
+        ),
+    ]
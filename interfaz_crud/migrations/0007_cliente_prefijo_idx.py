@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Índices para buscar clientes por prefijo sin distinguir mayúsculas
+# (quotations/business_logic/clientes.py). `istartswith` genera
+# UPPER(col::text) LIKE 'ABC%'; text_pattern_ops permite resolver ese LIKE con
+# el índice sea cual sea la collation de la base. Son parciales: solo clientes
+# activos, igual que el manager por defecto.
+INDICES = (
+    'CREATE INDEX IF NOT EXISTS "cliente_nombre_prefijo_idx" ON "interfaz_crud_cliente" '
+    '(UPPER("nombre") text_pattern_ops) WHERE "fecha_eliminacion" IS NULL',
+    'CREATE INDEX IF NOT EXISTS "cliente_correo_prefijo_idx" ON "interfaz_crud_cliente" '
+    '(UPPER("correo") text_pattern_ops) WHERE "fecha_eliminacion" IS NULL',
+)
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sentencia in INDICES:
+            schema_editor.execute(sentencia)
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS "cliente_nombre_prefijo_idx"')
+        schema_editor.execute('DROP INDEX IF EXISTS "cliente_correo_prefijo_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0006_cliente_fecha_eliminacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -1,17 +1,27 @@
 from django.db import models
 
 
+class ClientesActivosManager(models.Manager):
+    """Manager por defecto: excluye los clientes eliminados (borrado lógico)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(fecha_eliminacion__isnull=True)
+
+
 class Cliente(models.Model):
     """
     Modelo para la tabla de clientes.
+
+    Eliminar un cliente solo marca `fecha_eliminacion` (ver
+    quotations/business_logic/eliminacion.py); `objects` no devuelve los
+    eliminados y `todos` incluye todas las filas.
     """
     nombre = models.CharField(
         max_length=255,
         help_text="Nombre completo del cliente"
     )
     correo = models.EmailField(
-        unique=True,
-        help_text="Correo electrónico del cliente (debe ser único)"
+        help_text="Correo electrónico del cliente (debe ser único entre los clientes activos)"
     )
     telefono = models.CharField(
         "Teléfono",
@@ -38,12 +48,36 @@ class Cliente(models.Model):
         auto_now_add=True,
         help_text="Fecha y hora en que se registró el cliente"
     )
+    fecha_eliminacion = models.DateTimeField(
+        "Fecha de eliminación",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Momento en que se eliminó el cliente (vacío si está activo)"
+    )
+
+    objects = ClientesActivosManager()
+    todos = models.Manager()
 
     class Meta:
         app_label = 'interfaz_crud'
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
         ordering = ['-fecha_registro']
+        constraints = [
+            # Un correo eliminado puede volver a registrarse
+            models.UniqueConstraint(
+                fields=['correo'],
+                condition=models.Q(fecha_eliminacion__isnull=True),
+                name='cliente_correo_unico',
+                violation_error_message='Ya existe un cliente con este correo.',
+            ),
+        ]
+        indexes = [
+            # Solo las filas pendientes de purgar
+            models.Index(fields=['fecha_eliminacion'], name='cliente_eliminados_idx',
+                         condition=models.Q(fecha_eliminacion__isnull=False)),
+        ]
 
     def __str__(self):
         return f"{self.nombre} ({self.correo})"
@@ -1,6 +1,7 @@
 """Serializers para la API en `interfaz_crud`."""
 
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from .models import Cliente
 from quotations.models import Quotation
 
@@ -17,6 +18,14 @@ class ClienteSerializer(serializers.ModelSerializer):
       - fecha_registro (solo lectura)
     """
 
+    # El correo es único solo entre los clientes activos (restricción
+    # condicional, que DRF no valida por sí solo)
+    correo = serializers.EmailField(
+        max_length=254,
+        validators=[UniqueValidator(queryset=Cliente.objects.all(),
+                                    message='Ya existe un cliente con este correo.')],
+    )
+
     class Meta:
         model = Cliente
         fields = ['id', 'nombre', 'correo', 'telefono', 'direccion', 'fecha_registro']
@@ -37,4 +46,42 @@ class QuotationSerializer(serializers.ModelSerializer):
             'id', 'cliente', 'nombre_cliente', 'fecha_creacion', 'fecha_modificacion',
             'ancho_cm', 'alto_cm', 'cantidad', 'costo_total', 'precio_utilidad_28'
         ]
-        read_only_fields = ['fecha_creacion', 'fecha_modificacion']
\ No newline at end of file
+        read_only_fields = ['fecha_creacion', 'fecha_modificacion']
+
+class QuotationEntradaSerializer(serializers.Serializer):
+    """Valida una entrada de la API de creación en lote de cotizaciones.
+
+    Usa los mismos campos y límites que `QuotationForm`, pero `cliente` es el
+    id del cliente (se resuelven todos juntos con una sola consulta).
+    """
+
+    cliente = serializers.IntegerField()
+    ancho_cm = serializers.FloatField(min_value=0.1)
+    alto_cm = serializers.FloatField(min_value=0.1)
+    espacio_entre_cm = serializers.FloatField(min_value=0, default=0.5)
+    cantidad_horizontal = serializers.IntegerField(min_value=1)
+    cantidad_vertical = serializers.IntegerField(min_value=1)
+    cantidad = serializers.IntegerField(min_value=1)
+    valor_por_troquelada = serializers.FloatField(min_value=0)
+    montaje = serializers.FloatField(min_value=0, default=0)
+    medida = serializers.FloatField(min_value=0, default=0)
+    espesor = serializers.ChoiceField(choices=Quotation.ESPESOR_CHOICES, default='2_mm')
+    bolsa_individual = serializers.FloatField(min_value=0, required=False)
+    sellada = serializers.FloatField(min_value=0, required=False)
+    cortada = serializers.FloatField(min_value=0, required=False)
+    empaque_final = serializers.FloatField(min_value=0, required=False)
+    llenada_gel = serializers.FloatField(min_value=0, required=False)
+    pin_soporte = serializers.FloatField(min_value=0, required=False)
+    samblasted = serializers.FloatField(min_value=0, required=False)
+    mo_rubber = serializers.FloatField(min_value=0, required=False)
+    numero_plotter = serializers.FloatField(min_value=0, required=False)
+    perforada = serializers.FloatField(min_value=0, required=False)
+    guillotina = serializers.FloatField(min_value=0, required=False)
+    clave_idempotencia = serializers.CharField(max_length=100, required=False)
+
+
+class CambioEstadoSerializer(serializers.Serializer):
+    """Valida el cuerpo de `/api/cotizaciones/cambiar-estado/`."""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    estado = serializers.ChoiceField(choices=Quotation.ESTADO_CHOICES, required=False)
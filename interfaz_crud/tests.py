@@ -1,3 +1,43 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from interfaz_crud.models import Cliente
+from quotations.business_logic.datos_sinteticos import generar_entradas, sembrar
+from quotations.models import Quotation
+
+
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False)
+class CreacionEnLoteTests(TestCase):
+    """POST /api/cotizaciones/lote/ con Idempotency-Key: crear, reintentar y carrera."""
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(2, 0)
+        cls.entradas = generar_entradas(3, list(Cliente.objects.values_list('pk', flat=True)))
+
+    def enviar(self, clave):
+        return self.client.post(reverse('quotation-crear-lote'), self.entradas,
+                                content_type='application/json', HTTP_IDEMPOTENCY_KEY=clave)
+
+    def test_reintento_devuelve_las_ya_creadas(self):
+        primera = self.enviar('lote-1')
+        self.assertEqual(primera.status_code, 201)
+        self.assertTrue(all(c['creada'] for c in primera.json()))
+
+        reintento = self.enviar('lote-1')
+        self.assertEqual(reintento.status_code, 200)
+        self.assertFalse(any(c['creada'] for c in reintento.json()))
+        self.assertEqual([c['id'] for c in reintento.json()], [c['id'] for c in primera.json()])
+        self.assertEqual(Quotation.objects.filter(clave_idempotencia__startswith='lote-1:').count(), 3)
+
+    def test_lote_concurrente_responde_409(self):
+        # Otra petición con la misma clave insertó las filas entre la
+        # comprobación de claves existentes y el INSERT de esta
+        with mock.patch.object(Quotation.objects, 'bulk_create', side_effect=IntegrityError):
+            respuesta = self.enviar('lote-2')
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertIn('errores', respuesta.json())
+        self.assertFalse(Quotation.objects.filter(clave_idempotencia__startswith='lote-2:').exists())
@@ -11,8 +11,15 @@ from . import api
 router = DefaultRouter()
 router.register(r'clientes', api.ClienteViewSet)
 router.register(r'cotizaciones', api.QuotationViewSet)
+router.register(r'analitica/mensual', api.ResumenMensualViewSet, basename='analitica-mensual')
+router.register(r'analitica/embudo', api.EmbudoViewSet, basename='analitica-embudo')
+router.register(r'diagnostico/conexiones', api.ConexionesViewSet, basename='diagnostico-conexiones')
+router.register(r'diagnostico/tiempos', api.TiemposViewSet, basename='diagnostico-tiempos')
 
-# NOTA: aquí usamos path('', include(...)) para evitar dobles prefijos
+# NOTA: aquí usamos path('', include(...)) para evitar dobles prefijos.
+# Las listas asíncronas van antes que el router y usan su mismo nombre.
 urlpatterns = [
+    path('clientes/', api.lista_clientes, name='cliente-list'),
+    path('cotizaciones/', api.lista_cotizaciones, name='quotation-list'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
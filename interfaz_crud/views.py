@@ -1,45 +1,59 @@
 """Vistas web (HTML) para la app `interfaz_crud`."""
 
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib import messages
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, Max, OuterRef, Q, Subquery, Sum
+from quotation_project.replicas import lectura_en_replica
 from .models import Cliente
 from .forms import ClienteForm
 
+# Cotizaciones por página en el historial del detalle de cliente
+COTIZACIONES_POR_PAGINA = 10
+
+
+def anotar_estadisticas_cotizaciones(queryset):
+    """Añade a cada cliente las estadísticas de sus cotizaciones.
+
+    Usa subconsultas correlacionadas (cubiertas por los índices
+    cliente+fecha_creacion y cliente+estado de `quotation`), así la página
+    completa se resuelve en una sola consulta, sin N+1:
+      - total_cotizaciones
+      - ultima_cotizacion (fecha)
+      - total_aprobado (suma de precio con utilidad 28% de las aprobadas)
+      - precio_promedio (promedio del precio con utilidad 28%)
+    """
+    from quotations.models import Quotation
+
+    cotizaciones = Quotation.objects.filter(cliente=OuterRef('pk')).order_by().values('cliente')
+    return queryset.annotate(
+        total_cotizaciones=Subquery(cotizaciones.annotate(n=Count('id')).values('n')),
+        ultima_cotizacion=Subquery(cotizaciones.annotate(m=Max('fecha_creacion')).values('m')),
+        total_aprobado=Subquery(
+            cotizaciones.filter(estado='aprobada').annotate(s=Sum('precio_utilidad_28')).values('s')
+        ),
+        precio_promedio=Subquery(cotizaciones.annotate(a=Avg('precio_utilidad_28')).values('a')),
+    )
+
 
 def inicio(request):
     """Vista de inicio de la interfaz web.
 
     Renderiza `templates/inicio.html` (ahora extiende `base.html` del proyecto).
-    Incluye estadísticas sobre clientes y cotizaciones.
+    Incluye estadísticas sobre clientes y cotizaciones, leídas de los
+    contadores mantenidos por `quotations.business_logic.contadores`.
     """
-    from quotations.models import Quotation
-    from django.utils import timezone
-    from datetime import timedelta
-    
-    # Obtener estadísticas
-    total_clientes = Cliente.objects.count()
-    total_cotizaciones = Quotation.objects.count()
-    
-    # Cotizaciones del mes actual
-    inicio_mes = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    cotizaciones_mes = Quotation.objects.filter(
-        fecha_creacion__gte=inicio_mes
-    ).count()
-    
-    context = {
-        'total_clientes': total_clientes,
-        'total_cotizaciones': total_cotizaciones,
-        'cotizaciones_mes': cotizaciones_mes,
-    }
-    
-    return render(request, 'interfaz_crud/inicio.html', context)
+    from quotations.business_logic.contadores import obtener_estadisticas
+
+    return render(request, 'interfaz_crud/inicio.html', obtener_estadisticas())
 
 
 # Vistas para Clientes
+@method_decorator(lectura_en_replica, name='dispatch')
 class ListaClientes(ListView):
     model = Cliente
     template_name = 'interfaz_crud/cliente_list.html'
@@ -54,7 +68,30 @@ class ListaClientes(ListView):
             queryset = queryset.filter(
                 Q(nombre__icontains=q) | Q(correo__icontains=q)
             )
-        return queryset
+        return anotar_estadisticas_cotizaciones(queryset)
+
+
+@method_decorator(lectura_en_replica, name='dispatch')
+class DetalleCliente(DetailView):
+    model = Cliente
+    template_name = 'interfaz_crud/cliente_detail.html'
+    context_object_name = 'cliente'
+
+    def get_queryset(self):
+        return anotar_estadisticas_cotizaciones(super().get_queryset())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        historial = self.object.cotizaciones.order_by('-fecha_creacion').only(
+            'id', 'cliente_id', 'fecha_creacion', 'cantidad', 'ancho_cm', 'alto_cm',
+            'costo_total', 'precio_utilidad_28', 'estado'
+        )
+        paginator = Paginator(historial, COTIZACIONES_POR_PAGINA)
+        # El total ya viene anotado: evita el COUNT(*) del paginador
+        paginator.count = self.object.total_cotizaciones or 0
+        context['page_obj'] = paginator.get_page(self.request.GET.get('page'))
+        context['cotizaciones'] = context['page_obj'].object_list
+        return context
 
 
 class CrearCliente(CreateView):
@@ -84,9 +121,14 @@ class EliminarCliente(DeleteView):
     template_name = 'interfaz_crud/cliente_confirm_delete.html'
     success_url = reverse_lazy('interfaz_crud:lista_clientes')
 
-    def delete(self, request, *args, **kwargs):
-        messages.success(request, 'Cliente eliminado exitosamente.')
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        from quotations.business_logic.eliminacion import eliminar_cliente
+
+        # Borrado lógico del cliente y sus cotizaciones, sin cargarlas; se
+        # purgan después (ver quotations/business_logic/eliminacion.py)
+        eliminar_cliente(self.object.pk)
+        messages.success(self.request, 'Cliente eliminado exitosamente.')
+        return HttpResponseRedirect(self.get_success_url())
 
 
 
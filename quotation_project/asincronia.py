@@ -0,0 +1,95 @@
+"""
+Vistas asíncronas (ASGI)
+
+Con un servidor ASGI (`uvicorn quotation_project.asgi:application`) las
+vistas asíncronas no ocupan un hilo mientras esperan a la base de datos:
+la cotización, su lista y las listas de la API lo son. Con WSGI, Django las
+ejecuta igual, en el hilo de la petición.
+
+Para que una vista asíncrona no vuelva a pasar a un hilo, todo el
+middleware debe aceptar ambos modos. El del proyecto lo hace con
+`MiddlewareHibrido`: la subclase implementa `procesar(request)` (WSGI) y
+`aprocesar(request)` (ASGI) y llama a `self.get_response` en cada uno.
+
+El trabajo de CPU de las vistas (motor, ReportLab) se hace con
+`en_ejecutor()`, en un pool de HILOS_CALCULO hilos. Así no bloquea el bucle
+de eventos y limita cuántos cálculos o PDF corren a la vez en el proceso.
+
+Los execute_wrapper de la base de datos deben instalarse en el hilo donde
+corren las consultas. Con ASGI, cada petición ejecuta su código síncrono y
+su ORM asíncrono en un hilo propio (ThreadSensitiveContext), así que
+`instalar_envolturas()` y `quitar_envolturas()` van a ese hilo.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+_bloqueo = threading.Lock()
+_ejecutor = None
+
+
+def _obtener_ejecutor():
+    global _ejecutor
+    with _bloqueo:
+        if _ejecutor is None:
+            _ejecutor = ThreadPoolExecutor(max_workers=getattr(settings, 'HILOS_CALCULO', 4),
+                                           thread_name_prefix='calculo')
+        return _ejecutor
+
+
+async def en_ejecutor(funcion, *args, **kwargs):
+    """
+    Ejecuta `funcion` (CPU, sin base de datos) en el pool de cálculo.
+
+    Se ejecuta con las variables de contexto de la petición (tiempos por
+    etapa, réplica de lectura).
+    """
+    return await sync_to_async(funcion, thread_sensitive=False,
+                               executor=_obtener_ejecutor())(*args, **kwargs)
+
+
+def instalar_envolturas(envoltura):
+    """Instala `envoltura` como execute_wrapper de todas las conexiones; devuelve la pila que la quita."""
+    pila = ExitStack()
+    for conexion in connections.all():
+        pila.enter_context(conexion.execute_wrapper(envoltura))
+    return pila
+
+
+async def ainstalar_envolturas(envoltura):
+    """`instalar_envolturas` en el hilo de la petición asíncrona."""
+    return await sync_to_async(instalar_envolturas)(envoltura)
+
+
+async def aquitar_envolturas(pila):
+    """Quita, en el mismo hilo, las envolturas de `ainstalar_envolturas`."""
+    await sync_to_async(pila.close)()
+
+
+class MiddlewareHibrido:
+    """Base de middleware que funciona con WSGI y con ASGI sin cambiar de hilo."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.aprocesar(request)
+        return self.procesar(request)
+
+    def procesar(self, request):
+        raise NotImplementedError
+
+    async def aprocesar(self, request):
+        raise NotImplementedError
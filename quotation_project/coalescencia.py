@@ -0,0 +1,224 @@
+"""
+Coalescencia de cálculos y PDF idénticos simultáneos
+
+Cuando varias personas recalculan a la vez la misma cotización, cada
+petición ejecutaría el motor (y ReportLab, si piden el PDF) por su cuenta.
+`compartir(operacion, clave, calcular)` ejecuta `calcular` una sola vez
+por clave: la primera petición calcula y las que llegan mientras tanto
+esperan y reciben el mismo resultado (o la misma excepción). Al terminar,
+la clave se libera: no es una caché, la petición siguiente vuelve a
+calcular.
+
+    resultado = compartir('calculo', huella(datos), lambda: procesador.calcular_cotizacion(datos))
+
+La clave es la huella de los datos de entrada (`huella()`). El resultado
+es el mismo objeto para todas las peticiones: no debe modificarse.
+
+Entre procesos (COALESCENCIA_ENTRE_PROCESOS = True), la petición que
+calcula toma además un bloqueo por clave, pg_advisory_lock en PostgreSQL o
+flock sobre un archivo de COALESCENCIA_DIRECTORIO en otras bases, y deja el
+resultado COALESCENCIA_SEGUNDOS en la caché de Django. Las de otros
+procesos esperan el bloqueo y leen el resultado de la caché, que para esto
+debe ser compartida (Redis, Memcached, base de datos). Con la caché en
+memoria de cada proceso (LocMemCache, la de por defecto) la opción se ignora
+y `manage.py check` lo avisa (quotations.W001). Sin fcntl (Windows) y sin
+PostgreSQL, la coalescencia es solo dentro del proceso.
+
+Una petición que espera más de COALESCENCIA_ESPERA_SEGUNDOS (al cálculo de
+otra petición o al bloqueo entre procesos) calcula por su cuenta.
+
+`compartir()` se llama desde el pool de cálculo (ver asincronia.py), fuera
+del ciclo de una petición: el bloqueo en PostgreSQL abre y cierra su
+conexión como lo haría una petición.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from .metricas import COALESCENCIA
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_bloqueo = threading.Lock()
+_en_curso = {}
+
+
+class _Vuelo:
+    """Cálculo en curso de una clave."""
+
+    __slots__ = ('terminado', 'resultado', 'error')
+
+    def __init__(self):
+        self.terminado = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+def _serializable(valor):
+    # Instancias de modelo (cliente, usuario) por su clase y clave primaria
+    return f'{valor.__class__.__name__}:{getattr(valor, "pk", valor)}'
+
+
+def huella(datos):
+    """Huella (sha256) de los datos de entrada de un cálculo."""
+    texto = json.dumps(datos, sort_keys=True, default=_serializable)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+# Intervalo entre intentos de tomar el bloqueo entre procesos
+INTERVALO_BLOQUEO_SEGUNDOS = 0.05
+
+
+def _esperar_bloqueo(intentar, espera):
+    """Llama a `intentar()` hasta que devuelva True o pasen `espera` segundos."""
+    limite = time.monotonic() + espera
+    while not intentar():
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(INTERVALO_BLOQUEO_SEGUNDOS)
+    return True
+
+
+@contextmanager
+def _bloqueo_entre_procesos(clave, espera):
+    """Toma el bloqueo de `clave` esperando a lo sumo `espera` segundos; devuelve si se obtuvo."""
+    resumen = hashlib.sha256(clave.encode()).digest()
+    conexion = connections[DEFAULT_DB_ALIAS]
+    if conexion.vendor == 'postgresql':
+        numero = int.from_bytes(resumen[:8], 'big', signed=True)
+
+        def intentar():
+            with conexion.cursor() as cursor:
+                cursor.execute('SELECT pg_try_advisory_lock(%s)', [numero])
+                return cursor.fetchone()[0]
+
+        obtenido = _esperar_bloqueo(intentar, espera)
+        try:
+            yield obtenido
+        finally:
+            if obtenido:
+                with conexion.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(%s)', [numero])
+    elif fcntl is not None:
+        directorio = (getattr(settings, 'COALESCENCIA_DIRECTORIO', None)
+                      or os.path.join(tempfile.gettempdir(), 'cotizador_coalescencia'))
+        os.makedirs(directorio, exist_ok=True)
+        # Las claves se reparten entre a lo sumo 256 archivos de bloqueo
+        ruta = os.path.join(directorio, f'{resumen[0]:02x}.lock')
+        with open(ruta, 'a') as archivo:
+
+            def intentar():
+                try:
+                    fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return True
+                except BlockingIOError:
+                    return False
+
+            obtenido = _esperar_bloqueo(intentar, espera)
+            try:
+                yield obtenido
+            finally:
+                if obtenido:
+                    fcntl.flock(archivo, fcntl.LOCK_UN)
+    else:
+        yield True
+
+
+def _calcular_entre_procesos(clave, calcular, valido):
+    """(resultado, rol): 'calculado', 'otro_proceso' o 'sin_espera'."""
+    clave_cache = f'coalescencia:{clave}'
+    espera = getattr(settings, 'COALESCENCIA_ESPERA_SEGUNDOS', 30)
+    # Hilo fuera del ciclo de una petición: conexiones como en una petición
+    close_old_connections()
+    try:
+        with _bloqueo_entre_procesos(clave, espera) as obtenido:
+            if not obtenido:
+                return calcular(), 'sin_espera'
+            valor = cache.get(clave_cache)
+            if valor is not None and valido(valor):
+                return valor, 'otro_proceso'
+            valor = calcular()
+            cache.set(clave_cache, valor, getattr(settings, 'COALESCENCIA_SEGUNDOS', 5))
+            return valor, 'calculado'
+    finally:
+        close_old_connections()
+
+
+def cache_compartida():
+    """Si todos los procesos ven la misma caché por defecto."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def revisar_configuracion(app_configs, **kwargs):
+    """Chequeo de sistema: COALESCENCIA_ENTRE_PROCESOS sin caché compartida."""
+    if getattr(settings, 'COALESCENCIA_ENTRE_PROCESOS', False) and not cache_compartida():
+        return [checks.Warning(
+            'COALESCENCIA_ENTRE_PROCESOS está activo pero la caché por defecto no se '
+            'comparte entre procesos: se ignora.',
+            hint='Configure CACHES con Redis, Memcached o la base de datos.',
+            id='quotations.W001',
+        )]
+    return []
+
+
+def compartir(operacion, clave, calcular, valido=lambda valor: True):
+    """
+    Resultado de `calcular()`, compartido con las llamadas simultáneas de
+    la misma `operacion` y `clave`.
+
+    Args:
+        operacion: Nombre de lo que se calcula ('calculo', 'pdf'); separa
+                   las claves y etiqueta las métricas
+        clave: Huella de los datos de entrada (ver `huella()`)
+        calcular: Función sin argumentos que produce el resultado
+        valido: Entre procesos, descarta un resultado de la caché que ya
+                no sirve (por ejemplo, un PDF que no está en este disco)
+    """
+    if not getattr(settings, 'COALESCENCIA', True):
+        return calcular()
+
+    clave = f'{operacion}:{clave}'
+    with _bloqueo:
+        vuelo = _en_curso.get(clave)
+        lider = vuelo is None
+        if lider:
+            vuelo = _en_curso[clave] = _Vuelo()
+
+    if not lider:
+        if vuelo.terminado.wait(getattr(settings, 'COALESCENCIA_ESPERA_SEGUNDOS', 30)):
+            COALESCENCIA.labels(operacion, 'compartido').inc()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+        COALESCENCIA.labels(operacion, 'sin_espera').inc()
+        return calcular()
+
+    try:
+        if getattr(settings, 'COALESCENCIA_ENTRE_PROCESOS', False) and cache_compartida():
+            vuelo.resultado, rol = _calcular_entre_procesos(clave, calcular, valido)
+        else:
+            vuelo.resultado, rol = calcular(), 'calculado'
+        COALESCENCIA.labels(operacion, rol).inc()
+        return vuelo.resultado
+    except Exception as e:
+        vuelo.error = e
+        raise
+    finally:
+        with _bloqueo:
+            del _en_curso[clave]
+        vuelo.terminado.set()
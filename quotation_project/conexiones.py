@@ -0,0 +1,115 @@
+"""
+Conexiones a la base de datos: configuración y métricas
+
+`base_de_datos_desde_entorno()` arma la entrada de DATABASES a partir de
+variables de entorno (la usa `settings_produccion.py`). Hay dos modos:
+
+- pool: pool de conexiones de psycopg 3 (DB_POOL_MAX > 0). Requiere
+  `pip install "psycopg[pool]"`.
+- persistente: cada hilo reutiliza su conexión durante DB_CONN_MAX_AGE
+  segundos, verificándola al inicio de cada petición (CONN_HEALTH_CHECKS).
+
+`estadisticas_conexiones()` devuelve, para el proceso (worker) actual, el
+tamaño del pool, los checkouts y el tiempo de espera; en modo persistente,
+cuántas conexiones se abrieron frente a cuántas peticiones se atendieron.
+"""
+
+import os
+import threading
+
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_bloqueo = threading.Lock()
+_aperturas = {}
+_peticiones = 0
+
+
+def _entero(entorno, nombre, por_defecto):
+    valor = entorno.get(nombre)
+    return int(valor) if valor not in (None, '') else por_defecto
+
+
+def base_de_datos_desde_entorno(entorno=os.environ):
+    """
+    Entrada `default` de DATABASES leída de variables de entorno.
+
+    Variables: DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT y, según el
+    modo, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT (segundos de espera por
+    una conexión libre) o DB_CONN_MAX_AGE.
+    """
+    base = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': entorno.get('DB_NAME', 'crud_quotation'),
+        'USER': entorno.get('DB_USER', 'quotation_admin'),
+        'PASSWORD': entorno.get('DB_PASSWORD', ''),
+        'HOST': entorno.get('DB_HOST', 'localhost'),
+        'PORT': entorno.get('DB_PORT', '5432'),
+    }
+    maximo = _entero(entorno, 'DB_POOL_MAX', 0)
+    if maximo > 0:
+        # Con pool, Django exige CONN_MAX_AGE = 0: el pool decide cuánto vive cada conexión
+        base['CONN_MAX_AGE'] = 0
+        base['OPTIONS'] = {'pool': {
+            'min_size': _entero(entorno, 'DB_POOL_MIN', 2),
+            'max_size': maximo,
+            'timeout': _entero(entorno, 'DB_POOL_TIMEOUT', 10),
+        }}
+    else:
+        base['CONN_MAX_AGE'] = _entero(entorno, 'DB_CONN_MAX_AGE', 60)
+        base['CONN_HEALTH_CHECKS'] = True
+    return base
+
+
+@receiver(connection_created)
+def _conexion_abierta(sender, connection, **kwargs):
+    with _bloqueo:
+        _aperturas[connection.alias] = _aperturas.get(connection.alias, 0) + 1
+
+
+@receiver(request_started)
+def _peticion_iniciada(sender, **kwargs):
+    global _peticiones
+    with _bloqueo:
+        _peticiones += 1
+
+
+def _estadisticas_pool(pool):
+    datos = pool.get_stats()
+    checkouts = datos.get('requests_num', 0)
+    espera_ms = datos.get('requests_wait_ms', 0)
+    return {
+        'modo': 'pool',
+        'tamano_minimo': datos.get('pool_min'),
+        'tamano_maximo': datos.get('pool_max'),
+        'tamano': datos.get('pool_size'),
+        'disponibles': datos.get('pool_available'),
+        'esperando': datos.get('requests_waiting', 0),
+        'checkouts': checkouts,
+        'checkouts_en_cola': datos.get('requests_queued', 0),
+        'timeouts': datos.get('requests_errors', 0),
+        'espera_total_ms': espera_ms,
+        'espera_promedio_ms': round(espera_ms / checkouts, 3) if checkouts else 0,
+        'conexiones_abiertas': datos.get('connections_num', 0),
+        'apertura_total_ms': datos.get('connections_ms', 0),
+    }
+
+
+def estadisticas_conexiones():
+    """Métricas de conexiones por alias en el proceso actual."""
+    alias = {}
+    for nombre in connections:
+        conexion = connections[nombre]
+        pool = getattr(conexion, 'pool', None)
+        if pool is not None:
+            alias[nombre] = _estadisticas_pool(pool)
+            continue
+        max_age = conexion.settings_dict.get('CONN_MAX_AGE', 0)
+        alias[nombre] = {
+            'modo': 'persistente' if max_age else 'por_peticion',
+            'conn_max_age': max_age,
+            'conexiones_abiertas': _aperturas.get(nombre, 0),
+        }
+    return {'pid': os.getpid(), 'peticiones': _peticiones, 'alias': alias}
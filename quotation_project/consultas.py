@@ -0,0 +1,167 @@
+"""
+Detector de consultas N+1 y consultas lentas
+
+`DetectorConsultasMiddleware` (activo con DETECTOR_CONSULTAS) registra todas
+las consultas SQL de cada petición y, al terminar, escribe en el logger
+`quotation_project.consultas`:
+  - cuántas consultas hizo la petición y cuánto tardaron (DEBUG)
+  - las formas de consulta repetidas DETECTOR_CONSULTAS_REPETIDAS veces o
+    más (WARNING): casi siempre un N+1, p. ej. un serializer que lee
+    `cotizacion.cliente.nombre` sin select_related. Se indica la línea del
+    proyecto que la disparó.
+  - las consultas de más de DETECTOR_CONSULTAS_LENTA_MS, con su plan
+    (EXPLAIN en PostgreSQL, EXPLAIN QUERY PLAN en SQLite) (WARNING)
+
+La respuesta lleva además la cabecera `X-Consultas-SQL` con el total.
+
+Dos consultas tienen la misma forma si solo cambian sus parámetros; las
+listas `IN (%s, %s, ...)` cuentan como una sola forma sin importar el largo.
+
+`max_consultas(n)` falla (AssertionError) si el bloque ejecuta más de `n`
+consultas; `python manage.py revisar_consultas` lo aplica a cada vista.
+"""
+
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.test.utils import CaptureQueriesContext
+
+from .asincronia import MiddlewareHibrido, ainstalar_envolturas, aquitar_envolturas, instalar_envolturas
+
+logger = logging.getLogger(__name__)
+
+_LISTA_IN = re.compile(r'IN \((?:%s, )*%s\)')
+_RAIZ = str(Path(settings.BASE_DIR))
+_IGNORADOS = (str(Path(__file__)), f'{_RAIZ}/venv', '/site-packages/')
+
+
+def forma(sql):
+    """SQL sin la longitud de las listas IN, para agrupar consultas iguales."""
+    return _LISTA_IN.sub('IN (...)', sql)
+
+
+# Argumentos de un execute_wrapper (ver Django, "Database instrumentation")
+_FIRMA_ENVOLTURA = ('execute', 'sql', 'params', 'many', 'context')
+
+
+def _es_envoltura(codigo):
+    """Si `codigo` es un execute_wrapper: la métrica o los tiempos envuelven al detector."""
+    return codigo.co_varnames[:codigo.co_argcount][-len(_FIRMA_ENVOLTURA):] == _FIRMA_ENVOLTURA
+
+
+def _origen():
+    """Primera línea del proyecto (fuera de Django, librerías y envolturas) en la pila."""
+    marco = sys._getframe(2)
+    while marco is not None:
+        codigo = marco.f_code
+        archivo = codigo.co_filename
+        if (archivo.startswith(_RAIZ) and not any(i in archivo for i in _IGNORADOS)
+                and not _es_envoltura(codigo)):
+            return f'{archivo[len(_RAIZ) + 1:]}:{marco.f_lineno} ({codigo.co_name})'
+        marco = marco.f_back
+    return 'desconocido'
+
+
+class _RegistroConsultas:
+    """execute_wrapper que guarda (alias, sql, params, ms, origen) de cada consulta."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - inicio) * 1000
+            self.consultas.append((context['connection'].alias, sql, params, ms, _origen()))
+
+
+def explicar(alias, sql, params):
+    """Plan de ejecución de una consulta SELECT, o None si no se puede obtener."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    conexion = connections[alias]
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute(f'{conexion.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(c) for c in fila) for fila in cursor.fetchall())
+    except DatabaseError as e:
+        return f'(sin plan: {e})'
+
+
+class DetectorConsultasMiddleware(MiddlewareHibrido):
+    """Cuenta consultas por petición y avisa de N+1 y consultas lentas."""
+
+    def procesar(self, request):
+        if not getattr(settings, 'DETECTOR_CONSULTAS', False):
+            return self.get_response(request)
+        registro = _RegistroConsultas()
+        with instalar_envolturas(registro):
+            response = self.get_response(request)
+        return self._completar(request, response, registro)
+
+    async def aprocesar(self, request):
+        if not getattr(settings, 'DETECTOR_CONSULTAS', False):
+            return await self.get_response(request)
+        registro = _RegistroConsultas()
+        pila = await ainstalar_envolturas(registro)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await aquitar_envolturas(pila)
+        # EXPLAIN de las consultas lentas: en el hilo de la petición
+        return await sync_to_async(self._completar)(request, response, registro)
+
+    def _completar(self, request, response, registro):
+        self._informar(request, registro.consultas)
+        response['X-Consultas-SQL'] = str(len(registro.consultas))
+        return response
+
+    def _informar(self, request, consultas):
+        peticion = f'{request.method} {request.path}'
+        logger.debug('%s: %d consultas, %.2f ms', peticion, len(consultas),
+                     sum(c[3] for c in consultas))
+
+        repetidas = getattr(settings, 'DETECTOR_CONSULTAS_REPETIDAS', 5)
+        formas = Counter((alias, forma(sql)) for alias, sql, _, _, _ in consultas)
+        origenes = {}
+        for alias, sql, _, _, origen in consultas:
+            origenes.setdefault((alias, forma(sql)), origen)
+        for clave, veces in formas.most_common():
+            if veces < repetidas:
+                break
+            logger.warning('%s: posible N+1, %d consultas iguales desde %s\n  %s',
+                           peticion, veces, origenes[clave], clave[1])
+
+        lenta_ms = getattr(settings, 'DETECTOR_CONSULTAS_LENTA_MS', 100)
+        for alias, sql, params, ms, origen in consultas:
+            if ms >= lenta_ms:
+                logger.warning('%s: consulta lenta (%.2f ms) desde %s\n  %s\n%s',
+                               peticion, ms, origen, sql, explicar(alias, sql, params))
+
+
+@contextmanager
+def max_consultas(maximo, using='default'):
+    """
+    Falla si el bloque ejecuta más de `maximo` consultas en `using`.
+
+        with max_consultas(3):
+            client.get(reverse('quotation-list'))
+
+    El mensaje de error lista las consultas agrupadas por forma.
+    """
+    with CaptureQueriesContext(connections[using]) as capturadas:
+        yield capturadas
+    if len(capturadas) > maximo:
+        formas = Counter(forma(c['sql']) for c in capturadas.captured_queries)
+        detalle = '\n'.join(f'  {veces}x {sql}' for sql, veces in formas.most_common())
+        raise AssertionError(f'{len(capturadas)} consultas (máximo {maximo}):\n{detalle}')
@@ -0,0 +1,164 @@
+"""
+Grabación de peticiones para reproducirlas después
+
+Con GRABACION_ARCHIVO definido, `GrabadorPeticionesMiddleware` agrega una
+línea JSON por petición a ese archivo (JSONL), con lo necesario para
+repetirla (ver `python manage.py reproducir`):
+
+    {"t": 12.31, "metodo": "POST", "ruta": "/cotizar/", "query": "",
+     "tipo": "form", "cuerpo": {"cliente": ["12"], "guardar": [""], ...},
+     "cabeceras": {"X-Requested-With": "XMLHttpRequest"},
+     "etiqueta": "POST quotations:cotizar guardar", "estado": 302}
+
+`t` son los segundos desde que arrancó la grabación; `etiqueta` agrupa las
+peticiones en el informe (los POST de cotizar/ se separan en calcular,
+guardar y generar_pdf).
+
+Se guardan solo cuerpos de formulario (application/x-www-form-urlencoded) y
+JSON, sin cookies ni cabeceras de autenticación. El token CSRF y los campos
+de GRABACION_CAMPOS_OCULTOS se descartan; los correos se reemplazan por uno
+ficticio derivado del original (el mismo correo da siempre el mismo
+reemplazo, así que las restricciones de unicidad se comportan igual). La
+query string se sanea igual, y además se vacían los textos de búsqueda
+(CAMPOS_BUSQUEDA), que suelen ser nombres o correos de clientes.
+GRABACION_MUESTRA (0 a 1) graba solo una fracción de las peticiones.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import QueryDict
+
+from .asincronia import MiddlewareHibrido
+
+# Cabeceras que cambian la respuesta de las vistas y se repiten tal cual
+CABECERAS_GRABADAS = ('X-Requested-With', 'HX-Request', 'X-Version-Esquema', 'Idempotency-Key', 'Accept')
+CAMPOS_DESCARTADOS = ('csrfmiddlewaretoken', 'password', 'password1', 'password2')
+CAMPOS_CORREO = ('correo', 'email')
+# Parámetros de la URL con el texto buscado (lista, autocompletar, ?search= de la API)
+CAMPOS_BUSQUEDA = ('buscar', 'q', 'search')
+# Los canales del cálculo en vivo no existen al reproducir
+PREFIJOS_EXCLUIDOS = ('/metrics', '/static/', '/admin/', '/api/diagnostico/', '/cotizar/en-vivo/')
+
+_bloqueo = threading.Lock()
+_inicio = time.time()
+
+
+def etiqueta(metodo, vista, cuerpo, cabeceras):
+    """Nombre con el que se agrupa la petición en el informe de reproducción."""
+    partes = [metodo, vista]
+    if metodo == 'POST' and vista in ('quotations:cotizar', 'quotations:editar_cotizacion'):
+        cuerpo = cuerpo or {}
+        if 'generar_pdf' in cuerpo:
+            partes.append('generar_pdf')
+        elif 'guardar' in cuerpo:
+            partes.append('guardar')
+        else:
+            partes.append('calcular')
+        if cabeceras.get('X-Requested-With') == 'XMLHttpRequest':
+            partes.append('json')
+        elif cabeceras.get('HX-Request') == 'true':
+            partes.append('parcial')
+    return ' '.join(partes)
+
+
+def _correo_ficticio(correo):
+    return f'grabado-{hashlib.sha256(correo.encode()).hexdigest()[:12]}@ejemplo.com'
+
+
+def sanear(valor, ocultos):
+    """Copia de un cuerpo (dict de listas o JSON) sin datos sensibles."""
+    if isinstance(valor, list):
+        return [sanear(v, ocultos) for v in valor]
+    if not isinstance(valor, dict):
+        return valor
+    limpio = {}
+    for campo, contenido in valor.items():
+        if campo in CAMPOS_DESCARTADOS:
+            continue
+        if campo in ocultos:
+            contenido = [''] * len(contenido) if isinstance(contenido, list) else ''
+        elif campo in CAMPOS_CORREO:
+            if isinstance(contenido, list):
+                contenido = [_correo_ficticio(c) for c in contenido]
+            elif isinstance(contenido, str):
+                contenido = _correo_ficticio(contenido)
+        else:
+            contenido = sanear(contenido, ocultos)
+        limpio[campo] = contenido
+    return limpio
+
+
+def _cuerpo(request):
+    """(tipo, cuerpo) de la petición; se llama antes de la vista."""
+    tipo = request.content_type
+    if tipo == 'application/x-www-form-urlencoded':
+        return 'form', dict(request.POST.lists())
+    if tipo == 'application/json' and request.body:
+        try:
+            return 'json', json.loads(request.body)
+        except ValueError:
+            return None, None
+    return None, None
+
+
+def _query(request, ocultos):
+    """Query string saneada como el cuerpo, con las búsquedas vacías."""
+    if not request.GET:
+        return ''
+    limpia = QueryDict(mutable=True)
+    for campo, valores in sanear(dict(request.GET.lists()), (*ocultos, *CAMPOS_BUSQUEDA)).items():
+        limpia.setlist(campo, valores)
+    return limpia.urlencode()
+
+
+class GrabadorPeticionesMiddleware(MiddlewareHibrido):
+    """Agrega cada petición (saneada) al archivo GRABACION_ARCHIVO."""
+
+    def _grabar(self, request):
+        archivo = getattr(settings, 'GRABACION_ARCHIVO', None)
+        return (archivo and not request.path.startswith(PREFIJOS_EXCLUIDOS)
+                and random.random() < getattr(settings, 'GRABACION_MUESTRA', 1.0))
+
+    def procesar(self, request):
+        if not self._grabar(request):
+            return self.get_response(request)
+        t = round(time.time() - _inicio, 3)
+        tipo, cuerpo = _cuerpo(request)
+        response = self.get_response(request)
+        self._escribir(request, response, t, tipo, cuerpo)
+        return response
+
+    async def aprocesar(self, request):
+        if not self._grabar(request):
+            return await self.get_response(request)
+        t = round(time.time() - _inicio, 3)
+        tipo, cuerpo = _cuerpo(request)
+        response = await self.get_response(request)
+        await sync_to_async(self._escribir, thread_sensitive=False)(request, response, t, tipo, cuerpo)
+        return response
+
+    def _escribir(self, request, response, t, tipo, cuerpo):
+        coincidencia = request.resolver_match
+        vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+        cabeceras = {c: request.headers[c] for c in CABECERAS_GRABADAS if c in request.headers}
+        ocultos = getattr(settings, 'GRABACION_CAMPOS_OCULTOS', ())
+        cuerpo = sanear(cuerpo, ocultos)
+        linea = json.dumps({
+            't': t,
+            'metodo': request.method,
+            'ruta': request.path,
+            'query': _query(request, ocultos),
+            'tipo': tipo,
+            'cuerpo': cuerpo,
+            'cabeceras': cabeceras,
+            'etiqueta': etiqueta(request.method, vista, cuerpo, cabeceras),
+            'estado': response.status_code,
+        }, ensure_ascii=False)
+        with _bloqueo, open(settings.GRABACION_ARCHIVO, 'a', encoding='utf-8') as salida:
+            salida.write(linea + '\n')
@@ -0,0 +1,121 @@
+"""
+Perfiles de memoria con tracemalloc
+
+`PerfilMemoria` mide un bloque: memoria pico por encima de la del inicio y
+los sitios (archivo:línea) que más memoria asignaron y seguían vivos al
+terminar el bloque.
+
+    with PerfilMemoria() as perfil:
+        procesador.calcular_cotizaciones(entradas)
+    print(perfil.pico_mb, perfil.sitios)
+
+Se activa a pedido:
+  - por petición: con PERFIL_MEMORIA = True, `PerfilMemoriaMiddleware` mide
+    las peticiones que traen la cabecera `X-Perfil-Memoria: 1` o el
+    parámetro `?perfil_memoria=1`. La respuesta lleva `X-Memoria-Pico-MB` y
+    el informe se escribe en el logger `quotation_project.memoria`.
+  - por comando: `python manage.py perfil_memoria <comando> [argumentos]`.
+
+tracemalloc es global al proceso y hace todo más lento mientras está
+activo: solo se mide una petición a la vez (si hay otra en curso, la nueva
+se atiende sin medir) y nunca está activo fuera de un perfil.
+`python manage.py revisar_memoria` usa estos perfiles para verificar los
+techos de memoria de la lista, la API y el cálculo por lotes.
+"""
+
+import logging
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+from .asincronia import MiddlewareHibrido
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+# Marcos de pila guardados por asignación (más marcos, más memoria y tiempo)
+MARCOS = 1
+
+_bloqueo = threading.Lock()
+_EXCLUIDOS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class PerfilMemoria:
+    """Context manager que mide la memoria pico y los sitios que más asignan."""
+
+    def __init__(self, top=10):
+        self.top = top
+        self.pico_mb = None
+        self.final_mb = None
+        self.sitios = []
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            raise RuntimeError('Ya hay un perfil de memoria en curso')
+        tracemalloc.start(MARCOS)
+        return self
+
+    def __exit__(self, *excepcion):
+        try:
+            actual, pico = tracemalloc.get_traced_memory()
+            instantanea = tracemalloc.take_snapshot().filter_traces(_EXCLUIDOS)
+        finally:
+            tracemalloc.stop()
+        self.pico_mb = round(pico / MB, 3)
+        self.final_mb = round(actual / MB, 3)
+        self.sitios = [
+            {
+                'sitio': f'{e.traceback[0].filename}:{e.traceback[0].lineno}',
+                'kb': round(e.size / 1024, 1),
+                'bloques': e.count,
+            }
+            for e in instantanea.statistics('lineno')[:self.top]
+        ]
+        return False
+
+    def informe(self):
+        lineas = [f'pico {self.pico_mb} MB, al terminar {self.final_mb} MB']
+        lineas += [f"  {s['kb']:>10} KB {s['bloques']:>8} bloques  {s['sitio']}" for s in self.sitios]
+        return '\n'.join(lineas)
+
+
+class PerfilMemoriaMiddleware(MiddlewareHibrido):
+    """Mide la memoria de las peticiones que lo piden (ver docstring del módulo)."""
+
+    def _medir(self, request):
+        pedido = (request.headers.get('X-Perfil-Memoria') == '1'
+                  or request.GET.get('perfil_memoria') == '1')
+        return (pedido and getattr(settings, 'PERFIL_MEMORIA', False)
+                and not tracemalloc.is_tracing() and _bloqueo.acquire(blocking=False))
+
+    def procesar(self, request):
+        if not self._medir(request):
+            return self.get_response(request)
+        try:
+            # La respuesta sigue viva al medir: su contenido renderizado cuenta
+            with PerfilMemoria(top=getattr(settings, 'PERFIL_MEMORIA_TOP', 10)) as perfil:
+                response = self.get_response(request)
+        finally:
+            _bloqueo.release()
+        return self._completar(request, response, perfil)
+
+    async def aprocesar(self, request):
+        if not self._medir(request):
+            return await self.get_response(request)
+        try:
+            with PerfilMemoria(top=getattr(settings, 'PERFIL_MEMORIA_TOP', 10)) as perfil:
+                response = await self.get_response(request)
+        finally:
+            _bloqueo.release()
+        return self._completar(request, response, perfil)
+
+    def _completar(self, request, response, perfil):
+        response['X-Memoria-Pico-MB'] = str(perfil.pico_mb)
+        logger.info('%s %s: %s', request.method, request.get_full_path(), perfil.informe())
+        return response
@@ -0,0 +1,168 @@
+"""
+Métricas de operación en formato Prometheus
+
+`MetricasMiddleware` registra, por nombre de vista (`quotations:cotizar`,
+`quotations:lista_cotizaciones`, `cliente-list`...):
+  - latencia de cada petición (histograma) y peticiones por código de estado
+  - consultas SQL y tiempo en la base de datos por petición (histogramas)
+
+Además se cuentan los cálculos del motor (la tasa con `rate()` da
+cálculos por segundo), los PDF generados con su duración y los aciertos y
+fallos de las cachés que pasan por `obtener_o_calcular()` y los cálculos y PDF
+compartidos entre peticiones idénticas (ver quotation_project/coalescencia.py).
+
+`/metrics` las sirve en el formato de texto de Prometheus solo a las
+direcciones de METRICAS_IPS, a quien envíe `Authorization: Bearer` con
+METRICAS_TOKEN y al staff autenticado; al resto le responde 403.
+
+Varios workers (gunicorn, uwsgi): cada proceso escribe sus valores en el
+directorio compartido de la variable de entorno PROMETHEUS_MULTIPROC_DIR y
+/metrics los suma, así que da igual qué worker atienda la consulta. El
+directorio debe existir, vaciarse antes de arrancar el servidor y, con
+gunicorn, el hook `child_exit` debe llamar a `proceso_terminado(worker.pid)`.
+Sin la variable, cada proceso expone solo sus propias métricas.
+"""
+
+import hmac
+import os
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+from .asincronia import MiddlewareHibrido, ainstalar_envolturas, aquitar_envolturas, instalar_envolturas
+
+PETICIONES_DURACION = Histogram(
+    'cotizador_peticion_duracion_segundos', 'Latencia de las peticiones por vista',
+    ['vista', 'metodo'],
+)
+PETICIONES = Counter(
+    'cotizador_peticiones', 'Peticiones atendidas por vista y código de estado',
+    ['vista', 'metodo', 'estado'],
+)
+CONSULTAS_POR_PETICION = Histogram(
+    'cotizador_consultas_por_peticion', 'Consultas SQL ejecutadas en cada petición',
+    ['vista'], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+CONSULTAS_DURACION = Histogram(
+    'cotizador_consultas_duracion_segundos', 'Tiempo en la base de datos de cada petición',
+    ['vista'], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CALCULOS = Counter(
+    'cotizador_calculos', 'Cotizaciones calculadas por el motor', ['resultado'],
+)
+PDF_DURACION = Histogram(
+    'cotizador_pdf_duracion_segundos', 'Duración de generar_pdf_cotizacion',
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+CACHE_CONSULTAS = Counter(
+    'cotizador_cache_consultas', 'Consultas a la caché por nombre y resultado', ['cache', 'resultado'],
+)
+COALESCENCIA = Counter(
+    'cotizador_coalescencia', 'Cálculos y PDF por operación y si se calcularon o se compartieron',
+    ['operacion', 'rol'],
+)
+
+# Hijos ya resueltos: el motor los incrementa en cada cálculo
+CALCULOS_CORRECTOS = CALCULOS.labels('correcto')
+CALCULOS_FALLIDOS = CALCULOS.labels('fallido')
+
+
+def obtener_o_calcular(nombre, clave, calcular, ttl):
+    """`cache.get_or_set` que cuenta el acierto o fallo en la caché `nombre`."""
+    calculado = False
+
+    def _calcular():
+        nonlocal calculado
+        calculado = True
+        return calcular()
+
+    valor = cache.get_or_set(clave, _calcular, ttl)
+    CACHE_CONSULTAS.labels(nombre, 'fallo' if calculado else 'acierto').inc()
+    return valor
+
+
+class _ContadorConsultas:
+    """execute_wrapper que acumula consultas y tiempo en la base de datos."""
+
+    __slots__ = ('cantidad', 'segundos')
+
+    def __init__(self):
+        self.cantidad = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.cantidad += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+class MetricasMiddleware(MiddlewareHibrido):
+    """Latencia, código de estado y consultas SQL de cada petición, por vista."""
+
+    def procesar(self, request):
+        consultas = _ContadorConsultas()
+        inicio = time.perf_counter()
+        with instalar_envolturas(consultas):
+            response = self.get_response(request)
+        self._registrar(request, response, consultas, time.perf_counter() - inicio)
+        return response
+
+    async def aprocesar(self, request):
+        consultas = _ContadorConsultas()
+        inicio = time.perf_counter()
+        pila = await ainstalar_envolturas(consultas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await aquitar_envolturas(pila)
+        self._registrar(request, response, consultas, time.perf_counter() - inicio)
+        return response
+
+    def _registrar(self, request, response, consultas, duracion):
+        # Solo rutas conocidas: una etiqueta por URL pedida no tendría límite
+        coincidencia = request.resolver_match
+        vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+        PETICIONES_DURACION.labels(vista, request.method).observe(duracion)
+        PETICIONES.labels(vista, request.method, response.status_code).inc()
+        CONSULTAS_POR_PETICION.labels(vista).observe(consultas.cantidad)
+        CONSULTAS_DURACION.labels(vista).observe(consultas.segundos)
+
+
+def _registro():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    return registro
+
+
+def _acceso_permitido(request):
+    """IP permitida, token bearer correcto o staff autenticado."""
+    if request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICAS_IPS', ()):
+        return True
+    token = getattr(settings, 'METRICAS_TOKEN', None)
+    tipo, _, credencial = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if token and tipo.lower() == 'bearer' and hmac.compare_digest(credencial.strip().encode(), token.encode()):
+        return True
+    usuario = getattr(request, 'user', None)
+    return bool(usuario and usuario.is_active and usuario.is_staff)
+
+
+def vista_metricas(request):
+    """Métricas de todos los workers en el formato de texto de Prometheus."""
+    if not _acceso_permitido(request):
+        return HttpResponseForbidden('Métricas solo para el scraper interno')
+    return HttpResponse(generate_latest(_registro()), content_type=CONTENT_TYPE_LATEST)
+
+
+def proceso_terminado(pid):
+    """Descarta las métricas en vivo (gauges) de un worker que terminó."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
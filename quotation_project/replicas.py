@@ -0,0 +1,151 @@
+"""
+Lecturas en réplicas de la base de datos
+
+Las escrituras van siempre a `default` (la primaria). Las vistas de solo
+lectura (lista de cotizaciones, list/retrieve de la API, analítica) se marcan
+con `lectura_en_replica` o `LecturaEnReplicaMixin` y, mientras se ejecutan,
+sus consultas se reparten entre los alias de `REPLICAS_LECTURA`.
+
+Para leer lo que uno mismo acaba de escribir, `PrimariaTrasEscrituraMiddleware`
+deja una cookie tras cada POST/PUT/PATCH/DELETE: durante
+`REPLICA_PEGAJOSA_SEGUNDOS` las peticiones de ese navegador leen de la
+primaria aunque la vista esté marcada. También se lee de la primaria dentro
+de una transacción abierta en `default`.
+
+Sin réplicas configuradas todo sigue yendo a `default`.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .asincronia import MiddlewareHibrido
+
+# Cookie que fija las lecturas a la primaria después de una escritura
+COOKIE_PRIMARIA = 'leer_primaria'
+
+_en_replica = ContextVar('lectura_en_replica', default=False)
+_primaria_fijada = ContextVar('primaria_fijada', default=False)
+
+
+def replicas():
+    """Alias de las réplicas configuradas."""
+    return list(getattr(settings, 'REPLICAS_LECTURA', []))
+
+
+def alias_de_lectura():
+    """Alias que usan ahora las lecturas según el contexto de la petición."""
+    candidatas = replicas()
+    if (not candidatas or not _en_replica.get() or _primaria_fijada.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+        return DEFAULT_DB_ALIAS
+    return random.choice(candidatas)
+
+
+class RouterReplicas:
+    """Router de `DATABASE_ROUTERS`: escrituras a la primaria, lecturas según contexto."""
+
+    def db_for_read(self, model, **hints):
+        return alias_de_lectura()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Todas las bases contienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas reciben el esquema por replicación, no por migraciones
+        if db in replicas():
+            return False
+        return None
+
+
+@contextmanager
+def en_replica():
+    """Las lecturas del bloque van a las réplicas (ver `alias_de_lectura`)."""
+    token = _en_replica.set(True)
+    try:
+        yield
+    finally:
+        _en_replica.reset(token)
+
+
+def lectura_en_replica(vista):
+    """
+    Decorador de vistas de solo lectura, síncronas o asíncronas.
+
+    La respuesta se renderiza dentro del contexto para que las consultas
+    perezosas de un TemplateResponse también vayan a la réplica.
+    """
+    if iscoroutinefunction(vista):
+        @wraps(vista)
+        async def envoltura_asincrona(request, *args, **kwargs):
+            with en_replica():
+                respuesta = await vista(request, *args, **kwargs)
+                if hasattr(respuesta, 'render') and not getattr(respuesta, 'is_rendered', True):
+                    await sync_to_async(respuesta.render)()
+                return respuesta
+        return envoltura_asincrona
+
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        with en_replica():
+            respuesta = vista(request, *args, **kwargs)
+            if hasattr(respuesta, 'render') and not getattr(respuesta, 'is_rendered', True):
+                respuesta.render()
+            return respuesta
+    return envoltura
+
+
+class LecturaEnReplicaMixin:
+    """Mixin para ViewSets de DRF: las acciones de `acciones_en_replica` leen de réplicas."""
+
+    acciones_en_replica = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        accion = getattr(self, 'action_map', {}).get(request.method.lower())
+        if accion not in self.acciones_en_replica:
+            return super().dispatch(request, *args, **kwargs)
+        with en_replica():
+            respuesta = super().dispatch(request, *args, **kwargs)
+            if hasattr(respuesta, 'render') and not respuesta.is_rendered:
+                respuesta.render()
+            return respuesta
+
+
+class PrimariaTrasEscrituraMiddleware(MiddlewareHibrido):
+    """Fija las lecturas a la primaria durante un rato después de escribir."""
+
+    METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def procesar(self, request):
+        token = _primaria_fijada.set(COOKIE_PRIMARIA in request.COOKIES)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _primaria_fijada.reset(token)
+        return self._completar(request, respuesta)
+
+    async def aprocesar(self, request):
+        token = _primaria_fijada.set(COOKIE_PRIMARIA in request.COOKIES)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _primaria_fijada.reset(token)
+        return self._completar(request, respuesta)
+
+    def _completar(self, request, respuesta):
+        if request.method not in self.METODOS_SEGUROS and replicas():
+            respuesta.set_cookie(
+                COOKIE_PRIMARIA, '1',
+                max_age=getattr(settings, 'REPLICA_PEGAJOSA_SEGUNDOS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return respuesta
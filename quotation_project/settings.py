@@ -43,8 +43,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quotation_project.metricas.MetricasMiddleware',
+    'quotation_project.consultas.DetectorConsultasMiddleware',
+    'quotation_project.grabacion.GrabadorPeticionesMiddleware',
+    'quotation_project.memoria.PerfilMemoriaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'quotation_project.tiempos.TiemposEtapasMiddleware',
+    'quotation_project.replicas.PrimariaTrasEscrituraMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -92,7 +98,118 @@ DATABASES = {
         'PASSWORD': '123',  # Cambia esto por la contraseña que elegiste
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    },
+    # Réplica de solo lectura (ver quotation_project/replicas.py). En pruebas
+    # locales puede apuntar a la misma base con 'TEST': {'MIRROR': 'default'}.
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.postgresql',
+    #     'NAME': 'crud_quotation',
+    #     'USER': 'quotation_readonly',
+    #     'PASSWORD': '123',
+    #     'HOST': 'replica.localhost',
+    #     'PORT': '5432',
+    #     'TEST': {'MIRROR': 'default'},
+    # },
+}
+
+# Las escrituras van a 'default'; las vistas de solo lectura leen de estos alias
+DATABASE_ROUTERS = ['quotation_project.replicas.RouterReplicas']
+REPLICAS_LECTURA = [alias for alias in DATABASES if alias != 'default']
+
+# Segundos que un navegador lee de la primaria después de escribir
+REPLICA_PEGAJOSA_SEGUNDOS = 10
+
+# Segundos que se cachean las estadísticas del inicio (ver quotations/business_logic/contadores.py)
+ESTADISTICAS_CACHE_SEGUNDOS = 30
+
+# Días sin modificaciones tras los que una cotización se mueve al archivo
+# (ver quotations/business_logic/archivo.py)
+ARCHIVO_ANTIGUEDAD_DIAS = 730
+# Estados cerrados que se archivan: las pendientes y enviadas siguen editables
+ARCHIVO_ESTADOS = ('aprobada',)
+
+# Días que se conservan clientes y cotizaciones eliminados antes de purgarlos
+# (ver quotations/business_logic/eliminacion.py)
+ELIMINADOS_RETENCION_DIAS = 30
+
+# Tiempos por etapa del motor, el PDF y las vistas (ver quotation_project/tiempos.py)
+TIEMPOS_ETAPAS = DEBUG
+# Cabecera Server-Timing con el desglose de cada respuesta
+TIEMPOS_ETAPAS_CABECERA = DEBUG
+# Peticiones más lentas que esto (ms) se registran con nivel WARNING
+TIEMPOS_ETAPAS_LENTO_MS = 500
+
+# Avisos de N+1 y consultas lentas con su plan (ver quotation_project/consultas.py)
+DETECTOR_CONSULTAS = DEBUG
+# Repeticiones de una misma consulta en una petición que se consideran N+1
+DETECTOR_CONSULTAS_REPETIDAS = 5
+# Consultas más lentas que esto (ms) se registran con su EXPLAIN
+DETECTOR_CONSULTAS_LENTA_MS = 100
+
+# Archivo JSONL donde grabar las peticiones para `manage.py reproducir`
+# (None = no grabar; ver quotation_project/grabacion.py)
+GRABACION_ARCHIVO = None
+# Fracción de las peticiones que se graban
+GRABACION_MUESTRA = 1.0
+# Campos cuyo valor se borra al grabar
+GRABACION_CAMPOS_OCULTOS = ('telefono', 'direccion')
+
+# Perfil de memoria de las peticiones con X-Perfil-Memoria: 1
+# (ver quotation_project/memoria.py)
+PERFIL_MEMORIA = DEBUG
+# Sitios de asignación incluidos en el informe
+PERFIL_MEMORIA_TOP = 10
+
+# Peticiones simultáneas idénticas comparten un cálculo o PDF
+# (ver quotation_project/coalescencia.py)
+COALESCENCIA = True
+# Coalescer también entre procesos (bloqueo por clave y caché compartida)
+COALESCENCIA_ENTRE_PROCESOS = False
+# Segundos que el resultado queda en la caché para los otros procesos
+COALESCENCIA_SEGUNDOS = 5
+# Segundos que se espera el cálculo de otra petición antes de calcular aparte
+COALESCENCIA_ESPERA_SEGUNDOS = 30
+# Archivos de bloqueo entre procesos sin PostgreSQL (None = directorio temporal)
+COALESCENCIA_DIRECTORIO = None
+
+# Acceso a /metrics (ver quotation_project/metricas.py): direcciones
+# permitidas sin credenciales y token para `Authorization: Bearer <token>`
+# (None = sin token; el staff autenticado siempre puede consultarlas)
+METRICAS_IPS = ('127.0.0.1', '::1')
+METRICAS_TOKEN = None
+
+# Hilos del pool donde las vistas asíncronas calculan y generan PDF
+# (ver quotation_project/asincronia.py)
+HILOS_CALCULO = 4
+
+# Cálculo en vivo por Server-Sent Events (ver quotations/utils/calculo_en_vivo.py)
+# Milisegundos sin cambios tras los que se recalcula
+EN_VIVO_ESPERA_MS = 150
+# Segundos entre latidos de un canal sin cálculos
+EN_VIVO_LATIDO_SEGUNDOS = 15
+# Canales abiertos por proceso
+EN_VIVO_MAX_CANALES = 200
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'quotation_project.tiempos': {
+            'handlers': ['consola'],
+            'level': 'DEBUG' if DEBUG else 'WARNING',
+        },
+        'quotation_project.consultas': {
+            'handlers': ['consola'],
+            'level': 'DEBUG' if DEBUG else 'WARNING',
+        },
+        'quotation_project.memoria': {
+            'handlers': ['consola'],
+            'level': 'INFO',
+        },
+    },
 }
 
 # Password validation
@@ -0,0 +1,59 @@
+"""
+Configuración de producción.
+
+Parte de `settings.py` y lee de variables de entorno lo que cambia entre
+entornos. Uso:
+
+    DJANGO_SETTINGS_MODULE=quotation_project.settings_produccion
+
+Conexiones a PostgreSQL (ver quotation_project/conexiones.py):
+  - DB_POOL_MAX > 0 activa el pool de psycopg 3 (DB_POOL_MIN, DB_POOL_TIMEOUT)
+  - en otro caso, conexiones persistentes de DB_CONN_MAX_AGE segundos (60 por defecto)
+
+CACHE_URL configura una caché Redis compartida por los workers.
+"""
+
+import os
+
+from .conexiones import base_de_datos_desde_entorno
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, LOGGING
+
+SECRET_KEY = os.environ['SECRET_KEY']
+
+DEBUG = os.environ.get('DEBUG', 'False') == 'True'
+
+ALLOWED_HOSTS = [h for h in os.environ.get('ALLOWED_HOSTS', '').split(',') if h]
+
+# Medir etapas sin exponer la cabecera; las peticiones lentas quedan en el log
+TIEMPOS_ETAPAS = os.environ.get('TIEMPOS_ETAPAS', 'False') == 'True'
+TIEMPOS_ETAPAS_CABECERA = DEBUG
+LOGGING['loggers']['quotation_project.tiempos']['level'] = 'WARNING'
+
+# El detector de N+1 registra cada consulta: solo si DEBUG está activo
+DETECTOR_CONSULTAS = DEBUG
+LOGGING['loggers']['quotation_project.consultas']['level'] = 'WARNING'
+
+# Perfiles de memoria a pedido (X-Perfil-Memoria: 1), desactivados por defecto
+PERFIL_MEMORIA = os.environ.get('PERFIL_MEMORIA', 'False') == 'True'
+
+# Grabar una muestra del tráfico para reproducirlo en local (manage.py reproducir)
+GRABACION_ARCHIVO = os.environ.get('GRABACION_ARCHIVO') or None
+GRABACION_MUESTRA = float(os.environ.get('GRABACION_MUESTRA', '0.1'))
+
+# Caché compartida entre workers (por ejemplo redis://localhost:6379/1, requiere
+# `pip install redis`); sin CACHE_URL cada proceso tiene la suya en memoria
+if os.environ.get('CACHE_URL'):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                          'LOCATION': os.environ['CACHE_URL']}}
+
+# Coalescer cálculos idénticos entre workers: solo con CACHE_URL (ver el aviso
+# quotations.W001 de manage.py check)
+COALESCENCIA_ENTRE_PROCESOS = os.environ.get('COALESCENCIA_ENTRE_PROCESOS', 'False') == 'True'
+
+# /metrics solo para el scraper: token (bearer_token en Prometheus) y, detrás
+# de un proxy, las IP internas que llegan en REMOTE_ADDR
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN') or None
+METRICAS_IPS = tuple(ip for ip in os.environ.get('METRICAS_IPS', '127.0.0.1,::1').split(',') if ip)
+
+DATABASES = {**DATABASES, 'default': base_de_datos_desde_entorno()}
@@ -0,0 +1,236 @@
+"""
+Tiempos por etapa de las operaciones críticas
+
+`etapa(nombre)` es un context manager que mide un tramo de código (cargar el
+YAML, calcular_layout, doc.build, guardar en la base...). Las etapas se
+anidan y cada una acumula su duración en un histograma por nombre, común a
+todo el proceso (worker).
+
+Con TIEMPOS_ETAPAS = False, `etapa()` devuelve siempre el mismo objeto vacío:
+el costo es una llamada y una comprobación, sin leer el reloj.
+
+`TiemposEtapasMiddleware` junta las etapas de cada petición y:
+  - agrega la cabecera Server-Timing (si TIEMPOS_ETAPAS_CABECERA), que las
+    herramientas de desarrollo del navegador muestran en la pestaña de red
+  - registra el desglose en el logger `quotation_project.tiempos` (DEBUG, o
+    WARNING si la petición tardó más de TIEMPOS_ETAPAS_LENTO_MS)
+
+`estadisticas_tiempos()` devuelve los histogramas del worker (los expone
+/api/diagnostico/tiempos/).
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .asincronia import MiddlewareHibrido
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (ms) de los buckets; el último bucket no tiene límite
+LIMITES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_habilitado = False
+_bloqueo = threading.Lock()
+_histogramas = {}
+# Etapas de la petición en curso: (inicio, nombre, profundidad, ms)
+_etapas_peticion = ContextVar('etapas_peticion', default=None)
+_profundidad = ContextVar('profundidad_etapa', default=0)
+
+
+class Histograma:
+    """Duraciones de una etapa agrupadas en los buckets de LIMITES_MS."""
+
+    __slots__ = ('cuentas', 'total', 'suma_ms', 'maximo_ms')
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES_MS) + 1)
+        self.total = 0
+        self.suma_ms = 0.0
+        self.maximo_ms = 0.0
+
+    def registrar(self, ms):
+        self.cuentas[bisect_left(LIMITES_MS, ms)] += 1
+        self.total += 1
+        self.suma_ms += ms
+        if ms > self.maximo_ms:
+            self.maximo_ms = ms
+
+    def percentil(self, p):
+        """Límite superior del bucket donde cae el percentil `p` (0-100)."""
+        objetivo = self.total * p / 100
+        acumulado = 0
+        for limite, cuenta in zip(LIMITES_MS, self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(limite, self.maximo_ms)
+        return self.maximo_ms
+
+    def resumen(self):
+        return {
+            'cuenta': self.total,
+            'suma_ms': round(self.suma_ms, 3),
+            'promedio_ms': round(self.suma_ms / self.total, 3) if self.total else 0,
+            'p50_ms': round(self.percentil(50), 3),
+            'p95_ms': round(self.percentil(95), 3),
+            'maximo_ms': round(self.maximo_ms, 3),
+            'buckets': {
+                **{f'<={limite}': cuenta for limite, cuenta in zip(LIMITES_MS, self.cuentas)},
+                f'>{LIMITES_MS[-1]}': self.cuentas[-1],
+            },
+        }
+
+
+def _registrar(nombre, ms):
+    with _bloqueo:
+        histograma = _histogramas.get(nombre)
+        if histograma is None:
+            histograma = _histogramas[nombre] = Histograma()
+        histograma.registrar(ms)
+
+
+class _Etapa:
+    __slots__ = ('nombre', 'inicio', 'token')
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.token = _profundidad.set(_profundidad.get() + 1)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        ms = (time.perf_counter() - self.inicio) * 1000
+        profundidad = _profundidad.get() - 1
+        _profundidad.reset(self.token)
+        _registrar(self.nombre, ms)
+        etapas = _etapas_peticion.get()
+        if etapas is not None:
+            etapas.append((self.inicio, self.nombre, profundidad, ms))
+        return False
+
+
+class _EtapaVacia:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+_VACIA = _EtapaVacia()
+
+
+def etapa(nombre):
+    """Context manager que mide el bloque como la etapa `nombre`."""
+    if not _habilitado:
+        return _VACIA
+    return _Etapa(nombre)
+
+
+def medido(nombre):
+    """Decorador: mide cada llamada a la función como la etapa `nombre`."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not _habilitado:
+                return funcion(*args, **kwargs)
+            with _Etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def configurar():
+    """Lee TIEMPOS_ETAPAS de settings (lo llama QuotationsConfig.ready)."""
+    global _habilitado
+    _habilitado = bool(getattr(settings, 'TIEMPOS_ETAPAS', False))
+
+
+@receiver(setting_changed)
+def _ajuste_cambiado(sender, setting, **kwargs):
+    if setting == 'TIEMPOS_ETAPAS':
+        configurar()
+
+
+def estadisticas_tiempos():
+    """Histogramas por etapa del proceso actual."""
+    with _bloqueo:
+        etapas = {nombre: h.resumen() for nombre, h in sorted(_histogramas.items())}
+    return {'pid': os.getpid(), 'habilitado': _habilitado, 'limites_ms': LIMITES_MS, 'etapas': etapas}
+
+
+def reiniciar():
+    """Descarta los histogramas acumulados."""
+    with _bloqueo:
+        _histogramas.clear()
+
+
+def _server_timing(etapas, total_ms):
+    # Una entrada por nombre: las etapas repetidas (un lote) se suman
+    acumulado = {}
+    for _, nombre, _, ms in etapas:
+        acumulado[nombre] = acumulado.get(nombre, 0) + ms
+    partes = [f'{nombre};dur={ms:.2f}' for nombre, ms in acumulado.items()]
+    partes.append(f'total;dur={total_ms:.2f}')
+    return ', '.join(partes)
+
+
+class TiemposEtapasMiddleware(MiddlewareHibrido):
+    """Junta las etapas de cada petición y las expone en cabecera y logs."""
+
+    def procesar(self, request):
+        if not _habilitado:
+            return self.get_response(request)
+        etapas = []
+        token = _etapas_peticion.set(etapas)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _etapas_peticion.reset(token)
+        return self._completar(request, response, etapas, inicio)
+
+    async def aprocesar(self, request):
+        if not _habilitado:
+            return await self.get_response(request)
+        etapas = []
+        token = _etapas_peticion.set(etapas)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _etapas_peticion.reset(token)
+        return self._completar(request, response, etapas, inicio)
+
+    def _completar(self, request, response, etapas, inicio):
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        coincidencia = request.resolver_match
+        vista = coincidencia.view_name if coincidencia else 'sin_ruta'
+        _registrar(f'peticion.{vista}', total_ms)
+
+        if getattr(settings, 'TIEMPOS_ETAPAS_CABECERA', False):
+            response['Server-Timing'] = _server_timing(etapas, total_ms)
+
+        lenta = total_ms >= getattr(settings, 'TIEMPOS_ETAPAS_LENTO_MS', 500)
+        nivel = logging.WARNING if lenta else logging.DEBUG
+        if logger.isEnabledFor(nivel):
+            desglose = ''.join(
+                f'\n  {"  " * profundidad}{nombre}: {ms:.2f} ms'
+                for _, nombre, profundidad, ms in sorted(etapas)
+            )
+            logger.log(nivel, '%s %s (%s) %.2f ms%s', request.method, request.path, vista,
+                       total_ms, desglose)
+        return response
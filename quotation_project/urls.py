@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .metricas import vista_metricas
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -28,4 +30,7 @@ urlpatterns = [
 
     # API REST
     path('api/', include('interfaz_crud.urls_api')),
+
+    # Métricas para Prometheus (ver quotation_project/metricas.py)
+    path('metrics', vista_metricas, name='metricas'),
 ]
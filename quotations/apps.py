@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class QuotationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "quotations"
+
+    def ready(self):
+        # Registra los receptores que mantienen los contadores de estadísticas
+        from . import signals  # noqa: F401
+        # Y los que cuentan conexiones abiertas por worker
+        from quotation_project import conexiones  # noqa: F401
+        # Activa (o no) la medición de tiempos por etapa
+        from quotation_project import tiempos
+        tiempos.configurar()
+        # Avisa si la coalescencia entre procesos no tiene caché compartida
+        from django.core import checks
+        from quotation_project import coalescencia
+        checks.register(coalescencia.revisar_configuracion)
@@ -0,0 +1,176 @@
+"""
+Archivo de cotizaciones antiguas
+
+Las cotizaciones cerradas (estado en ARCHIVO_ESTADOS, por defecto solo
+'aprobada') que no se modifican desde hace ARCHIVO_ANTIGUEDAD_DIAS se
+mueven de `quotation` a `quotation_archivo` (CotizacionArchivada), por lotes
+y cada lote en su propia transacción:
+1. Bloquea el lote (las más antiguas primero, saltando filas bloqueadas)
+2. Copia cada cotización con su detalle y su historial empaquetados en JSON
+3. Borra las filas de `quotation` y sus dependientes con DELETE directo
+
+Las pendientes y enviadas no se archivan aunque sean antiguas: las
+archivadas son de solo lectura y ya no se pueden editar ni cambiar de estado.
+
+El borrado no dispara señales: los contadores y el resumen mensual siguen
+contando las cotizaciones archivadas, que solo cambian de tabla.
+
+En PostgreSQL `quotation_archivo` está particionada por mes de
+`fecha_creacion`; antes de insertar se crean las particiones que falten.
+
+La fecha de corte más reciente se guarda en `contador` para que las vistas
+consulten el archivo solo cuando el filtro de fecha cae antes de ella.
+"""
+
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .contadores import CLAVE_CORTE_ARCHIVO
+from .eliminacion import borrar_sin_senales
+from ..models import (
+    CAMPOS_DETALLE, Contador, CotizacionArchivada, Quotation, RevisionCotizacion,
+    TransicionEstado,
+)
+
+# Cotizaciones movidas por transacción
+TAMANO_LOTE_ARCHIVO = 1000
+
+# Columnas que se copian tal cual de Quotation a CotizacionArchivada
+CAMPOS_ARCHIVO = tuple(
+    f.attname for f in CotizacionArchivada._meta.concrete_fields
+    if f.name not in ('detalle', 'historial', 'fecha_archivo')
+)
+
+# Particiones ya creadas por este proceso
+_particiones_creadas = set()
+
+
+def _mes_utc(fecha: datetime) -> date:
+    return fecha.astimezone(dt_timezone.utc).date().replace(day=1)
+
+
+def asegurar_particiones(meses: Iterable[date]) -> None:
+    """Crea en PostgreSQL las particiones mensuales que falten (primer día de cada mes)."""
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for mes in sorted(set(meses) - _particiones_creadas):
+            siguiente = (mes + timedelta(days=32)).replace(day=1)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "quotation_archivo_{mes:%Y%m}" '
+                f'PARTITION OF "quotation_archivo" '
+                f"FOR VALUES FROM ('{mes.isoformat()} 00:00:00+00') "
+                f"TO ('{siguiente.isoformat()} 00:00:00+00')"
+            )
+            _particiones_creadas.add(mes)
+
+
+def _historiales(ids):
+    historial = defaultdict(lambda: {'transiciones': [], 'revisiones': []})
+    transiciones = (TransicionEstado.objects.filter(cotizacion_id__in=ids).order_by('fecha')
+                    .values_list('cotizacion_id', 'estado_anterior', 'estado_nuevo', 'fecha'))
+    for cotizacion_id, anterior, nuevo, fecha in transiciones:
+        historial[cotizacion_id]['transiciones'].append([anterior, nuevo, fecha.isoformat()])
+    revisiones = (RevisionCotizacion.objects.filter(cotizacion_id__in=ids).order_by('numero')
+                  .values_list('cotizacion_id', 'numero', 'es_completa', 'datos', 'fecha'))
+    for cotizacion_id, numero, es_completa, datos, fecha in revisiones:
+        historial[cotizacion_id]['revisiones'].append([numero, es_completa, datos, fecha.isoformat()])
+    return historial
+
+
+@transaction.atomic
+def archivar_lote(corte: datetime, tamano_lote: int = TAMANO_LOTE_ARCHIVO) -> int:
+    """
+    Mueve al archivo hasta `tamano_lote` cotizaciones cerradas (ARCHIVO_ESTADOS)
+    no modificadas desde `corte`.
+
+    Returns:
+        Cantidad de cotizaciones archivadas
+    """
+    cotizaciones = list(
+        Quotation.objects.select_for_update(skip_locked=True, of=('self',))
+        .select_related('detalle')
+        .filter(fecha_modificacion__lt=corte,
+                estado__in=getattr(settings, 'ARCHIVO_ESTADOS', ('aprobada',)))
+        .order_by('fecha_creacion')[:tamano_lote]
+    )
+    if not cotizaciones:
+        return 0
+
+    ids = [c.id for c in cotizaciones]
+    historial = _historiales(ids)
+    asegurar_particiones(_mes_utc(c.fecha_creacion) for c in cotizaciones)
+    ahora = timezone.now()
+    CotizacionArchivada.objects.bulk_create([
+        CotizacionArchivada(
+            **{campo: getattr(c, campo) for campo in CAMPOS_ARCHIVO},
+            detalle={campo: getattr(c, campo) for campo in CAMPOS_DETALLE},
+            historial=historial[c.id],
+            fecha_archivo=ahora,
+        )
+        for c in cotizaciones
+    ], batch_size=TAMANO_LOTE_ARCHIVO)
+
+    # DELETE directo (sin cargar filas ni disparar señales), dependientes primero
+    borrar_sin_senales(Quotation, ids)
+    return len(ids)
+
+
+def registrar_corte(corte: datetime) -> None:
+    """
+    Guarda `corte` (segundos epoch, en `contador`) como fecha de corte del
+    archivo si es más reciente que la actual.
+    """
+    valor = int(corte.timestamp())
+    _, creado = Contador.objects.get_or_create(clave=CLAVE_CORTE_ARCHIVO, defaults={'valor': valor})
+    if not creado:
+        Contador.objects.filter(clave=CLAVE_CORTE_ARCHIVO, valor__lt=valor).update(valor=valor)
+
+
+def obtener_corte() -> Optional[datetime]:
+    """Fecha de corte del último archivado (None si nunca se archivó)."""
+    valor = Contador.objects.filter(clave=CLAVE_CORTE_ARCHIVO).values_list('valor', flat=True).first()
+    return datetime.fromtimestamp(valor, tz=dt_timezone.utc) if valor is not None else None
+
+
+def requiere_archivo(fecha: date) -> bool:
+    """Si un filtro por `fecha` de creación puede incluir cotizaciones archivadas."""
+    corte = obtener_corte()
+    return corte is not None and fecha <= timezone.localdate(corte)
+
+
+def archivar_cotizaciones(dias: Optional[int] = None, tamano_lote: int = TAMANO_LOTE_ARCHIVO,
+                          maximo: Optional[int] = None, pausa: float = 0) -> int:
+    """
+    Archiva, lote a lote, las cotizaciones no modificadas en los últimos `dias`.
+
+    Args:
+        dias: Antigüedad mínima (por defecto settings.ARCHIVO_ANTIGUEDAD_DIAS)
+        tamano_lote: Cotizaciones por transacción
+        maximo: Límite total de cotizaciones a archivar en esta ejecución
+        pausa: Segundos de espera entre lotes para no saturar la base de datos
+
+    Returns:
+        Cantidad de cotizaciones archivadas
+    """
+    if dias is None:
+        dias = getattr(settings, 'ARCHIVO_ANTIGUEDAD_DIAS', 730)
+    corte = timezone.now() - timedelta(days=dias)
+    total = 0
+    while maximo is None or total < maximo:
+        lote = tamano_lote if maximo is None else min(tamano_lote, maximo - total)
+        archivadas = archivar_lote(corte, lote)
+        total += archivadas
+        if archivadas < lote:
+            break
+        if pausa:
+            time.sleep(pausa)
+    if total:
+        registrar_corte(corte)
+    return total
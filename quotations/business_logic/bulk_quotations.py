@@ -0,0 +1,128 @@
+"""
+Creación de cotizaciones en lote
+
+Permite registrar muchas cotizaciones en una sola operación:
+1. Resuelve todos los clientes con una única consulta
+2. Descarta las entradas cuya clave de idempotencia ya fue registrada
+3. Calcula los resultados con una sola instancia de QuotationProcessor
+4. Inserta todo (cotizaciones y su detalle) con bulk_create dentro de una
+   transacción y aplica lo que harían las señales (contadores, resumen mensual, transiciones)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+
+from interfaz_crud.models import Cliente
+from ..forms.quotation_form import armar_datos_cotizacion
+from ..models import Quotation, QuotationDetalle
+from ..signals import cotizaciones_creadas_en_lote
+from .quotation_processor import QuotationProcessor
+
+# Tamaño de cada INSERT múltiple enviado a la base de datos
+TAMANO_LOTE_INSERT = 500
+
+
+def _clave_para(entrada: Dict[str, Any], indice: int, clave_lote: Optional[str]) -> Optional[str]:
+    """Clave de la entrada; si no trae una, se deriva de la clave del lote."""
+    clave = entrada.get('clave_idempotencia')
+    if clave:
+        return clave
+    if clave_lote:
+        return f"{clave_lote}:{indice}"
+    return None
+
+
+def crear_cotizaciones_en_lote(entradas: List[Dict[str, Any]],
+                               clave_lote: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Calcula y guarda un lote de cotizaciones.
+
+    Args:
+        entradas: Lista de diccionarios planos con los mismos campos que
+                  QuotationForm; `cliente` es el id del cliente y
+                  `clave_idempotencia` es opcional.
+        clave_lote: Clave de idempotencia del lote completo (por ejemplo la
+                    cabecera Idempotency-Key). Las entradas sin clave propia
+                    usan "<clave_lote>:<índice>".
+
+    Returns:
+        Diccionario con `success` y, según el caso, `cotizaciones` (una fila
+        por entrada con indice, id, clave_idempotencia y creada) o `errores`.
+    """
+    claves = [_clave_para(e, i, clave_lote) for i, e in enumerate(entradas)]
+
+    # Claves repetidas dentro del mismo lote
+    vistas = set()
+    errores = []
+    for indice, clave in enumerate(claves):
+        if clave is None:
+            continue
+        if clave in vistas:
+            errores.append({'indice': indice, 'error': f'Clave de idempotencia repetida: {clave}'})
+        vistas.add(clave)
+    if errores:
+        return {'success': False, 'errores': errores, 'error_type': 'validation_error'}
+
+    # Entradas ya registradas en un intento anterior
+    existentes = dict(
+        Quotation.todos.filter(clave_idempotencia__in=vistas)
+        .values_list('clave_idempotencia', 'id')
+    ) if vistas else {}
+    pendientes = [i for i, clave in enumerate(claves) if clave not in existentes]
+
+    # Todos los clientes en una sola consulta
+    clientes = Cliente.objects.in_bulk({entradas[i]['cliente'] for i in pendientes})
+    for indice in pendientes:
+        if entradas[indice]['cliente'] not in clientes:
+            errores.append({'indice': indice, 'error': f"No existe el cliente {entradas[indice]['cliente']}"})
+    if errores:
+        return {'success': False, 'errores': errores, 'error_type': 'validation_error'}
+
+    lista_datos = [
+        armar_datos_cotizacion({**entradas[i], 'cliente': clientes[entradas[i]['cliente']]})
+        for i in pendientes
+    ]
+    resultados = QuotationProcessor().calcular_cotizaciones(lista_datos)
+
+    objetos = []
+    for indice, datos, resultado in zip(pendientes, lista_datos, resultados):
+        if not resultado.get('success'):
+            errores.append({'indice': indice, 'error': resultado.get('error')})
+            continue
+        objetos.append(Quotation(
+            clave_idempotencia=claves[indice],
+            **Quotation.campos_desde_resultado(datos, resultado)
+        ))
+    if errores:
+        return {'success': False, 'errores': errores, 'error_type': 'calculation_error'}
+
+    try:
+        with transaction.atomic():
+            creadas = Quotation.objects.bulk_create(objetos, batch_size=TAMANO_LOTE_INSERT)
+            QuotationDetalle.objects.bulk_create(
+                [c.obtener_detalle() for c in creadas], batch_size=TAMANO_LOTE_INSERT
+            )
+            # bulk_create no dispara señales: contadores, resumen y transiciones
+            # se registran aquí, dentro de la misma transacción
+            cotizaciones_creadas_en_lote(creadas)
+    except IntegrityError:
+        # Otro intento concurrente del mismo lote registró las claves primero
+        return {
+            'success': False,
+            'errores': [{'indice': None, 'error': 'El lote se está procesando en otra solicitud, reintente'}],
+            'error_type': 'conflict'
+        }
+
+    ids_creados = dict(zip(pendientes, (c.id for c in creadas)))
+    cotizaciones = []
+    for indice, clave in enumerate(claves):
+        creada = indice in ids_creados
+        cotizaciones.append({
+            'indice': indice,
+            'id': ids_creados[indice] if creada else existentes[clave],
+            'clave_idempotencia': clave,
+            'creada': creada,
+        })
+
+    return {'success': True, 'cotizaciones': cotizaciones}
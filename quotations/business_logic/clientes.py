@@ -0,0 +1,47 @@
+"""
+Búsqueda de clientes para el autocompletado
+
+El formulario de cotización ya no lista todos los clientes: el navegador
+pide a /api/clientes/autocompletar/ los que empiezan por lo escrito. La
+búsqueda es por prefijo de nombre o correo (índices UPPER(...)
+text_pattern_ops en PostgreSQL, ver interfaz_crud/migrations/0007) y los
+resultados se ordenan por la última cotización del cliente.
+"""
+
+from typing import Dict, List
+
+from django.db.models import F, Max, OuterRef, Q, Subquery
+
+from interfaz_crud.models import Cliente
+from ..models import Quotation
+
+# Resultados devueltos por defecto y como máximo
+LIMITE_POR_DEFECTO = 10
+LIMITE_MAXIMO = 50
+
+
+def buscar_clientes(texto: str, limite: int = LIMITE_POR_DEFECTO) -> List[Dict]:
+    """
+    Clientes cuyo nombre o correo empieza por `texto`.
+
+    Args:
+        texto: Prefijo buscado (sin distinguir mayúsculas)
+        limite: Cantidad máxima de resultados (se acota a LIMITE_MAXIMO)
+
+    Returns:
+        Lista de {id, nombre, correo}, primero los de actividad más reciente
+    """
+    texto = texto.strip()
+    if not texto:
+        return []
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    # Última cotización del cliente (índice cliente + fecha_creacion)
+    ultima = (Quotation.objects.filter(cliente=OuterRef('pk')).order_by()
+              .values('cliente').annotate(m=Max('fecha_creacion')).values('m'))
+    clientes = (Cliente.objects
+                .filter(Q(nombre__istartswith=texto) | Q(correo__istartswith=texto))
+                .annotate(ultima_actividad=Subquery(ultima))
+                .order_by(F('ultima_actividad').desc(nulls_last=True), 'nombre')
+                .values('id', 'nombre', 'correo')[:limite])
+    return list(clientes)
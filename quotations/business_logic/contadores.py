@@ -0,0 +1,180 @@
+"""
+Contadores de estadísticas
+
+Mantiene la tabla `contador` con los totales que muestra la página de inicio
+(clientes, cotizaciones, cotizaciones por estado y por mes). Los valores se
+ajustan con deltas desde las señales de los modelos, y la lectura se guarda en
+caché por unos segundos, de modo que el inicio no depende del tamaño de las
+tablas.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from quotation_project.metricas import obtener_o_calcular
+from ..models import Contador, CotizacionArchivada, Quotation
+
+CLAVE_CLIENTES = 'clientes'
+CLAVE_COTIZACIONES = 'cotizaciones'
+CACHE_KEY = 'quotations:estadisticas_inicio'
+
+# Clave que usa business_logic/archivo.py; no es un contador de estadísticas
+CLAVE_CORTE_ARCHIVO = 'archivo:corte'
+
+# Meses (incluido el actual) que se muestran en el desglose mensual
+MESES_EN_INICIO = 6
+
+
+def clave_estado(estado: str) -> str:
+    """Clave del contador de cotizaciones en un estado."""
+    return f'cotizaciones:estado:{estado}'
+
+
+def clave_mes(fecha) -> str:
+    """Clave del contador de cotizaciones creadas en el mes de `fecha`."""
+    return f'cotizaciones:mes:{timezone.localtime(fecha):%Y-%m}'
+
+
+def ajustar_contadores(deltas: Dict[str, int]) -> None:
+    """
+    Suma cada delta a su contador con un UPDATE ... SET valor = valor + delta.
+
+    Se ejecuta dentro de la transacción de quien modifica los datos, así que el
+    contador queda consistente con la fila. La caché se invalida al confirmar.
+    """
+    for clave, delta in deltas.items():
+        if not delta:
+            continue
+        if not Contador.objects.filter(clave=clave).update(valor=F('valor') + delta):
+            Contador.objects.get_or_create(clave=clave)
+            Contador.objects.filter(clave=clave).update(valor=F('valor') + delta)
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def deltas_cotizacion(cotizacion: Quotation, signo: int) -> Dict[str, int]:
+    """Deltas que produce crear (signo=1) o eliminar (signo=-1) una cotización."""
+    return {
+        CLAVE_COTIZACIONES: signo,
+        clave_estado(cotizacion.estado): signo,
+        clave_mes(cotizacion.fecha_creacion): signo,
+    }
+
+
+def registrar_cotizaciones_creadas(cotizaciones: Iterable[Quotation]) -> None:
+    """
+    Ajusta los contadores tras un bulk_create, que no dispara señales.
+
+    Agrupa los deltas para hacer un solo UPDATE por contador afectado.
+    """
+    deltas = Counter()
+    for cotizacion in cotizaciones:
+        deltas.update(deltas_cotizacion(cotizacion, 1))
+    ajustar_contadores(deltas)
+
+
+def registrar_cotizaciones_eliminadas(filas: Iterable[Dict]) -> None:
+    """
+    Resta un lote de cotizaciones eliminadas con un UPDATE por contador.
+
+    Args:
+        filas: Valores de cada cotización (al menos estado y fecha_creacion)
+    """
+    deltas = Counter()
+    for fila in filas:
+        deltas.update({
+            CLAVE_COTIZACIONES: -1,
+            clave_estado(fila['estado']): -1,
+            clave_mes(fila['fecha_creacion']): -1,
+        })
+    ajustar_contadores(deltas)
+
+
+def _meses_recientes(cantidad: int):
+    """Lista de (año, mes) desde el mes actual hacia atrás."""
+    hoy = timezone.localtime()
+    anio, mes = hoy.year, hoy.month
+    meses = []
+    for _ in range(cantidad):
+        meses.append((anio, mes))
+        mes -= 1
+        if mes == 0:
+            anio, mes = anio - 1, 12
+    return meses
+
+
+def _leer_estadisticas() -> Dict:
+    meses = _meses_recientes(MESES_EN_INICIO)
+    claves_mes = {f'cotizaciones:mes:{anio:04d}-{mes:02d}': (anio, mes) for anio, mes in meses}
+    claves_estado = {clave_estado(estado): estado for estado, _ in Quotation.ESTADO_CHOICES}
+
+    valores = dict(
+        Contador.objects.filter(
+            clave__in=[CLAVE_CLIENTES, CLAVE_COTIZACIONES, *claves_estado, *claves_mes]
+        ).values_list('clave', 'valor')
+    )
+
+    por_mes = [
+        {'anio': anio, 'mes': mes, 'total': valores.get(clave, 0)}
+        for clave, (anio, mes) in claves_mes.items()
+    ]
+    return {
+        'total_clientes': valores.get(CLAVE_CLIENTES, 0),
+        'total_cotizaciones': valores.get(CLAVE_COTIZACIONES, 0),
+        'cotizaciones_mes': por_mes[0]['total'],
+        'cotizaciones_por_estado': [
+            {'estado': estado, 'nombre': nombre, 'total': valores.get(clave_estado(estado), 0)}
+            for estado, nombre in Quotation.ESTADO_CHOICES
+        ],
+        'cotizaciones_por_mes': list(reversed(por_mes)),
+    }
+
+
+def obtener_estadisticas() -> Dict:
+    """
+    Estadísticas del inicio leídas de los contadores (una consulta como máximo).
+
+    Returns:
+        dict con total_clientes, total_cotizaciones, cotizaciones_mes,
+        cotizaciones_por_estado y cotizaciones_por_mes
+    """
+    ttl = getattr(settings, 'ESTADISTICAS_CACHE_SEGUNDOS', 30)
+    return obtener_o_calcular('estadisticas', CACHE_KEY, _leer_estadisticas, ttl)
+
+
+@transaction.atomic
+def recalcular_contadores() -> Dict[str, int]:
+    """
+    Reconstruye todos los contadores desde las tablas (operación costosa).
+
+    Útil tras cargas masivas con SQL directo o para corregir desviaciones.
+
+    Returns:
+        dict con los valores escritos
+    """
+    from interfaz_crud.models import Cliente
+
+    # Las cotizaciones archivadas siguen contando (ver business_logic/archivo.py)
+    valores = Counter({CLAVE_CLIENTES: Cliente.objects.count()})
+    for modelo in (Quotation, CotizacionArchivada):
+        valores[CLAVE_COTIZACIONES] += modelo.objects.count()
+        for fila in modelo.objects.order_by().values('estado').annotate(total=Count('id')):
+            valores[clave_estado(fila['estado'])] += fila['total']
+        por_mes = (modelo.objects.order_by()
+                   .annotate(mes=TruncMonth('fecha_creacion'))
+                   .values('mes').annotate(total=Count('id')))
+        for fila in por_mes:
+            valores[clave_mes(fila['mes'])] += fila['total']
+    valores = dict(valores)
+
+    # La fecha de corte del archivo también vive en `contador` y se conserva
+    Contador.objects.exclude(clave=CLAVE_CORTE_ARCHIVO).delete()
+    Contador.objects.bulk_create([Contador(clave=k, valor=v) for k, v in valores.items()])
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+    return valores
@@ -0,0 +1,249 @@
+"""
+Datos sintéticos de clientes y cotizaciones
+
+Genera clientes y cotizaciones con distribuciones parecidas a las reales y
+deterministas a partir de una semilla (la misma semilla sobre la misma base
+produce siempre los mismos datos):
+
+- Clientes con actividad desigual: pocos clientes concentran muchas
+  cotizaciones (pesos tipo Zipf).
+- Medidas log-normales alrededor de 4 cm; las marquillas por pliego salen
+  de cuántas caben en un pliego de 50 x 35 cm.
+- Espesor, cantidad y estado con pesos fijos; solo una parte de las
+  cotizaciones lleva costos de armado u otros materiales.
+- Fechas de creación repartidas en los últimos `dias` días, con las
+  transiciones de estado (creación, envío, aprobación) en orden.
+
+`sembrar()` calcula los resultados con el motor por lotes y los inserta sin
+pasar por las señales: COPY en PostgreSQL y bulk_create en otras bases.
+Al terminar reconstruye contadores y resumen mensual una sola vez. Lo usan
+`python manage.py seed` y los benchmarks (quotations/utils/benchmark.py).
+"""
+
+import csv
+import io
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from interfaz_crud.models import Cliente
+from ..forms.quotation_form import armar_datos_cotizacion
+from ..models import CAMPOS_DETALLE, Quotation, QuotationDetalle, TransicionEstado
+from .contadores import recalcular_contadores
+from .quotation_processor import QuotationProcessor
+from .resumen_mensual import reconstruir_resumen
+
+# Cotizaciones calculadas e insertadas por lote
+TAMANO_LOTE_SIEMBRA = 5000
+
+ESPESORES = ['2_mm', '3_mm', '1.5_mm', '1_mm', '1.2_mm', '5_mm']
+PESOS_ESPESOR = [45, 20, 12, 10, 8, 5]
+
+CANTIDADES = [100, 250, 500, 1000, 2000, 5000, 10000, 20000]
+PESOS_CANTIDAD = [8, 14, 20, 24, 14, 10, 6, 4]
+
+ESTADOS = ['pendiente', 'enviada', 'aprobada']
+PESOS_ESTADO = [45, 30, 25]
+
+CAMPOS_ARMADO = ['bolsa_individual', 'sellada', 'cortada', 'empaque_final',
+                 'llenada_gel', 'pin_soporte', 'samblasted']
+CAMPOS_OTROS = ['mo_rubber', 'numero_plotter', 'perforada', 'guillotina']
+
+# Pliego en el que se acomodan las marquillas (cm)
+PLIEGO_ANCHO_CM = 50
+PLIEGO_ALTO_CM = 35
+
+
+def generar_clientes(cantidad: int, semilla: int = 0, desde: int = 0) -> List[Cliente]:
+    """Clientes sin guardar; `desde` desplaza la numeración para no repetir correos."""
+    return [
+        Cliente(nombre=f'Cliente sintético {semilla}-{i}',
+                correo=f'sintetico-{semilla}-{i}@ejemplo.com')
+        for i in range(desde, desde + cantidad)
+    ]
+
+
+def _costos_opcionales(azar: random.Random, campos: List[str], probabilidad: float) -> Dict[str, float]:
+    if azar.random() >= probabilidad:
+        return {}
+    return {campo: float(azar.randint(5, 80)) for campo in campos if azar.random() < 0.4}
+
+
+def generar_entradas(cantidad: int, clientes_ids: List[int], semilla: int = 0) -> List[Dict[str, Any]]:
+    """Entradas con los campos de QuotationForm (`cliente` es el id)."""
+    azar = random.Random(semilla)
+    pesos_clientes = list(accumulate(1 / (i + 1) ** 0.8 for i in range(len(clientes_ids))))
+    clientes = azar.choices(clientes_ids, cum_weights=pesos_clientes, k=cantidad)
+    entradas = []
+    for cliente in clientes:
+        ancho = round(min(max(azar.lognormvariate(1.386, 0.45), 0.5), 30), 1)
+        alto = round(min(max(azar.lognormvariate(1.386, 0.45), 0.5), 30), 1)
+        espacio = azar.choice([0.3, 0.5, 0.5, 0.5, 1.0])
+        entradas.append({
+            'cliente': cliente,
+            'ancho_cm': ancho,
+            'alto_cm': alto,
+            'espacio_entre_cm': espacio,
+            'cantidad_horizontal': max(1, int(PLIEGO_ANCHO_CM // (ancho + espacio))),
+            'cantidad_vertical': max(1, int(PLIEGO_ALTO_CM // (alto + espacio))),
+            'cantidad': azar.choices(CANTIDADES, weights=PESOS_CANTIDAD)[0],
+            'valor_por_troquelada': float(azar.randint(60, 250)),
+            'montaje': float(azar.randrange(200, 1550, 50)),
+            'medida': float(azar.randrange(100, 650, 25)),
+            'espesor': azar.choices(ESPESORES, weights=PESOS_ESPESOR)[0],
+            **_costos_opcionales(azar, CAMPOS_ARMADO, 0.35),
+            **_costos_opcionales(azar, CAMPOS_OTROS, 0.2),
+        })
+    return entradas
+
+
+def _historial(azar: random.Random, creada, estado: str, ahora) -> List[tuple]:
+    """Transiciones (anterior, nuevo, fecha) que llevan a `estado`, sin pasar de `ahora`."""
+    transiciones = [(None, 'pendiente', creada)]
+    fecha = creada
+    for anterior, nuevo in (('pendiente', 'enviada'), ('enviada', 'aprobada')):
+        if ESTADOS.index(estado) < ESTADOS.index(nuevo):
+            break
+        fecha = min(fecha + timedelta(hours=azar.expovariate(1 / 30)), ahora)
+        transiciones.append((anterior, nuevo, fecha))
+    return transiciones
+
+
+# Columnas escritas en cada tabla (la clave primaria va aparte)
+COLUMNAS_COTIZACION = [
+    f.attname for f in Quotation._meta.concrete_fields
+    if not f.primary_key and f.attname not in ('clave_idempotencia', 'fecha_eliminacion')
+]
+COLUMNAS_TRANSICION = ['cotizacion_id', 'estado_anterior', 'estado_nuevo', 'fecha']
+
+
+def _copiar(tabla: str, columnas: List[str], filas: Iterable[tuple]) -> None:
+    """Inserta `filas` con COPY ... FROM STDIN (psycopg 3 o psycopg2)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    for fila in filas:
+        # En CSV, un campo vacío sin comillas es NULL
+        escritor.writerow(['' if valor is None else valor for valor in fila])
+    nombres = ', '.join(connection.ops.quote_name(c) for c in columnas)
+    sql = f"COPY {connection.ops.quote_name(tabla)} ({nombres}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        crudo = cursor.cursor
+        if hasattr(crudo, 'copy'):
+            with crudo.copy(sql) as copia:
+                copia.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            crudo.copy_expert(sql, buffer)
+
+
+def _reservar_ids(tabla: str, cantidad: int) -> List[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [tabla, cantidad],
+        )
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def _insertar_con_copy(cotizaciones: List[Dict], detalles: List[Dict], transiciones: List[tuple]) -> None:
+    ids = _reservar_ids(Quotation._meta.db_table, len(cotizaciones))
+    _copiar(Quotation._meta.db_table, ['id'] + COLUMNAS_COTIZACION,
+            ([id_] + [c[col] for col in COLUMNAS_COTIZACION] for id_, c in zip(ids, cotizaciones)))
+    _copiar(QuotationDetalle._meta.db_table, ['cotizacion_id'] + list(CAMPOS_DETALLE),
+            ([id_] + [d[col] for col in CAMPOS_DETALLE] for id_, d in zip(ids, detalles)))
+    _copiar(TransicionEstado._meta.db_table, COLUMNAS_TRANSICION,
+            ((ids[indice],) + resto for indice, *resto in transiciones))
+
+
+def _insertar_con_orm(cotizaciones: List[Dict], detalles: List[Dict], transiciones: List[tuple]) -> None:
+    creadas = Quotation.objects.bulk_create([Quotation(**c) for c in cotizaciones])
+    QuotationDetalle.objects.bulk_create(
+        [QuotationDetalle(cotizacion_id=c.pk, **d) for c, d in zip(creadas, detalles)]
+    )
+    TransicionEstado.objects.bulk_create([
+        TransicionEstado(cotizacion_id=creadas[indice].pk, estado_anterior=anterior,
+                         estado_nuevo=nuevo, fecha=fecha)
+        for indice, anterior, nuevo, fecha in transiciones
+    ])
+
+
+@contextmanager
+def _fechas_manuales():
+    """Desactiva auto_now/auto_now_add para que bulk_create respete las fechas históricas."""
+    campos = [Quotation._meta.get_field('fecha_creacion'), Quotation._meta.get_field('fecha_modificacion')]
+    anteriores = [(c.auto_now, c.auto_now_add) for c in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, (auto_now, auto_now_add) in zip(campos, anteriores):
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def sembrar(clientes: int, cotizaciones: int, semilla: int = 0,
+            tamano_lote: int = TAMANO_LOTE_SIEMBRA, dias: int = 365,
+            usar_copy: Optional[bool] = None,
+            progreso: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Crea `clientes` clientes y `cotizaciones` cotizaciones repartidas entre
+    ellos (entre los clientes existentes si `clientes` es 0).
+
+    Args:
+        dias: Las fechas de creación caen en los últimos `dias` días
+        usar_copy: Insertar con COPY (por defecto, solo en PostgreSQL)
+        progreso: Función (insertadas, total) llamada después de cada lote
+
+    Returns:
+        Diccionario con la cantidad de clientes y cotizaciones creadas
+    """
+    if usar_copy is None:
+        usar_copy = connection.vendor == 'postgresql'
+    insertar = _insertar_con_copy if usar_copy else _insertar_con_orm
+    azar = random.Random(semilla)
+    ahora = timezone.now()
+    procesador = QuotationProcessor()
+
+    creados = Cliente.objects.bulk_create(
+        generar_clientes(clientes, semilla, desde=Cliente.todos.count()), batch_size=tamano_lote
+    )
+    ids = [c.pk for c in creados] or list(Cliente.objects.values_list('pk', flat=True))
+    if cotizaciones and not ids:
+        raise ValueError('No hay clientes a los que asignar las cotizaciones')
+
+    insertadas = 0
+    with _fechas_manuales():
+        for inicio in range(0, cotizaciones, tamano_lote):
+            entradas = generar_entradas(min(tamano_lote, cotizaciones - inicio), ids, semilla + inicio)
+            lista_datos = [armar_datos_cotizacion({**e, 'cliente': None}) for e in entradas]
+            resultados = procesador.calcular_cotizaciones(lista_datos)
+
+            # Filas como diccionarios y tuplas: sin instancias de modelo en el camino de COPY
+            filas, detalles, transiciones = [], [], []
+            for entrada, datos, resultado in zip(entradas, lista_datos, resultados):
+                if not resultado.get('success'):
+                    continue
+                campos = Quotation.campos_desde_resultado(datos, resultado)
+                detalles.append({nombre: campos.pop(nombre) for nombre in CAMPOS_DETALLE})
+                campos.pop('cliente')
+                creada = ahora - timedelta(seconds=azar.uniform(0, dias * 86400))
+                estado = azar.choices(ESTADOS, weights=PESOS_ESTADO)[0]
+                historial = _historial(azar, creada, estado, ahora)
+                transiciones.extend((len(filas),) + paso for paso in historial)
+                filas.append({**campos, 'cliente_id': entrada['cliente'], 'estado': estado,
+                              'fecha_creacion': creada, 'fecha_modificacion': historial[-1][2]})
+            with transaction.atomic():
+                insertar(filas, detalles, transiciones)
+            insertadas += len(filas)
+            if progreso:
+                progreso(insertadas, cotizaciones)
+
+    # Las inserciones no pasan por las señales: se reconstruye todo una vez
+    recalcular_contadores()
+    reconstruir_resumen()
+    return {'clientes': len(creados), 'cotizaciones': insertadas}
@@ -0,0 +1,154 @@
+"""
+Eliminación de clientes y cotizaciones
+
+Eliminar es un borrado lógico: un UPDATE marca `fecha_eliminacion` y en la
+misma transacción se resta lo que las filas aportaban a los contadores y al
+resumen mensual. Los managers por defecto (`objects`) dejan de devolverlas.
+Eliminar un cliente no carga sus cotizaciones: se marcan con otro UPDATE y los
+totales a restar se calculan con consultas agrupadas.
+
+El borrado físico lo hace purgar_eliminados() (comando purgar_eliminados)
+pasados ELIMINADOS_RETENCION_DIAS, por lotes acotados de
+DELETE ... WHERE id IN (...), sin instanciar modelos ni disparar señales.
+"""
+
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from interfaz_crud.models import Cliente
+from ..models import CotizacionArchivada, Quotation, ResumenMensual
+from . import contadores, resumen_mensual
+
+# Filas borradas por transacción al purgar
+TAMANO_LOTE_PURGA = 1000
+
+
+def borrar_sin_senales(modelo, ids: List) -> None:
+    """
+    Borra las filas `ids` de `modelo` y, antes, las que dependen de ellas
+    en cascada, con DELETE directos (sin cargar instancias ni disparar señales).
+    """
+    for relacion in modelo._meta.related_objects:
+        if relacion.on_delete is not models.CASCADE:
+            continue
+        relacionadas = relacion.related_model._base_manager.filter(
+            **{f'{relacion.field.name}__in': ids}
+        )
+        if relacion.related_model._meta.related_objects:
+            dependientes = list(relacionadas.values_list('pk', flat=True))
+            if dependientes:
+                borrar_sin_senales(relacion.related_model, dependientes)
+        else:
+            relacionadas._raw_delete(relacionadas.db)
+    filas = modelo._base_manager.filter(pk__in=ids)
+    filas._raw_delete(filas.db)
+
+
+@transaction.atomic
+def eliminar_cotizaciones(ids: Iterable[int]) -> int:
+    """
+    Marca como eliminadas las cotizaciones `ids` que sigan activas.
+
+    Returns:
+        Cantidad de cotizaciones eliminadas
+    """
+    filas = list(
+        Quotation.objects.select_for_update(of=('self',))
+        .filter(id__in=list(ids))
+        .values('id', *Quotation.CAMPOS_SEGUIDOS)
+    )
+    if not filas:
+        return 0
+    Quotation.objects.filter(id__in=[f['id'] for f in filas]).update(fecha_eliminacion=timezone.now())
+    contadores.registrar_cotizaciones_eliminadas(filas)
+    resumen_mensual.registrar_eliminaciones(filas)
+    return len(filas)
+
+
+@transaction.atomic
+def eliminar_cliente(cliente_id: int) -> bool:
+    """
+    Marca como eliminados el cliente y todas sus cotizaciones.
+
+    Returns:
+        False si el cliente no existe o ya estaba eliminado
+    """
+    # El bloqueo impide crear cotizaciones del cliente mientras tanto
+    if not Cliente.objects.select_for_update().filter(pk=cliente_id).exists():
+        return False
+
+    # Lo que aportan sus cotizaciones (activas y archivadas) a los contadores
+    deltas = Counter({contadores.CLAVE_CLIENTES: -1})
+    for modelo in (Quotation, CotizacionArchivada):
+        cotizaciones = modelo.objects.filter(cliente_id=cliente_id).order_by()
+        for fila in cotizaciones.values('estado').annotate(total=Count('id')):
+            deltas[contadores.CLAVE_COTIZACIONES] -= fila['total']
+            deltas[contadores.clave_estado(fila['estado'])] -= fila['total']
+        por_mes = cotizaciones.annotate(mes=TruncMonth('fecha_creacion')).values('mes').annotate(total=Count('id'))
+        for fila in por_mes:
+            deltas[contadores.clave_mes(fila['mes'])] -= fila['total']
+
+    ahora = timezone.now()
+    Quotation.objects.filter(cliente_id=cliente_id).update(fecha_eliminacion=ahora)
+    Cliente.objects.filter(pk=cliente_id).update(fecha_eliminacion=ahora)
+    ResumenMensual.objects.filter(cliente_id=cliente_id).delete()
+    contadores.ajustar_contadores(deltas)
+    return True
+
+
+def _purgar_por_lotes(queryset, modelo, tamano_lote: int, pausa: float) -> int:
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.values_list('pk', flat=True)[:tamano_lote])
+            if ids:
+                borrar_sin_senales(modelo, ids)
+        total += len(ids)
+        if len(ids) < tamano_lote:
+            return total
+        if pausa:
+            time.sleep(pausa)
+
+
+def purgar_eliminados(dias: Optional[int] = None, tamano_lote: int = TAMANO_LOTE_PURGA,
+                      pausa: float = 0) -> Dict[str, int]:
+    """
+    Borra físicamente lo eliminado hace más de `dias`, por lotes.
+
+    Primero las cotizaciones, luego las archivadas de clientes eliminados y al
+    final los clientes, de modo que cada DELETE afecta a pocas filas.
+
+    Args:
+        dias: Retención (por defecto settings.ELIMINADOS_RETENCION_DIAS)
+        tamano_lote: Filas por transacción
+        pausa: Segundos de espera entre lotes
+
+    Returns:
+        dict con la cantidad de cotizaciones, archivadas y clientes borrados
+    """
+    if dias is None:
+        dias = getattr(settings, 'ELIMINADOS_RETENCION_DIAS', 30)
+    limite = timezone.now() - timedelta(days=dias)
+
+    return {
+        'cotizaciones': _purgar_por_lotes(
+            Quotation.todos.filter(fecha_eliminacion__lt=limite).order_by('fecha_eliminacion'),
+            Quotation, tamano_lote, pausa,
+        ),
+        'archivadas': _purgar_por_lotes(
+            CotizacionArchivada.todos.filter(cliente__fecha_eliminacion__lt=limite).order_by(),
+            CotizacionArchivada, tamano_lote, pausa,
+        ),
+        'clientes': _purgar_por_lotes(
+            Cliente.todos.filter(fecha_eliminacion__lt=limite).order_by('fecha_eliminacion'),
+            Cliente, tamano_lote, pausa,
+        ),
+    }
@@ -0,0 +1,104 @@
+"""
+Analítica del embudo de cotizaciones
+
+Calcula, a partir del registro `transicion_estado`, las tasas de conversión
+pendiente → enviada → aprobada y los percentiles del tiempo que las
+cotizaciones permanecen en cada estado.
+
+La cohorte son las cotizaciones creadas en el rango de fechas pedido. La
+duración de cada estado se obtiene en la base de datos con la función de
+ventana LEAD(fecha) OVER (PARTITION BY cotizacion ORDER BY fecha). El
+resultado se cachea hasta el final del día.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from statistics import quantiles
+from typing import Dict, List, Optional
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import Lead
+from django.utils import timezone
+
+from quotation_project.metricas import obtener_o_calcular
+from ..models import Quotation, TransicionEstado
+
+# Percentiles reportados del tiempo en cada estado
+PERCENTILES = (50, 90, 95)
+
+# Días que cubre el embudo cuando no se indica rango
+DIAS_POR_DEFECTO = 90
+
+
+def _percentiles(horas: List[float]) -> Dict[str, Optional[float]]:
+    if not horas:
+        return {f'p{p}': None for p in PERCENTILES}
+    if len(horas) == 1:
+        return {f'p{p}': round(horas[0], 2) for p in PERCENTILES}
+    cortes = quantiles(horas, n=100, method='inclusive')
+    return {f'p{p}': round(cortes[p - 1], 2) for p in PERCENTILES}
+
+
+def _tasa(parte: int, total: int) -> Optional[float]:
+    return round(parte / total, 4) if total else None
+
+
+def _calcular_embudo(desde: date, hasta: date) -> Dict:
+    inicio = timezone.make_aware(datetime.combine(desde, time.min))
+    fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
+
+    cohorte = TransicionEstado.objects.filter(
+        estado_anterior__isnull=True, fecha__gte=inicio, fecha__lt=fin,
+        cotizacion__fecha_eliminacion__isnull=True,
+    ).values('cotizacion_id')
+    transiciones = TransicionEstado.objects.filter(cotizacion_id__in=cohorte)
+
+    conteos = transiciones.aggregate(
+        creadas=Count('cotizacion', distinct=True, filter=Q(estado_anterior__isnull=True)),
+        enviadas=Count('cotizacion', distinct=True, filter=Q(estado_nuevo='enviada')),
+        aprobadas=Count('cotizacion', distinct=True, filter=Q(estado_nuevo='aprobada')),
+    )
+
+    # Duración de cada estado: desde que se entra hasta la siguiente transición
+    filas = (transiciones
+             .annotate(siguiente=Window(
+                 expression=Lead('fecha'),
+                 partition_by=[F('cotizacion_id')],
+                 order_by=F('fecha').asc(),
+             ))
+             .values_list('estado_nuevo', 'fecha', 'siguiente'))
+    horas_por_estado = defaultdict(list)
+    for estado, fecha, siguiente in filas:
+        if siguiente is not None:
+            horas_por_estado[estado].append((siguiente - fecha).total_seconds() / 3600)
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        **conteos,
+        'tasa_envio': _tasa(conteos['enviadas'], conteos['creadas']),
+        'tasa_aprobacion': _tasa(conteos['aprobadas'], conteos['enviadas']),
+        'tasa_global': _tasa(conteos['aprobadas'], conteos['creadas']),
+        'horas_en_estado': {
+            estado: {'muestras': len(horas_por_estado[estado]), **_percentiles(horas_por_estado[estado])}
+            for estado, _ in Quotation.ESTADO_CHOICES
+        },
+    }
+
+
+def obtener_embudo(desde: Optional[date] = None, hasta: Optional[date] = None) -> Dict:
+    """
+    Conversión y tiempos del embudo para las cotizaciones creadas entre
+    `desde` y `hasta` (inclusive). Por defecto, los últimos 90 días.
+
+    El resultado se cachea por día: la clave incluye la fecha actual y expira
+    a medianoche.
+    """
+    hoy = timezone.localdate()
+    hasta = hasta or hoy
+    desde = desde or hasta - timedelta(days=DIAS_POR_DEFECTO)
+
+    clave = f'quotations:embudo:{hoy.isoformat()}:{desde.isoformat()}:{hasta.isoformat()}'
+    medianoche = timezone.make_aware(datetime.combine(hoy + timedelta(days=1), time.min))
+    ttl = max(int((medianoche - timezone.now()).total_seconds()), 1)
+    return obtener_o_calcular('embudo', clave, lambda: _calcular_embudo(desde, hasta), ttl)
@@ -0,0 +1,112 @@
+"""
+Cambios de estado de cotizaciones
+
+Aplica el ciclo pendiente → enviada → aprobada → pendiente a un conjunto de
+cotizaciones con una sola sentencia:
+
+    UPDATE quotation
+       SET estado = CASE WHEN estado = 'pendiente' THEN 'enviada' ... END,
+           fecha_modificacion = now
+     WHERE id IN (...)
+
+Las filas se bloquean (SELECT ... FOR UPDATE) antes de actualizarlas, de modo
+que dos clics simultáneos sobre la misma cotización se aplican en orden. Como
+QuerySet.update() no dispara señales, los contadores, el resumen mensual y el
+registro de transiciones se actualizan aquí, en la misma transacción.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from ..models import Quotation, TransicionEstado
+from . import contadores, resumen_mensual
+
+# Siguiente estado dentro del ciclo
+SIGUIENTE_ESTADO = {
+    'pendiente': 'enviada',
+    'enviada': 'aprobada',
+    'aprobada': 'pendiente',
+}
+
+# Estado desde el cual se llega a cada estado del ciclo
+ESTADO_PREVIO = {nuevo: anterior for anterior, nuevo in SIGUIENTE_ESTADO.items()}
+
+
+def cambiar_estados(ids: Iterable[int], estado_destino: Optional[str] = None) -> List[Dict]:
+    """
+    Avanza el estado de varias cotizaciones con un único UPDATE condicional.
+
+    Args:
+        ids: Ids de las cotizaciones
+        estado_destino: Si se indica, solo cambian las cotizaciones que están
+            en el estado previo del ciclo (por ejemplo 'enviada' solo afecta a
+            las pendientes); el resto se reporta como omitida. Si es None,
+            cada cotización avanza a su siguiente estado.
+
+    Returns:
+        Una fila por id con id, nombre_cliente, estado_anterior, estado_nuevo y
+        resultado ('actualizada', 'omitida' o 'no_encontrada').
+    """
+    if estado_destino is not None and estado_destino not in SIGUIENTE_ESTADO:
+        raise ValueError(f'Estado no válido: {estado_destino}')
+    ids = list(dict.fromkeys(int(i) for i in ids))
+
+    with transaction.atomic():
+        filas = {
+            fila['id']: fila
+            for fila in Quotation.objects.select_for_update(of=('self',)).filter(id__in=ids).order_by()
+            .values('id', 'cliente__nombre', *Quotation.CAMPOS_SEGUIDOS)
+        }
+
+        if estado_destino is None:
+            a_cambiar = list(filas)
+            nuevos = {i: SIGUIENTE_ESTADO[filas[i]['estado']] for i in a_cambiar}
+            nuevo_estado = Case(
+                *[When(estado=anterior, then=Value(nuevo)) for anterior, nuevo in SIGUIENTE_ESTADO.items()],
+                default=F('estado'),
+            )
+        else:
+            previo = ESTADO_PREVIO[estado_destino]
+            a_cambiar = [i for i, fila in filas.items() if fila['estado'] == previo]
+            nuevos = {i: estado_destino for i in a_cambiar}
+            nuevo_estado = Value(estado_destino)
+
+        ahora = timezone.now()
+        if a_cambiar:
+            Quotation.objects.filter(id__in=a_cambiar).update(
+                estado=nuevo_estado, fecha_modificacion=ahora
+            )
+
+            deltas = Counter()
+            for i in a_cambiar:
+                deltas[contadores.clave_estado(filas[i]['estado'])] -= 1
+                deltas[contadores.clave_estado(nuevos[i])] += 1
+            contadores.ajustar_contadores(deltas)
+            resumen_mensual.registrar_cambios_de_estado(
+                (filas[i], nuevos[i]) for i in a_cambiar
+            )
+            TransicionEstado.objects.bulk_create([
+                TransicionEstado(cotizacion_id=i, estado_anterior=filas[i]['estado'],
+                                 estado_nuevo=nuevos[i], fecha=ahora)
+                for i in a_cambiar
+            ])
+
+    resultado = []
+    for i in ids:
+        fila = filas.get(i)
+        if fila is None:
+            resultado.append({'id': i, 'nombre_cliente': None, 'estado_anterior': None,
+                              'estado_nuevo': None, 'resultado': 'no_encontrada'})
+        elif i in nuevos:
+            resultado.append({'id': i, 'nombre_cliente': fila['cliente__nombre'],
+                              'estado_anterior': fila['estado'], 'estado_nuevo': nuevos[i],
+                              'resultado': 'actualizada'})
+        else:
+            resultado.append({'id': i, 'nombre_cliente': fila['cliente__nombre'],
+                              'estado_anterior': fila['estado'], 'estado_nuevo': fila['estado'],
+                              'resultado': 'omitida'})
+    return resultado
@@ -11,9 +11,16 @@ Adaptado para funcionar con Django - recibe datos desde requests HTTP
 en lugar de input() de consola.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from quotation_project.metricas import CALCULOS_CORRECTOS, CALCULOS_FALLIDOS
+from quotation_project.tiempos import etapa
 from ..utils.yaml_loader import YAMLConfigLoader
 
+# Campos de entrada de los que depende cada etapa reutilizable (ver
+# calcular_cotizacion con `anterior`). Los costos dependen de todos.
+CAMPOS_LAYOUT = ('ancho_cm', 'alto_cm', 'espacio_entre_cm', 'cantidad_horizontal', 'cantidad_vertical')
+CAMPOS_GRAMOS = CAMPOS_LAYOUT + ('espesor',)
+
 
 class QuotationProcessor:
     """
@@ -28,8 +35,9 @@ class QuotationProcessor:
         Args:
             config_file: Nombre del archivo YAML de configuración
         """
-        self.config_loader = YAMLConfigLoader(config_file)
-        self.config = self.config_loader.load()
+        with etapa('procesador.cargar_config'):
+            self.config_loader = YAMLConfigLoader(config_file)
+            self.config = self.config_loader.load()
 
     def calcular_layout(self, datos: Dict[str, float]) -> Dict[str, float]:
         """
@@ -177,10 +185,16 @@ class QuotationProcessor:
             **{k: round(v, 2) for k, v in precios_venta.items()}
         }
 
-    def calcular_cotizacion(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+    def calcular_cotizacion(self, datos: Dict[str, Any],
+                            anterior: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Método principal que ejecuta el proceso completo de cotización.
 
+        Con `anterior` (un resultado previo de este método) se reutilizan el
+        layout y los gramos si no cambió ninguno de los campos de los que
+        dependen (CAMPOS_LAYOUT, CAMPOS_GRAMOS); los costos se recalculan
+        siempre.
+
         Args:
             datos: Diccionario con todos los datos necesarios:
                 - ancho_cm: float
@@ -194,27 +208,44 @@ class QuotationProcessor:
                 - medida: float
                 - armado: dict con costos de armado
                 - espesor: str (opcional, default "2_mm")
+            anterior: Resultado previo cuyas etapas se pueden reutilizar
 
         Returns:
             Diccionario completo con todos los resultados de la cotización
         """
-        try:
-            # 1. Calcular dimensiones y área del molde
-            dimensiones = self.calcular_layout(datos)
-            area_total = dimensiones['area_total']
-
-            # 2. Calcular gramos según área
-            espesor = datos.get('espesor', '2_mm')
-            gramos = self.calcular_gramos_por_area(area_total, espesor)
+        previos = anterior['datos_entrada'] if anterior and anterior.get('success') else None
 
-            # 3. Calcular costos de producción (incluye base_cif con la fórmula correcta)
-            costos = self.calcular_costos_produccion(
-                datos, area_total, gramos['gramos_total'])
+        def sin_cambios(campos):
+            return previos is not None and all(datos.get(c) == previos.get(c) for c in campos)
 
-            # 4. Obtener costo_por_gramo para mostrar
-            costo_por_gramo = self.config['cotizacion']['constantes']['costo_por_gramo']
+        try:
+            with etapa('procesador.cotizacion'):
+                # 1. Calcular dimensiones y área del molde
+                if sin_cambios(CAMPOS_LAYOUT):
+                    dimensiones = anterior['dimensiones']
+                else:
+                    with etapa('procesador.layout'):
+                        dimensiones = self.calcular_layout(datos)
+                area_total = dimensiones['area_total']
+
+                # 2. Calcular gramos según área
+                espesor = datos.get('espesor', '2_mm')
+                if sin_cambios(CAMPOS_GRAMOS):
+                    gramos = anterior['gramos']
+                else:
+                    with etapa('procesador.gramos'):
+                        gramos = self.calcular_gramos_por_area(area_total, espesor)
+
+                # 3. Calcular costos de producción (incluye base_cif con la fórmula correcta)
+                with etapa('procesador.costos'):
+                    costos = self.calcular_costos_produccion(
+                        datos, area_total, gramos['gramos_total'])
+
+                # 4. Obtener costo_por_gramo para mostrar
+                costo_por_gramo = self.config['cotizacion']['constantes']['costo_por_gramo']
 
             # 5. Retornar resultado completo
+            CALCULOS_CORRECTOS.inc()
             return {
                 'success': True,
                 'dimensiones': dimensiones,
@@ -226,18 +257,37 @@ class QuotationProcessor:
             }
 
         except KeyError as e:
+            CALCULOS_FALLIDOS.inc()
             return {
                 'success': False,
                 'error': f'Falta el campo requerido: {str(e)}',
                 'error_type': 'missing_field'
             }
         except Exception as e:
+            CALCULOS_FALLIDOS.inc()
             return {
                 'success': False,
                 'error': f'Error al calcular cotización: {str(e)}',
                 'error_type': 'calculation_error'
             }
 
+    def calcular_cotizaciones(self, lista_datos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Calcula un lote de cotizaciones reutilizando la configuración ya cargada.
+
+        Evita construir un QuotationProcessor (y leer el YAML) por cada cotización
+        cuando se procesan muchas entradas a la vez (API de lote, seeders, etc.).
+
+        Args:
+            lista_datos: Lista de diccionarios con el mismo formato que
+                         recibe calcular_cotizacion()
+
+        Returns:
+            Lista de resultados en el mismo orden que la entrada
+        """
+        with etapa('procesador.lote'):
+            return [self.calcular_cotizacion(datos) for datos in lista_datos]
+
 
 # Funciones standalone para compatibilidad con scripts legacy
 # (Internamente usan QuotationProcessor)
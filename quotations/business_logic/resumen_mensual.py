@@ -0,0 +1,168 @@
+"""
+Resumen mensual de cotizaciones
+
+Mantiene la tabla `resumen_mensual` con, para cada (mes, estado, cliente), la
+cantidad de cotizaciones y las sumas de `costo_total` y `precio_utilidad_28`.
+
+Cada cambio sobre una cotización se traduce en deltas: restar la fila
+anterior de su grupo y sumar la nueva. Así la analítica mensual lee solo el
+resumen, sin recorrer la tabla `quotation`.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from ..models import CotizacionArchivada, Quotation, ResumenMensual
+
+# Clave de una fila del resumen: (mes, estado, cliente_id). Los deltas de cada
+# grupo se acumulan como [cantidad, costo_total, precio_utilidad_28].
+Grupo = Tuple
+
+
+def _mes(fecha):
+    """Primer día del mes (en la zona horaria del proyecto) de `fecha`."""
+    return timezone.localtime(fecha).date().replace(day=1)
+
+
+def _aporte(valores: Dict) -> Optional[Tuple[Grupo, Tuple[int, float, float]]]:
+    """Grupo y aporte de una cotización a partir de sus valores seguidos."""
+    if valores.get('fecha_creacion') is None or valores.get('cliente_id') is None:
+        return None
+    grupo = (_mes(valores['fecha_creacion']), valores['estado'], valores['cliente_id'])
+    return grupo, (1, valores.get('costo_total') or 0, valores.get('precio_utilidad_28') or 0)
+
+
+def _valores_actuales(cotizacion: Quotation) -> Dict:
+    return {campo: getattr(cotizacion, campo) for campo in Quotation.CAMPOS_SEGUIDOS}
+
+
+def aplicar_deltas(deltas: Dict[Grupo, list]) -> None:
+    """
+    Suma los deltas a sus filas con UPDATE ... SET col = col + delta.
+
+    Crea la fila del grupo si todavía no existe y el delta es una suma. Un
+    delta negativo sin fila significa que el resumen ya se borró (por ejemplo
+    en cascada al eliminar el cliente) y se ignora.
+    """
+    for (mes, estado, cliente_id), (cantidad, costo, precio) in deltas.items():
+        if not cantidad and not costo and not precio:
+            continue
+        actualizacion = {
+            'cantidad_cotizaciones': F('cantidad_cotizaciones') + cantidad,
+            'suma_costo_total': F('suma_costo_total') + costo,
+            'suma_precio_utilidad_28': F('suma_precio_utilidad_28') + precio,
+        }
+        filtro = ResumenMensual.objects.filter(mes=mes, estado=estado, cliente_id=cliente_id)
+        if not filtro.update(**actualizacion) and cantidad > 0:
+            ResumenMensual.objects.get_or_create(mes=mes, estado=estado, cliente_id=cliente_id)
+            filtro.update(**actualizacion)
+
+
+def _acumular(deltas, aporte, signo):
+    if aporte is None:
+        return
+    grupo, (cantidad, costo, precio) = aporte
+    fila = deltas[grupo]
+    fila[0] += signo * cantidad
+    fila[1] += signo * costo
+    fila[2] += signo * precio
+
+
+def registrar_cambio(cotizacion: Quotation, originales: Optional[Dict],
+                     actuales: Optional[Dict] = None) -> None:
+    """
+    Aplica el cambio de una cotización guardada.
+
+    Args:
+        cotizacion: Instancia ya guardada
+        originales: Valores leídos de la BD antes del cambio (None si es nueva)
+        actuales: Valores guardados (por defecto, los de la instancia)
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    _acumular(deltas, _aporte(originales) if originales else None, -1)
+    _acumular(deltas, _aporte(actuales or _valores_actuales(cotizacion)), 1)
+    aplicar_deltas(deltas)
+
+
+def registrar_eliminacion(cotizacion: Quotation) -> None:
+    """Resta una cotización eliminada de su grupo."""
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    # Con only()/defer() los originales pueden no tener todos los campos
+    originales = getattr(cotizacion, '_originales', None) or {}
+    valores = {campo: originales[campo] if campo in originales else getattr(cotizacion, campo)
+               for campo in Quotation.CAMPOS_SEGUIDOS}
+    _acumular(deltas, _aporte(valores), -1)
+    aplicar_deltas(deltas)
+
+
+def registrar_eliminaciones(filas: Iterable[Dict]) -> None:
+    """Resta un lote de cotizaciones eliminadas (valores de CAMPOS_SEGUIDOS)."""
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for valores in filas:
+        _acumular(deltas, _aporte(valores), -1)
+    aplicar_deltas(deltas)
+
+
+def registrar_cambios_de_estado(cambios: Iterable[Tuple[Dict, str]]) -> None:
+    """
+    Aplica cambios de estado hechos con un UPDATE masivo (sin señales).
+
+    Args:
+        cambios: Pares (valores originales de la fila, estado nuevo)
+    """
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for originales, estado_nuevo in cambios:
+        _acumular(deltas, _aporte(originales), -1)
+        _acumular(deltas, _aporte({**originales, 'estado': estado_nuevo}), 1)
+    aplicar_deltas(deltas)
+
+
+def registrar_cotizaciones_creadas(cotizaciones: Iterable[Quotation]) -> None:
+    """Suma un lote insertado con bulk_create (un UPDATE por grupo)."""
+    deltas = defaultdict(lambda: [0, 0.0, 0.0])
+    for cotizacion in cotizaciones:
+        _acumular(deltas, _aporte(_valores_actuales(cotizacion)), 1)
+    aplicar_deltas(deltas)
+
+
+@transaction.atomic
+def reconstruir_resumen() -> int:
+    """
+    Reconstruye todo el resumen con una consulta agrupada por tabla.
+
+    Returns:
+        Cantidad de filas de resumen escritas
+    """
+    # Incluye las cotizaciones archivadas (ver business_logic/archivo.py)
+    totales = defaultdict(lambda: [0, 0.0, 0.0])
+    for modelo in (Quotation, CotizacionArchivada):
+        grupos = (modelo.objects.order_by()
+                  .annotate(mes=TruncMonth('fecha_creacion'))
+                  .values('mes', 'estado', 'cliente_id')
+                  .annotate(cantidad=Count('id'),
+                            costo=Sum('costo_total'),
+                            precio=Sum('precio_utilidad_28')))
+        for g in grupos:
+            fila = totales[(_mes(g['mes']), g['estado'], g['cliente_id'])]
+            fila[0] += g['cantidad']
+            fila[1] += g['costo'] or 0
+            fila[2] += g['precio'] or 0
+    filas = [
+        ResumenMensual(
+            mes=mes,
+            estado=estado,
+            cliente_id=cliente_id,
+            cantidad_cotizaciones=cantidad,
+            suma_costo_total=costo,
+            suma_precio_utilidad_28=precio,
+        )
+        for (mes, estado, cliente_id), (cantidad, costo, precio) in totales.items()
+    ]
+    ResumenMensual.objects.all().delete()
+    ResumenMensual.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
@@ -0,0 +1,128 @@
+"""
+Historial de revisiones de cotizaciones
+
+Al editar una cotización se guardan solo los campos que cambiaron:
+1. En la fila `quotation` se escriben únicamente esas columnas (update_fields)
+2. En `revision_cotizacion` se guarda una revisión con el delta respecto a
+   la versión anterior
+3. Cada REVISIONES_ENTRE_COPIAS revisiones se guarda una copia completa, así
+   reconstruir una versión lee como máximo ese número de filas
+
+El historial se crea al editar por primera vez: la versión 1 es la copia
+completa de la cotización tal como estaba antes de esa edición.
+"""
+
+from typing import Any, Dict, List
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import CAMPOS_DETALLE, Quotation, RevisionCotizacion
+
+# Cada cuántas revisiones se guarda una copia completa
+REVISIONES_ENTRE_COPIAS = 10
+
+# Campos que no forman parte del contenido versionado
+CAMPOS_EXCLUIDOS = {'id', 'estado', 'fecha_creacion', 'fecha_modificacion', 'clave_idempotencia'}
+
+
+def campos_versionados() -> List[str]:
+    """
+    Nombres de atributo (cliente_id en lugar de cliente) de los campos
+    versionados, incluidos los del detalle.
+    """
+    return [
+        f.attname for f in Quotation._meta.concrete_fields
+        if f.name not in CAMPOS_EXCLUIDOS
+    ] + list(CAMPOS_DETALLE)
+
+
+def _normalizar(valores: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte {'cliente': <Cliente>} en {'cliente_id': id}."""
+    valores = dict(valores)
+    if 'cliente' in valores:
+        cliente = valores.pop('cliente')
+        valores['cliente_id'] = getattr(cliente, 'pk', cliente)
+    return valores
+
+
+def _copia(cotizacion: Quotation) -> Dict[str, Any]:
+    return {campo: getattr(cotizacion, campo) for campo in campos_versionados()}
+
+
+@transaction.atomic
+def guardar_con_revision(cotizacion: Quotation, nuevos_valores: Dict[str, Any]) -> List[str]:
+    """
+    Aplica `nuevos_valores` a la cotización escribiendo solo lo que cambió.
+
+    La cotización se vuelve a leer con la fila bloqueada, así que dos
+    ediciones simultáneas quedan como dos revisiones consecutivas.
+
+    Args:
+        cotizacion: Cotización existente
+        nuevos_valores: Valores de campos, por ejemplo los de
+            Quotation.campos_desde_resultado()
+
+    Returns:
+        Lista de campos cambiados (vacía si no hubo cambios y no se guardó nada)
+    """
+    # Bloquea la fila hasta el final de la transacción y compara con lo que
+    # hay en la BD: otra edición simultánea espera y numera después de esta
+    cotizacion.refresh_from_db(from_queryset=Quotation._base_manager.select_for_update())
+
+    valores = _normalizar(nuevos_valores)
+    versionados = set(campos_versionados())
+    cambios = {
+        campo: valor for campo, valor in valores.items()
+        if campo in versionados and getattr(cotizacion, campo) != valor
+    }
+    if not cambios:
+        return []
+
+    ultima = (RevisionCotizacion.objects.filter(cotizacion=cotizacion)
+              .order_by('-numero').values_list('numero', flat=True).first())
+    if ultima is None:
+        # Primera edición: la versión 1 es el estado previo completo
+        RevisionCotizacion.objects.create(
+            cotizacion=cotizacion, numero=1, es_completa=True,
+            datos=_copia(cotizacion), fecha=cotizacion.fecha_modificacion or timezone.now(),
+        )
+        ultima = 1
+
+    for campo, valor in cambios.items():
+        setattr(cotizacion, campo, valor)
+    cotizacion.save(update_fields=[*cambios, 'fecha_modificacion'])
+
+    numero = ultima + 1
+    es_completa = (numero - 1) % REVISIONES_ENTRE_COPIAS == 0
+    RevisionCotizacion.objects.create(
+        cotizacion=cotizacion,
+        numero=numero,
+        es_completa=es_completa,
+        datos=_copia(cotizacion) if es_completa else cambios,
+        fecha=cotizacion.fecha_modificacion,
+    )
+    return list(cambios)
+
+
+def reconstruir_version(cotizacion_id: int, numero: int) -> Dict[str, Any]:
+    """
+    Valores de la cotización en la revisión `numero`.
+
+    Lee la última copia completa hasta `numero` y aplica los deltas
+    posteriores en orden.
+
+    Raises:
+        RevisionCotizacion.DoesNotExist: si la revisión no existe
+    """
+    revisiones = RevisionCotizacion.objects.filter(cotizacion_id=cotizacion_id)
+    base = revisiones.filter(numero__lte=numero, es_completa=True).order_by('-numero').first()
+    if base is None or not revisiones.filter(numero=numero).exists():
+        raise RevisionCotizacion.DoesNotExist(
+            f'La cotización {cotizacion_id} no tiene la revisión {numero}'
+        )
+    datos = dict(base.datos)
+    for delta in (revisiones.filter(numero__gt=base.numero, numero__lte=numero)
+                  .order_by('numero').values_list('datos', flat=True)):
+        datos.update(delta)
+    return datos
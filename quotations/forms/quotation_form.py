@@ -3,24 +3,51 @@ Formularios para la aplicación de cotizaciones
 """
 
 from django import forms
+from django.urls import reverse
 from interfaz_crud.models import Cliente
 
 
+class AutocompletarClienteWidget(forms.Widget):
+    """
+    Buscador de clientes que consulta /api/clientes/autocompletar/.
+
+    Solo renderiza el cliente seleccionado (un campo oculto con su id y el
+    texto visible), nunca la lista completa de clientes.
+    """
+    template_name = 'widgets/cliente_autocompletar.html'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        seleccionado = None
+        if value not in (None, ''):
+            try:
+                seleccionado = Cliente.objects.only('nombre', 'correo').filter(pk=int(value)).first()
+            except (TypeError, ValueError):
+                pass
+        context['widget'].update({
+            'seleccionado': seleccionado,
+            'url_busqueda': reverse('cliente-autocompletar'),
+        })
+        return context
+
+
 class QuotationForm(forms.Form):
     """
     Formulario para recibir datos de cotización desde el frontend.
     """
 
-    # Información del cliente - selector de clientes existentes
+    # Información del cliente - buscador de clientes existentes. Las opciones
+    # se piden al escribir; al validar solo se consulta el id elegido.
     cliente = forms.ModelChoiceField(
         label='Cliente',
-        queryset=Cliente.objects.all().order_by('nombre'),
+        queryset=Cliente.objects.all(),
         required=True,
-        empty_label="Seleccione un cliente",
-        widget=forms.Select(attrs={
-            'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500'
+        error_messages={'invalid_choice': 'Seleccione un cliente válido de la búsqueda.'},
+        widget=AutocompletarClienteWidget(attrs={
+            'class': 'w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500',
+            'placeholder': 'Escriba el nombre o correo del cliente'
         }),
-        help_text='Seleccione el cliente de la lista. Si no existe, créelo primero en el módulo de Clientes.'
+        help_text='Busque el cliente por nombre o correo. Si no existe, créelo primero en el módulo de Clientes.'
     )
 
     # Dimensiones de la marquilla
@@ -249,33 +276,45 @@ class QuotationForm(forms.Form):
         Returns:
             dict: Datos formateados para calcular_cotizacion() incluyendo el cliente
         """
-        cleaned_data = self.cleaned_data
-
-        return {
-            'cliente': cleaned_data['cliente'],  # Instancia del modelo Cliente
-            'ancho_cm': float(cleaned_data['ancho_cm']),
-            'alto_cm': float(cleaned_data['alto_cm']),
-            'espacio_entre_cm': float(cleaned_data['espacio_entre_cm']),
-            'cantidad_horizontal': int(cleaned_data['cantidad_horizontal']),
-            'cantidad_vertical': int(cleaned_data['cantidad_vertical']),
-            'cantidad': int(cleaned_data['cantidad']),
-            'valor_por_troquelada': float(cleaned_data['valor_por_troquelada']),
-            'montaje': float(cleaned_data.get('montaje') or 0),
-            'medida': float(cleaned_data.get('medida') or 0),
-            'espesor': cleaned_data.get('espesor', '2_mm'),
-            'armado': {
-                'bolsa_individual': float(cleaned_data.get('bolsa_individual') or 0),
-                'sellada': float(cleaned_data.get('sellada') or 0),
-                'cortada': float(cleaned_data.get('cortada') or 0),
-                'empaque_final': float(cleaned_data.get('empaque_final') or 0),
-                'llenada_gel': float(cleaned_data.get('llenada_gel') or 0),
-                'pin_soporte': float(cleaned_data.get('pin_soporte') or 0),
-                'samblasted': float(cleaned_data.get('samblasted') or 0),
-            },
-            'otros_materiales': {
-                'mo_rubber': float(cleaned_data.get('mo_rubber') or 0),
-                'numero_plotter': float(cleaned_data.get('numero_plotter') or 0),
-                'perforada': float(cleaned_data.get('perforada') or 0),
-                'guillotina': float(cleaned_data.get('guillotina') or 0),
-            }
+        return armar_datos_cotizacion(self.cleaned_data)
+
+
+def armar_datos_cotizacion(cleaned_data):
+    """
+    Convierte un diccionario plano de campos (form o serializer) al formato
+    anidado que espera QuotationProcessor.calcular_cotizacion().
+
+    Args:
+        cleaned_data (dict): Campos validados con las mismas claves que QuotationForm
+
+    Returns:
+        dict: Datos formateados incluyendo el cliente
+    """
+    return {
+        'cliente': cleaned_data['cliente'],  # Instancia del modelo Cliente
+        'ancho_cm': float(cleaned_data['ancho_cm']),
+        'alto_cm': float(cleaned_data['alto_cm']),
+        'espacio_entre_cm': float(cleaned_data['espacio_entre_cm']),
+        'cantidad_horizontal': int(cleaned_data['cantidad_horizontal']),
+        'cantidad_vertical': int(cleaned_data['cantidad_vertical']),
+        'cantidad': int(cleaned_data['cantidad']),
+        'valor_por_troquelada': float(cleaned_data['valor_por_troquelada']),
+        'montaje': float(cleaned_data.get('montaje') or 0),
+        'medida': float(cleaned_data.get('medida') or 0),
+        'espesor': cleaned_data.get('espesor', '2_mm'),
+        'armado': {
+            'bolsa_individual': float(cleaned_data.get('bolsa_individual') or 0),
+            'sellada': float(cleaned_data.get('sellada') or 0),
+            'cortada': float(cleaned_data.get('cortada') or 0),
+            'empaque_final': float(cleaned_data.get('empaque_final') or 0),
+            'llenada_gel': float(cleaned_data.get('llenada_gel') or 0),
+            'pin_soporte': float(cleaned_data.get('pin_soporte') or 0),
+            'samblasted': float(cleaned_data.get('samblasted') or 0),
+        },
+        'otros_materiales': {
+            'mo_rubber': float(cleaned_data.get('mo_rubber') or 0),
+            'numero_plotter': float(cleaned_data.get('numero_plotter') or 0),
+            'perforada': float(cleaned_data.get('perforada') or 0),
+            'guillotina': float(cleaned_data.get('guillotina') or 0),
         }
+    }
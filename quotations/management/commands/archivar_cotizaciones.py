@@ -0,0 +1,34 @@
+"""
+Comando: python manage.py archivar_cotizaciones [--dias N] [--lote N] [--maximo N] [--pausa S]
+
+Mueve a `quotation_archivo` las cotizaciones cerradas (ARCHIVO_ESTADOS) que
+no se modifican desde hace más de N días (por defecto ARCHIVO_ANTIGUEDAD_DIAS), en lotes de una
+transacción cada uno. Pensado para ejecutarse periódicamente (cron).
+"""
+
+from django.core.management.base import BaseCommand
+
+from quotations.business_logic.archivo import TAMANO_LOTE_ARCHIVO, archivar_cotizaciones
+
+
+class Command(BaseCommand):
+    help = 'Mueve las cotizaciones cerradas antiguas sin modificar al archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Días sin modificar para archivar (por defecto ARCHIVO_ANTIGUEDAD_DIAS)')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_ARCHIVO,
+                            help=f'Cotizaciones por transacción (por defecto {TAMANO_LOTE_ARCHIVO})')
+        parser.add_argument('--maximo', type=int, default=None,
+                            help='Máximo de cotizaciones a archivar en esta ejecución')
+        parser.add_argument('--pausa', type=float, default=0,
+                            help='Segundos de pausa entre lotes')
+
+    def handle(self, *args, **options):
+        total = archivar_cotizaciones(
+            dias=options['dias'],
+            tamano_lote=options['lote'],
+            maximo=options['maximo'],
+            pausa=options['pausa'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{total} cotizaciones archivadas'))
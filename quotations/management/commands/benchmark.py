@@ -0,0 +1,137 @@
+"""
+Comando: python manage.py benchmark [--escenarios a,b] [--filas N] [--lote N]
+                                    [--guardar-base] [--comparar] [--tolerancia 0.15]
+
+Ejecuta los escenarios de quotations/utils/benchmark.py sobre una base de
+datos de prueba (la misma que crea `manage.py test`), sembrada con datos
+sintéticos deterministas:
+
+- cotizacion_individual: el motor con una sola cotización
+- calculo_lote / guardado_lote: un lote de --lote cotizaciones (10 000 por
+  defecto), solo cálculo y cálculo + guardado (este se deshace al terminar)
+- vista_calcular: POST cotizar/ (JSON)
+- vista_lista, vista_lista_ultima: la primera y la última página de
+  cotizaciones/ (50 filas cada una) con --filas cotizaciones en la base
+  (100 000 por defecto); la última recorre todas las filas (COUNT y OFFSET)
+- api_cotizaciones, api_clientes: listas de la API
+- pdf: generar_pdf_cotizacion
+
+--guardar-base escribe los resultados como base de comparación;
+--comparar los contrasta con ella y termina con error si algún escenario
+empeora más que --tolerancia. Con --conservar-bd la base de prueba sembrada
+se reutiliza en la siguiente ejecución.
+
+Los escenarios corren con DEBUG = False y sin la instrumentación del
+proyecto (tiempos por etapa, detector de consultas, perfil de memoria,
+grabación), así que los resultados no dependen de la configuración local.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from quotation_project import tiempos
+from quotations.utils.benchmark import comparar, entorno, escenarios, medir, preparar_datos
+
+RUTA_BASE = Path(settings.BASE_DIR) / 'benchmarks' / 'base.json'
+
+
+class Command(BaseCommand):
+    help = 'Mide latencia, rendimiento y memoria del motor, las vistas, la API y el PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenarios', default='',
+                            help='Escenarios a ejecutar separados por coma (por defecto, todos)')
+        parser.add_argument('--filas', type=int, default=100_000,
+                            help='Cotizaciones en la base de prueba (por defecto 100000)')
+        parser.add_argument('--clientes', type=int, default=5_000,
+                            help='Clientes en la base de prueba (por defecto 5000)')
+        parser.add_argument('--lote', type=int, default=10_000,
+                            help='Tamaño de los escenarios de lote (por defecto 10000)')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de los datos sintéticos (por defecto 0)')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--guardar-base', action='store_true',
+                            help=f'Guardar los resultados como base ({RUTA_BASE})')
+        parser.add_argument('--comparar', action='store_true',
+                            help='Comparar con la base y fallar si hay regresiones')
+        parser.add_argument('--base', default=str(RUTA_BASE),
+                            help='Archivo de la base de comparación')
+        parser.add_argument('--tolerancia', type=float, default=0.15,
+                            help='Empeoramiento aceptado antes de marcar regresión (por defecto 0.15)')
+        parser.add_argument('--conservar-bd', action='store_true',
+                            help='Reutilizar la base de prueba y no borrarla al terminar')
+
+    def handle(self, *args, **options):
+        base = None
+        if options['comparar']:
+            try:
+                base = json.loads(Path(options['base']).read_text())
+            except FileNotFoundError:
+                raise CommandError(f"No existe la base {options['base']}; genérela con --guardar-base")
+
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['conservar_bd'])
+        try:
+            # Sin réplicas (todo se lee de la base de prueba) ni instrumentación:
+            # con DEBUG se guardaría cada consulta y se medirían etapas y memoria
+            with override_settings(REPLICAS_LECTURA=[], DEBUG=False, TIEMPOS_ETAPAS=False,
+                                   DETECTOR_CONSULTAS=False, PERFIL_MEMORIA=False,
+                                   GRABACION_ARCHIVO=None):
+                tiempos.configurar()
+                resultados = self._ejecutar(options)
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0, keepdb=options['conservar_bd'])
+            teardown_test_environment()
+
+        contenido = json.dumps(resultados, indent=2, ensure_ascii=False)
+        if options['salida']:
+            Path(options['salida']).write_text(contenido)
+        if options['guardar_base']:
+            Path(options['base']).parent.mkdir(parents=True, exist_ok=True)
+            Path(options['base']).write_text(contenido)
+            self.stdout.write(self.style.SUCCESS(f"Base guardada en {options['base']}"))
+
+        if base is not None:
+            self._comparar(resultados, base, options['tolerancia'])
+
+    def _ejecutar(self, options):
+        sembradas = preparar_datos(options['filas'], options['clientes'], options['semilla'])
+        if sembradas['cotizaciones']:
+            self.stdout.write(f"Sembradas {sembradas['clientes']} clientes y "
+                              f"{sembradas['cotizaciones']} cotizaciones")
+
+        elegidos = {e for e in options['escenarios'].split(',') if e}
+        disponibles = escenarios(options['lote'], options['semilla'])
+        desconocidos = elegidos - {e.nombre for e in disponibles}
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+        resultados = {'entorno': entorno(), 'escenarios': {}}
+        for escenario in disponibles:
+            if elegidos and escenario.nombre not in elegidos:
+                continue
+            metricas = medir(escenario)
+            resultados['escenarios'][escenario.nombre] = metricas
+            self.stdout.write(
+                f"{escenario.nombre:<22} p50 {metricas['p50_ms']:>10.2f} ms  "
+                f"p95 {metricas['p95_ms']:>10.2f} ms  {metricas['ops_s']:>10} ops/s  "
+                f"pico {metricas['pico_mb']:>8.2f} MB  ({escenario.descripcion})"
+            )
+        return resultados
+
+    def _comparar(self, resultados, base, tolerancia):
+        filas = comparar(resultados, base, tolerancia)
+        regresiones = [f for f in filas if f['regresion']]
+        for fila in filas:
+            texto = (f"{fila['escenario']:<22} {fila['metrica']:<7} {fila['base']:>10} -> "
+                     f"{fila['actual']:>10} ({fila['cambio']:+.1%})")
+            self.stdout.write(self.style.ERROR(texto) if fila['regresion'] else texto)
+        if regresiones:
+            raise CommandError(f'{len(regresiones)} regresiones por encima de {tolerancia:.0%}')
+        self.stdout.write(self.style.SUCCESS('Sin regresiones'))
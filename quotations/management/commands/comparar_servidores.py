@@ -0,0 +1,139 @@
+"""
+Comando: python manage.py comparar_servidores [--concurrencias 1,8,32] [--peticiones 400]
+                                             [--workers 1] [--hilos 8]
+
+Levanta la aplicación con un servidor WSGI y con uvicorn (ASGI) en puertos
+locales, envía a cada uno la misma mezcla de peticiones sintéticas (ver
+quotations/utils/reproduccion.py) con cada concurrencia y compara
+peticiones por segundo, latencia p50/p95/p99 y tasa de error.
+
+  - WSGI: gunicorn con --workers y --hilos hilos por worker si está
+    instalado; si no, el servidor de desarrollo (un hilo por petición).
+  - ASGI: uvicorn con --workers (ver quotation_project/asincronia.py).
+
+Los servidores usan la base de datos configurada (ver manage.py seed), así
+que la mezcla no incluye guardados: solo lee de la base.
+"""
+
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from interfaz_crud.models import Cliente
+from quotations.utils.reproduccion import Reproductor, columnas_latencia, peticiones_sinteticas, resumir
+
+# Segundos de espera a que el servidor acepte conexiones
+ARRANQUE_SEGUNDOS = 30
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _servidores(puerto_wsgi, puerto_asgi, workers, hilos):
+    """nombre -> (argumentos del proceso, puerto)"""
+    if importlib.util.find_spec('uvicorn') is None:
+        raise CommandError('uvicorn no está instalado (pip install uvicorn)')
+    if importlib.util.find_spec('gunicorn') is not None:
+        wsgi = [sys.executable, '-m', 'gunicorn', 'quotation_project.wsgi:application',
+                '--bind', f'127.0.0.1:{puerto_wsgi}', '--workers', str(workers),
+                '--threads', str(hilos), '--log-level', 'warning']
+        nombre_wsgi = f'wsgi (gunicorn {workers}x{hilos} hilos)'
+    else:
+        wsgi = [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{puerto_wsgi}', '--noreload']
+        nombre_wsgi = 'wsgi (runserver)'
+    asgi = [sys.executable, '-m', 'uvicorn', 'quotation_project.asgi:application',
+            '--port', str(puerto_asgi), '--workers', str(workers), '--log-level', 'warning']
+    return {
+        nombre_wsgi: (wsgi, puerto_wsgi),
+        f'asgi (uvicorn {workers} workers)': (asgi, puerto_asgi),
+    }
+
+
+def _esperar(url, proceso):
+    limite = time.monotonic() + ARRANQUE_SEGUNDOS
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise CommandError(f'El servidor terminó al arrancar (código {proceso.returncode})')
+        try:
+            with urlopen(url + '/cotizar/', timeout=2):
+                return
+        except (URLError, OSError):
+            time.sleep(0.2)
+    raise CommandError(f'El servidor no respondió en {ARRANQUE_SEGUNDOS} s')
+
+
+class Command(BaseCommand):
+    help = 'Compara concurrencia y latencia de la aplicación con WSGI y con uvicorn (ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencias', default='1,8,32',
+                            help='Peticiones simultáneas a probar (por defecto 1,8,32)')
+        parser.add_argument('--peticiones', type=int, default=400,
+                            help='Peticiones por concurrencia (por defecto 400)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Procesos de cada servidor (por defecto 1)')
+        parser.add_argument('--hilos', type=int, default=8,
+                            help='Hilos por worker de gunicorn (por defecto 8)')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de las peticiones sintéticas (por defecto 0)')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+
+    def handle(self, *args, **options):
+        try:
+            concurrencias = [int(c) for c in options['concurrencias'].split(',')]
+        except ValueError:
+            raise CommandError('--concurrencias debe ser una lista de enteros separados por coma')
+        ids = list(Cliente.objects.order_by('pk').values_list('pk', flat=True))
+        if not ids:
+            raise CommandError('No hay clientes en la base (ver manage.py seed)')
+        peticiones = peticiones_sinteticas(options['peticiones'], ids, options['semilla'], guardados=False)
+
+        servidores = _servidores(_puerto_libre(), _puerto_libre(), options['workers'], options['hilos'])
+        resultados = {}
+        for nombre, (argumentos, puerto) in servidores.items():
+            self.stdout.write(f'Arrancando {nombre}...')
+            resultados[nombre] = self._medir(argumentos, f'http://127.0.0.1:{puerto}',
+                                             peticiones, concurrencias)
+        self._informar(resultados)
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+    def _medir(self, argumentos, url, peticiones, concurrencias):
+        proceso = subprocess.Popen(argumentos, cwd=settings.BASE_DIR, env=os.environ.copy(),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _esperar(url, proceso)
+            por_concurrencia = {}
+            for concurrencia in concurrencias:
+                reproductor = Reproductor(url, concurrencia)
+                por_concurrencia[concurrencia] = resumir(reproductor.reproducir(peticiones))['total']
+            return por_concurrencia
+        finally:
+            proceso.terminate()
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+
+    def _informar(self, resultados):
+        self.stdout.write(f"{'servidor':<34} {'conc.':>6} {'/s':>8} {'p50 ms':>9} "
+                          f"{'p95 ms':>9} {'p99 ms':>9} {'error':>7}")
+        for nombre, por_concurrencia in resultados.items():
+            for concurrencia, fila in por_concurrencia.items():
+                texto = (f"{nombre:<34} {concurrencia:>6} {fila['por_segundo']:>8.1f} "
+                         f"{columnas_latencia(fila)} "
+                         f"{fila['tasa_error']:>7.1%}")
+                self.stdout.write(self.style.ERROR(texto) if fila['errores'] else texto)
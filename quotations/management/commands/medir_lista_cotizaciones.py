@@ -0,0 +1,75 @@
+"""
+Comando: python manage.py medir_lista_cotizaciones [--repeticiones N]
+
+Mide las consultas de lectura que dependen del ancho de la tabla `quotation`
+y muestra su plan de ejecución:
+
+- lista: la consulta de la lista de cotizaciones (Quotation.CAMPOS_LISTA)
+- resumen: solo id, cliente, estado, cantidad y precio ordenados por fecha,
+  cubierta por el índice quotation_lista_idx
+- clientes: las estadísticas por cliente de la lista de clientes, cubiertas
+  por quotation_cliente_estado_idx
+- completa: la cotización con su detalle (lo que leía la lista antes de
+  separar `quotation_detalle`), como referencia
+
+En PostgreSQL también muestra el tamaño de las tablas y usa
+EXPLAIN (ANALYZE, BUFFERS) para ver los index-only scans y las páginas leídas.
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from interfaz_crud.models import Cliente
+from interfaz_crud.views import anotar_estadisticas_cotizaciones
+from quotations.models import Quotation
+
+
+def _consultas():
+    return {
+        'lista': Quotation.objects.select_related('cliente').only(*Quotation.CAMPOS_LISTA),
+        'resumen': Quotation.objects.order_by('-fecha_creacion').values_list(
+            'id', 'cliente_id', 'estado', 'cantidad', 'precio_utilidad_28'
+        ),
+        'clientes': anotar_estadisticas_cotizaciones(Cliente.objects.all()),
+        'completa': Quotation.objects.select_related('cliente', 'detalle'),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo y el plan de las consultas de listas de cotizaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20,
+                            help='Veces que se ejecuta cada consulta (por defecto 20)')
+        parser.add_argument('--sin-plan', action='store_true',
+                            help='No mostrar el plan de ejecución')
+
+    def handle(self, *args, **options):
+        postgres = connection.vendor == 'postgresql'
+        self.stdout.write(f'Cotizaciones: {Quotation.objects.count()}')
+        if postgres:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT relname, pg_size_pretty(pg_table_size(oid)) FROM pg_class "
+                    "WHERE relname IN ('quotation', 'quotation_detalle', "
+                    "'quotation_lista_idx', 'quotation_cliente_estado_idx')"
+                )
+                for nombre, tamano in cursor.fetchall():
+                    self.stdout.write(f'  {nombre}: {tamano}')
+
+        for nombre, consulta in _consultas().items():
+            tiempos = []
+            for _ in range(options['repeticiones']):
+                inicio = time.perf_counter()
+                filas = len(list(consulta.all()))
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            self.stdout.write(self.style.SUCCESS(
+                f'{nombre}: {filas} filas, mediana {statistics.median(tiempos):.2f} ms, '
+                f'mínimo {min(tiempos):.2f} ms'
+            ))
+            if not options['sin_plan']:
+                plan = consulta.explain(analyze=True, buffers=True) if postgres else consulta.explain()
+                self.stdout.write(plan)
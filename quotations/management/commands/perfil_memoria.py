@@ -0,0 +1,36 @@
+"""
+Comando: python manage.py perfil_memoria [--top N] <comando> [argumentos...]
+
+Ejecuta otro comando de manage.py bajo tracemalloc (ver
+quotation_project/memoria.py) e informa su memoria pico y los sitios que más
+memoria asignaron. Por ejemplo:
+
+    python manage.py perfil_memoria seed --cotizaciones 50000
+    python manage.py perfil_memoria archivar_cotizaciones
+"""
+
+import argparse
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from quotation_project.memoria import PerfilMemoria
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta un comando midiendo su memoria pico y los sitios que más asignan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15,
+                            help='Sitios de asignación a mostrar (por defecto 15)')
+        parser.add_argument('comando', help='Comando a ejecutar')
+        parser.add_argument('argumentos', nargs=argparse.REMAINDER,
+                            help='Argumentos del comando')
+
+    def handle(self, *args, **options):
+        if options['comando'] == 'perfil_memoria':
+            raise CommandError('No se puede perfilar perfil_memoria')
+        with PerfilMemoria(top=options['top']) as perfil:
+            call_command(options['comando'], *options['argumentos'],
+                         stdout=self.stdout, stderr=self.stderr)
+        self.stdout.write(self.style.SUCCESS(f"{options['comando']}: {perfil.informe()}"))
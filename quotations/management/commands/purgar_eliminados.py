@@ -0,0 +1,33 @@
+"""
+Comando: python manage.py purgar_eliminados [--dias N] [--lote N] [--pausa S]
+
+Borra físicamente los clientes y cotizaciones eliminados hace más de N días
+(por defecto ELIMINADOS_RETENCION_DIAS), en lotes de una transacción cada
+uno. Pensado para ejecutarse periódicamente (cron).
+"""
+
+from django.core.management.base import BaseCommand
+
+from quotations.business_logic.eliminacion import TAMANO_LOTE_PURGA, purgar_eliminados
+
+
+class Command(BaseCommand):
+    help = 'Borra físicamente los clientes y cotizaciones eliminados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Días de retención (por defecto ELIMINADOS_RETENCION_DIAS)')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_PURGA,
+                            help=f'Filas por transacción (por defecto {TAMANO_LOTE_PURGA})')
+        parser.add_argument('--pausa', type=float, default=0,
+                            help='Segundos de pausa entre lotes')
+
+    def handle(self, *args, **options):
+        borrados = purgar_eliminados(
+            dias=options['dias'],
+            tamano_lote=options['lote'],
+            pausa=options['pausa'],
+        )
+        for nombre, cantidad in borrados.items():
+            self.stdout.write(f'{nombre}: {cantidad}')
+        self.stdout.write(self.style.SUCCESS('Purga terminada'))
@@ -0,0 +1,21 @@
+"""
+Comando: python manage.py recalcular_contadores
+
+Reconstruye la tabla `contador` a partir de los datos actuales. Necesario
+después de cargas o borrados hechos con SQL directo, que no pasan por las
+señales de Django.
+"""
+
+from django.core.management.base import BaseCommand
+
+from quotations.business_logic.contadores import recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los contadores de estadísticas del inicio desde las tablas'
+
+    def handle(self, *args, **options):
+        valores = recalcular_contadores()
+        for clave, valor in sorted(valores.items()):
+            self.stdout.write(f'{clave}: {valor}')
+        self.stdout.write(self.style.SUCCESS(f'{len(valores)} contadores recalculados'))
@@ -0,0 +1,19 @@
+"""
+Comando: python manage.py reconstruir_resumen_mensual
+
+Rellena la tabla `resumen_mensual` desde cero con una única consulta agrupada
+sobre `quotation`. Usar tras la migración inicial o si el resumen se desvía
+por cambios hechos con SQL directo.
+"""
+
+from django.core.management.base import BaseCommand
+
+from quotations.business_logic.resumen_mensual import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen mensual de cotizaciones (mes, estado, cliente)'
+
+    def handle(self, *args, **options):
+        filas = reconstruir_resumen()
+        self.stdout.write(self.style.SUCCESS(f'{filas} filas de resumen mensual escritas'))
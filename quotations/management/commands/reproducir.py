@@ -0,0 +1,108 @@
+"""
+Comando: python manage.py reproducir [ARCHIVO.jsonl | --sinteticas N]
+                                     [--url http://127.0.0.1:8000] [--concurrencia C]
+                                     [--tasa R | --velocidad F] [--repetir K]
+
+Reproduce contra un servidor en marcha las peticiones grabadas por
+GrabadorPeticionesMiddleware (ver quotation_project/grabacion.py), o N
+peticiones sintéticas con una mezcla típica de cotizar/, la lista y la API.
+Informa, por etiqueta, peticiones, tasa de error, latencia p50/p95/p99 y
+peticiones por segundo (ver quotations/utils/reproduccion.py). Con --tasa o
+--velocidad la latencia cuenta desde la hora programada de cada petición y
+la columna `cola p95` muestra cuánto esperaron en el reproductor.
+
+Los ids de cliente de una grabación de producción no suelen existir en la
+base local: --remapear-clientes los reemplaza por clientes locales.
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from interfaz_crud.models import Cliente
+from quotations.utils.reproduccion import (
+    Reproductor, columnas_latencia, leer_grabacion, peticiones_sinteticas, remapear_clientes, resumir,
+)
+
+
+def _columna(ms):
+    return f"{ms:>9.1f}" if ms is not None else f"{'-':>9}"
+
+
+class Command(BaseCommand):
+    help = 'Reproduce peticiones grabadas o sintéticas contra un servidor y mide latencia y errores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', nargs='?', help='Grabación JSONL (GRABACION_ARCHIVO)')
+        parser.add_argument('--sinteticas', type=int, default=0,
+                            help='Generar N peticiones sintéticas en lugar de leer un archivo')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de las peticiones sintéticas (por defecto 0)')
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help='Servidor de destino (por defecto http://127.0.0.1:8000)')
+        parser.add_argument('--concurrencia', type=int, default=8,
+                            help='Peticiones simultáneas (por defecto 8)')
+        parser.add_argument('--tasa', type=float, default=0,
+                            help='Peticiones por segundo (por defecto 0, sin límite)')
+        parser.add_argument('--velocidad', type=float,
+                            help='Respetar los tiempos grabados, acelerados por este factor')
+        parser.add_argument('--repetir', type=int, default=1,
+                            help='Veces que se envía la secuencia completa (por defecto 1)')
+        parser.add_argument('--remapear-clientes', action='store_true',
+                            help='Reemplazar los ids de cliente grabados por clientes de la base local')
+        parser.add_argument('--timeout', type=float, default=30,
+                            help='Segundos de espera por respuesta (por defecto 30)')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar el resumen')
+
+    def handle(self, *args, **options):
+        if bool(options['archivo']) == bool(options['sinteticas']):
+            raise CommandError('Indique un archivo de grabación o --sinteticas N')
+        if options['concurrencia'] < 1 or options['repetir'] < 1:
+            raise CommandError('--concurrencia y --repetir deben ser al menos 1')
+
+        if options['archivo']:
+            try:
+                peticiones = leer_grabacion(options['archivo'])
+            except FileNotFoundError:
+                raise CommandError(f"No existe {options['archivo']}")
+        if options['sinteticas'] or options['remapear_clientes']:
+            ids = list(Cliente.objects.order_by('pk').values_list('pk', flat=True))
+            if not ids:
+                raise CommandError('No hay clientes en la base local (ver manage.py seed)')
+            if options['sinteticas']:
+                peticiones = peticiones_sinteticas(options['sinteticas'], ids, options['semilla'])
+            else:
+                remapear_clientes(peticiones, ids)
+        if not peticiones:
+            raise CommandError('No hay peticiones que reproducir')
+
+        if options['velocidad'] and options['repetir'] > 1:
+            # Cada vuelta continúa donde terminó la anterior
+            duracion = peticiones[-1]['t'] - peticiones[0]['t'] + 1
+            peticiones = [{**p, 't': p['t'] + vuelta * duracion}
+                          for vuelta in range(options['repetir']) for p in peticiones]
+        else:
+            peticiones = peticiones * options['repetir']
+
+        self.stdout.write(f"Enviando {len(peticiones)} peticiones a {options['url']} "
+                          f"con concurrencia {options['concurrencia']}...")
+        reproductor = Reproductor(options['url'], options['concurrencia'], options['timeout'])
+        resumen = resumir(reproductor.reproducir(peticiones, options['tasa'], options['velocidad']))
+        self._informar(resumen)
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(resumen, indent=2, ensure_ascii=False))
+
+    def _informar(self, resumen):
+        self.stdout.write(f"{'etiqueta':<44} {'n':>6} {'error':>7} {'p50 ms':>9} "
+                          f"{'p95 ms':>9} {'p99 ms':>9} {'cola p95':>9} {'/s':>8}")
+        filas = [*resumen['etiquetas'].items(), ('TOTAL', resumen['total'])]
+        for nombre, fila in filas:
+            texto = (f"{nombre:<44} {fila['peticiones']:>6} {fila['tasa_error']:>7.1%} "
+                     f"{columnas_latencia(fila)} "
+                     f"{_columna(fila['cola_p95_ms'])} "
+                     f"{fila['por_segundo']:>8.1f}")
+            self.stdout.write(self.style.ERROR(texto) if fila['errores'] else texto)
+        for error in resumen['errores_conexion']:
+            self.stdout.write(self.style.ERROR(f'Error de conexión: {error}'))
+        self.stdout.write(f"Duración: {resumen['segundos']} s")
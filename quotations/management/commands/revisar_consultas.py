@@ -0,0 +1,116 @@
+"""
+Comando: python manage.py revisar_consultas [--cotizaciones N] [--vistas a,b]
+
+Recorre las vistas de PRESUPUESTOS sobre una base de datos de prueba
+sembrada con datos sintéticos (ver quotations/business_logic/datos_sinteticos.py)
+y falla si alguna ejecuta más consultas SQL que su presupuesto (ver
+`max_consultas` en quotation_project/consultas.py).
+
+Los presupuestos no dependen de la cantidad de filas: una vista que pasa con
+pocas cotizaciones y falla con muchas tiene un N+1. Al agregar una vista o
+cambiar sus consultas, actualizar su entrada aquí. `manage.py test` revisa
+los mismos presupuestos con pocas filas (ver quotations/tests.py).
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from interfaz_crud.models import Cliente
+from quotation_project.consultas import max_consultas
+from quotations.business_logic.datos_sinteticos import generar_entradas, sembrar
+from quotations.models import Quotation
+
+# nombre de la ruta -> máximo de consultas por petición
+PRESUPUESTOS = {
+    'quotations:inicio': 1,
+    'quotations:lista_cotizaciones': 2,
+    'quotations:cotizar': 0,
+    'quotations:cotizar (POST JSON)': 1,
+    'quotations:editar_cotizacion': 2,
+    'interfaz_crud:lista_clientes': 2,
+    'cliente-list': 1,
+    'cliente-autocompletar': 1,
+    'quotation-list': 1,
+    'quotation-detail': 1,
+    'analitica-mensual-list': 1,
+    'analitica-embudo-list': 2,
+}
+
+
+def peticiones_presupuestadas(semilla):
+    """(nombre, método, url, datos, cabeceras) de cada vista revisada."""
+    cotizacion = Quotation.objects.order_by('pk').first()
+    cliente = Cliente.objects.order_by('pk').first()
+    entrada = generar_entradas(1, [cliente.pk], semilla)[0]
+    ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+    return [
+        ('quotations:inicio', 'get', reverse('quotations:inicio'), None, {}),
+        ('quotations:lista_cotizaciones', 'get', reverse('quotations:lista_cotizaciones'), None, {}),
+        ('quotations:cotizar', 'get', reverse('quotations:cotizar'), None, {}),
+        ('quotations:cotizar (POST JSON)', 'post', reverse('quotations:cotizar'), entrada, ajax),
+        ('quotations:editar_cotizacion', 'get',
+         reverse('quotations:editar_cotizacion', args=[cotizacion.pk]), None, {}),
+        ('interfaz_crud:lista_clientes', 'get', reverse('interfaz_crud:lista_clientes'), None, {}),
+        ('cliente-list', 'get', reverse('cliente-list'), None, {}),
+        ('cliente-autocompletar', 'get', reverse('cliente-autocompletar'), {'q': cliente.nombre[:2]}, {}),
+        ('quotation-list', 'get', reverse('quotation-list'), None, {}),
+        ('quotation-detail', 'get', reverse('quotation-detail', args=[cotizacion.pk]), None, {}),
+        ('analitica-mensual-list', 'get', reverse('analitica-mensual-list'), None, {}),
+        ('analitica-embudo-list', 'get', reverse('analitica-embudo-list'), None, {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Verifica que cada vista no supere su presupuesto de consultas SQL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cotizaciones', type=int, default=200,
+                            help='Cotizaciones en la base de prueba (por defecto 200)')
+        parser.add_argument('--vistas', default='',
+                            help='Vistas a revisar separadas por coma (por defecto, todas)')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de los datos sintéticos (por defecto 0)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Sin réplicas ni caché compartida: cada vista consulta la base de prueba
+            with override_settings(REPLICAS_LECTURA=[], ESTADISTICAS_CACHE_SEGUNDOS=0,
+                                   DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False):
+                sembrar(max(options['cotizaciones'] // 10, 1), options['cotizaciones'],
+                        semilla=options['semilla'])
+                fallidas = self._revisar(options)
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        if fallidas:
+            raise CommandError(f"{len(fallidas)} vistas superan su presupuesto: {', '.join(fallidas)}")
+        self.stdout.write(self.style.SUCCESS('Todas las vistas dentro de su presupuesto'))
+
+    def _revisar(self, options):
+        elegidas = {v for v in options['vistas'].split(',') if v}
+        cliente_http = Client()
+        fallidas = []
+        for nombre, metodo, url, datos, cabeceras in peticiones_presupuestadas(options['semilla']):
+            if elegidas and nombre not in elegidas:
+                continue
+            maximo = PRESUPUESTOS[nombre]
+            try:
+                with max_consultas(maximo) as capturadas:
+                    respuesta = getattr(cliente_http, metodo)(url, datos, **cabeceras)
+            except AssertionError as e:
+                fallidas.append(nombre)
+                self.stdout.write(self.style.ERROR(f'{nombre}: {e}'))
+                continue
+            if respuesta.status_code >= 400:
+                fallidas.append(nombre)
+                self.stdout.write(self.style.ERROR(f'{nombre}: respuesta {respuesta.status_code}'))
+                continue
+            self.stdout.write(f'{nombre:<34} {len(capturadas):>3} / {maximo} consultas')
+        return fallidas
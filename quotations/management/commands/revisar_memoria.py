@@ -0,0 +1,157 @@
+"""
+Comando: python manage.py revisar_memoria [--tamanos 1000,10000] [--escenarios a,b]
+
+Mide la memoria pico (ver quotation_project/memoria.py) de las operaciones
+que más memoria usan, sobre una base de datos de prueba que crece por
+etapas (--tamanos cotizaciones), y falla si alguna supera su techo en
+TECHOS_MB:
+
+- lista_cotizaciones: GET cotizaciones/ (una página)
+- api_cotizaciones, api_clientes: listas completas de la API (exportación)
+- calculo_lote: calcular_cotizaciones de LOTE_CALCULO entradas
+- guardado_lote: crear_cotizaciones_en_lote de LOTE_GUARDADO (se deshace)
+- pdf: generar_pdf_cotizacion
+
+Los techos son fijos: una operación cuya memoria crece con la cantidad de
+filas los supera al crecer la base. El informe muestra, para cada una,
+cuántos MB agrega cada 1000 cotizaciones. `manage.py test` revisa los
+techos de la lista, la API y el cálculo por lotes con una base pequeña (ver
+quotations/tests.py).
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from interfaz_crud.models import Cliente
+from quotation_project.memoria import PerfilMemoria
+from quotations.business_logic.bulk_quotations import crear_cotizaciones_en_lote
+from quotations.business_logic.datos_sinteticos import generar_entradas
+from quotations.business_logic.quotation_processor import QuotationProcessor
+from quotations.forms.quotation_form import armar_datos_cotizacion
+from quotations.utils.benchmark import preparar_datos
+
+LOTE_CALCULO = 10_000
+LOTE_GUARDADO = 2_000
+
+# escenario -> memoria pico máxima (MB)
+TECHOS_MB = {
+    'lista_cotizaciones': 16,
+    # Sin paginación: crece unos 2.7 MB cada 1000 cotizaciones
+    'api_cotizaciones': 64,
+    'api_clientes': 16,
+    'calculo_lote': 48,
+    'guardado_lote': 32,
+    'pdf': 8,
+}
+
+
+def escenarios_memoria(semilla):
+    ids = list(Cliente.objects.values_list('pk', flat=True)[:1000])
+    cliente = Cliente.objects.get(pk=ids[0])
+    entradas_calculo = generar_entradas(LOTE_CALCULO, ids, semilla)
+    entradas_guardado = entradas_calculo[:LOTE_GUARDADO]
+    procesador = QuotationProcessor()
+    cliente_http = Client()
+
+    def calculo_lote():
+        procesador.calcular_cotizaciones(
+            [armar_datos_cotizacion({**e, 'cliente': cliente}) for e in entradas_calculo]
+        )
+
+    def guardado_lote():
+        with transaction.atomic():
+            crear_cotizaciones_en_lote(entradas_guardado)
+            transaction.set_rollback(True)
+
+    def pdf():
+        from quotations.utils.pdf_generator import generar_pdf_cotizacion
+
+        datos = armar_datos_cotizacion({**entradas_calculo[0], 'cliente': cliente})
+        resultado = procesador.calcular_cotizacion(datos)
+        ruta = generar_pdf_cotizacion(resultado['dimensiones'], resultado, resultado['gramos'],
+                                      datos, resultado['costos'])
+        os.remove(ruta)
+
+    return {
+        'lista_cotizaciones': lambda: cliente_http.get(reverse('quotations:lista_cotizaciones')),
+        'api_cotizaciones': lambda: cliente_http.get(reverse('quotation-list')),
+        'api_clientes': lambda: cliente_http.get(reverse('cliente-list')),
+        'calculo_lote': calculo_lote,
+        'guardado_lote': guardado_lote,
+        'pdf': pdf,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Verifica que la lista, la API y el cálculo por lotes no superen sus techos de memoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', default='1000,10000',
+                            help='Cotizaciones en la base en cada etapa (por defecto 1000,10000)')
+        parser.add_argument('--escenarios', default='',
+                            help='Escenarios a medir separados por coma (por defecto, todos)')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de los datos sintéticos (por defecto 0)')
+
+    def handle(self, *args, **options):
+        try:
+            tamanos = sorted(int(t) for t in options['tamanos'].split(','))
+        except ValueError:
+            raise CommandError('--tamanos debe ser una lista de enteros separados por coma')
+        elegidos = [e for e in options['escenarios'].split(',') if e] or list(TECHOS_MB)
+        desconocidos = set(elegidos) - set(TECHOS_MB)
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+        setup_test_environment()
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Sin réplicas ni instrumentación que agregue memoria por consulta
+            with override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False,
+                                   TIEMPOS_ETAPAS=False, GRABACION_ARCHIVO=None):
+                medidas = self._medir(tamanos, elegidos, options['semilla'])
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        excedidos = self._informar(tamanos, medidas)
+        if excedidos:
+            raise CommandError(f"{len(excedidos)} escenarios superan su techo: {', '.join(excedidos)}")
+        self.stdout.write(self.style.SUCCESS('Todos los escenarios dentro de su techo de memoria'))
+
+    def _medir(self, tamanos, elegidos, semilla):
+        medidas = {nombre: {} for nombre in elegidos}
+        for tamano in tamanos:
+            preparar_datos(tamano, max(tamano // 20, 10), semilla)
+            escenarios = escenarios_memoria(semilla)
+            for nombre in elegidos:
+                escenarios[nombre]()  # calentamiento: cachés, plantillas, YAML
+                with PerfilMemoria(top=3) as perfil:
+                    escenarios[nombre]()
+                medidas[nombre][tamano] = perfil
+            self.stdout.write(f'Medido con {tamano} cotizaciones')
+        return medidas
+
+    def _informar(self, tamanos, medidas):
+        excedidos = []
+        for nombre, por_tamano in medidas.items():
+            techo = TECHOS_MB[nombre]
+            picos = [por_tamano[t].pico_mb for t in tamanos]
+            crecimiento = ''
+            if len(tamanos) > 1:
+                por_mil = (picos[-1] - picos[0]) / (tamanos[-1] - tamanos[0]) * 1000
+                crecimiento = f'  ({por_mil:+.2f} MB cada 1000 cotizaciones)'
+            texto = f"{nombre:<20} {' / '.join(f'{p:.1f}' for p in picos)} MB, techo {techo} MB{crecimiento}"
+            if max(picos) > techo:
+                excedidos.append(nombre)
+                self.stdout.write(self.style.ERROR(texto))
+                self.stdout.write(por_tamano[tamanos[-1]].informe())
+            else:
+                self.stdout.write(texto)
+        return excedidos
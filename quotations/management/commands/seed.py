@@ -0,0 +1,58 @@
+"""
+Comando: python manage.py seed [--clientes N] [--cotizaciones M] [--semilla S]
+                               [--lote L] [--dias D] [--sin-copy]
+
+Genera datos sintéticos para pruebas de carga (ver
+quotations/business_logic/datos_sinteticos.py): N clientes y M cotizaciones
+calculadas con el motor por lotes de L. Inserta con COPY en PostgreSQL (o
+bulk_create con --sin-copy y en otras bases) y reconstruye contadores y
+resumen mensual al terminar. La misma semilla sobre la misma base genera
+los mismos datos.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quotations.business_logic.datos_sinteticos import TAMANO_LOTE_SIEMBRA, sembrar
+
+
+class Command(BaseCommand):
+    help = 'Genera clientes y cotizaciones sintéticos para pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=1000,
+                            help='Clientes a crear (por defecto 1000; 0 usa los existentes)')
+        parser.add_argument('--cotizaciones', type=int, default=10_000,
+                            help='Cotizaciones a crear (por defecto 10000)')
+        parser.add_argument('--semilla', type=int, default=0,
+                            help='Semilla de los datos (por defecto 0)')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE_SIEMBRA,
+                            help=f'Cotizaciones calculadas e insertadas por lote (por defecto {TAMANO_LOTE_SIEMBRA})')
+        parser.add_argument('--dias', type=int, default=365,
+                            help='Días hacia atrás en que caen las fechas de creación (por defecto 365)')
+        parser.add_argument('--sin-copy', action='store_true',
+                            help='Insertar con bulk_create aunque la base sea PostgreSQL')
+
+    def handle(self, *args, **options):
+        if options['clientes'] < 0 or options['cotizaciones'] < 0 or options['lote'] < 1:
+            raise CommandError('Las cantidades deben ser positivas')
+        inicio = time.perf_counter()
+
+        def progreso(insertadas, total):
+            segundos = time.perf_counter() - inicio
+            self.stdout.write(f'  {insertadas}/{total} cotizaciones '
+                              f'({insertadas / segundos:,.0f} por segundo)')
+
+        try:
+            creadas = sembrar(
+                options['clientes'], options['cotizaciones'], semilla=options['semilla'],
+                tamano_lote=options['lote'], dias=options['dias'],
+                usar_copy=False if options['sin_copy'] else None, progreso=progreso,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"{creadas['clientes']} clientes y {creadas['cotizaciones']} cotizaciones creadas "
+            f"en {time.perf_counter() - inicio:.1f} s"
+        ))
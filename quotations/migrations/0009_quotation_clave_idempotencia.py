@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0008_alter_quotation_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quotation',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, help_text='Clave enviada por el cliente de la API para evitar duplicados al reintentar un lote', max_length=100, null=True, unique=True, verbose_name='Clave de idempotencia'),
+        ),
+    ]
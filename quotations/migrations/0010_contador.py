@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:55
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def inicializar_contadores(apps, schema_editor):
+    """Calcula los contadores iniciales a partir de los datos existentes."""
+    Cliente = apps.get_model('interfaz_crud', 'Cliente')
+    Quotation = apps.get_model('quotations', 'Quotation')
+    Contador = apps.get_model('quotations', 'Contador')
+
+    valores = {
+        'clientes': Cliente.objects.count(),
+        'cotizaciones': Quotation.objects.count(),
+    }
+    for fila in Quotation.objects.order_by().values('estado').annotate(total=Count('id')):
+        valores[f"cotizaciones:estado:{fila['estado']}"] = fila['total']
+    por_mes = (Quotation.objects.order_by()
+               .annotate(mes=TruncMonth('fecha_creacion'))
+               .values('mes').annotate(total=Count('id')))
+    for fila in por_mes:
+        valores[f"cotizaciones:mes:{timezone.localtime(fila['mes']):%Y-%m}"] = fila['total']
+
+    Contador.objects.bulk_create([Contador(clave=k, valor=v) for k, v in valores.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0009_quotation_clave_idempotencia'),
+        ('interfaz_crud', '0005_cliente_descripcion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contador',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text='Identificador del contador', max_length=64, unique=True, verbose_name='Clave')),
+                ('valor', models.BigIntegerField(default=0, help_text='Valor actual del contador', verbose_name='Valor')),
+            ],
+            options={
+                'verbose_name': 'Contador',
+                'verbose_name_plural': 'Contadores',
+                'db_table': 'contador',
+            },
+        ),
+        migrations.RunPython(inicializar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def rellenar_resumen(apps, schema_editor):
+    """Construye el resumen inicial con una sola consulta agrupada."""
+    Quotation = apps.get_model('quotations', 'Quotation')
+    ResumenMensual = apps.get_model('quotations', 'ResumenMensual')
+
+    grupos = (Quotation.objects.order_by()
+              .annotate(mes=TruncMonth('fecha_creacion'))
+              .values('mes', 'estado', 'cliente_id')
+              .annotate(cantidad=Count('id'),
+                        costo=Sum('costo_total'),
+                        precio=Sum('precio_utilidad_28')))
+    ResumenMensual.objects.bulk_create([
+        ResumenMensual(
+            mes=timezone.localtime(g['mes']).date().replace(day=1),
+            estado=g['estado'],
+            cliente_id=g['cliente_id'],
+            cantidad_cotizaciones=g['cantidad'],
+            suma_costo_total=g['costo'] or 0,
+            suma_precio_utilidad_28=g['precio'] or 0,
+        )
+        for g in grupos
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0005_cliente_descripcion'),
+        ('quotations', '0010_contador'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes de creación de las cotizaciones', verbose_name='Mes')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviada', 'Enviada'), ('aprobada', 'Aprobada')], help_text='Estado de las cotizaciones agregadas', max_length=20, verbose_name='Estado')),
+                ('cantidad_cotizaciones', models.IntegerField(default=0, verbose_name='Cantidad de cotizaciones')),
+                ('suma_costo_total', models.FloatField(default=0, verbose_name='Suma de costo total')),
+                ('suma_precio_utilidad_28', models.FloatField(default=0, verbose_name='Suma de precio con utilidad 28%')),
+                ('cliente', models.ForeignKey(help_text='Cliente de las cotizaciones agregadas', on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_mensuales', to='interfaz_crud.cliente')),
+            ],
+            options={
+                'verbose_name': 'Resumen mensual',
+                'verbose_name_plural': 'Resúmenes mensuales',
+                'db_table': 'resumen_mensual',
+                'constraints': [models.UniqueConstraint(fields=('mes', 'estado', 'cliente'), name='resumen_mensual_unico')],
+            },
+        ),
+        migrations.RunPython(rellenar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def registrar_historial_inicial(apps, schema_editor):
+    """
+    Crea el historial de las cotizaciones existentes.
+
+    El historial real no existía: se registra la creación en fecha_creacion y,
+    si la cotización ya no está pendiente, los pasos del ciclo hasta su
+    estado actual en fecha_modificacion (aproximación).
+    """
+    Quotation = apps.get_model('quotations', 'Quotation')
+    TransicionEstado = apps.get_model('quotations', 'TransicionEstado')
+
+    pasos = {
+        'pendiente': [],
+        'enviada': [('pendiente', 'enviada')],
+        'aprobada': [('pendiente', 'enviada'), ('enviada', 'aprobada')],
+    }
+    lote = []
+    for cotizacion in Quotation.objects.only('id', 'estado', 'fecha_creacion', 'fecha_modificacion').iterator():
+        lote.append(TransicionEstado(
+            cotizacion_id=cotizacion.id, estado_nuevo='pendiente', fecha=cotizacion.fecha_creacion
+        ))
+        for anterior, nuevo in pasos.get(cotizacion.estado, []):
+            lote.append(TransicionEstado(
+                cotizacion_id=cotizacion.id, estado_anterior=anterior,
+                estado_nuevo=nuevo, fecha=cotizacion.fecha_modificacion
+            ))
+        if len(lote) >= 1000:
+            TransicionEstado.objects.bulk_create(lote)
+            lote = []
+    TransicionEstado.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0011_resumen_mensual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicionEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado_anterior', models.CharField(blank=True, choices=[('pendiente', 'Pendiente'), ('enviada', 'Enviada'), ('aprobada', 'Aprobada')], help_text='Estado previo (vacío en la creación)', max_length=20, null=True, verbose_name='Estado anterior')),
+                ('estado_nuevo', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviada', 'Enviada'), ('aprobada', 'Aprobada')], help_text='Estado al que pasó la cotización', max_length=20, verbose_name='Estado nuevo')),
+                ('fecha', models.DateTimeField(help_text='Momento de la transición', verbose_name='Fecha')),
+                ('cotizacion', models.ForeignKey(help_text='Cotización que cambió de estado', on_delete=django.db.models.deletion.CASCADE, related_name='transiciones', to='quotations.quotation')),
+            ],
+            options={
+                'verbose_name': 'Transición de estado',
+                'verbose_name_plural': 'Transiciones de estado',
+                'db_table': 'transicion_estado',
+                'indexes': [models.Index(fields=['fecha'], name='transicion_fecha_idx'), models.Index(fields=['cotizacion', 'fecha'], name='transicion_cotizacion_idx'), models.Index(fields=['estado_nuevo', 'fecha'], name='transicion_estado_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(registrar_historial_inicial, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0005_cliente_descripcion'),
+        ('quotations', '0012_transicion_estado'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['cliente', '-fecha_creacion'], name='quotation_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['cliente', 'estado'], name='quotation_cliente_estado_idx'),
+        ),
+    ]
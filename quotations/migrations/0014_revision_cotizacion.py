@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0013_quotation_cliente_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevisionCotizacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField(help_text='Versión de la cotización, empezando en 1', verbose_name='Número de revisión')),
+                ('es_completa', models.BooleanField(default=False, help_text='Si `datos` contiene todos los campos o solo los cambiados', verbose_name='Copia completa')),
+                ('datos', models.JSONField(help_text='Campos de la cotización en esta revisión (completos o solo los cambiados)', verbose_name='Datos')),
+                ('fecha', models.DateTimeField(help_text='Momento en que la cotización quedó con estos valores', verbose_name='Fecha')),
+                ('cotizacion', models.ForeignKey(help_text='Cotización a la que pertenece la revisión', on_delete=django.db.models.deletion.CASCADE, related_name='revisiones', to='quotations.quotation')),
+            ],
+            options={
+                'verbose_name': 'Revisión de cotización',
+                'verbose_name_plural': 'Revisiones de cotización',
+                'db_table': 'revision_cotizacion',
+                'ordering': ['cotizacion', 'numero'],
+                'constraints': [models.UniqueConstraint(fields=('cotizacion', 'numero'), name='revision_cotizacion_unica')],
+            },
+        ),
+    ]
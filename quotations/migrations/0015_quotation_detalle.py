@@ -0,0 +1,215 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Columnas que pasan de `quotation` a `quotation_detalle`
+CAMPOS_DETALLE = (
+    'bolsa_individual', 'sellada', 'cortada', 'empaque_final', 'llenada_gel',
+    'pin_soporte', 'samblasted', 'mo_rubber', 'numero_plotter', 'perforada',
+    'guillotina', 'largo_total_cm', 'alto_total_cm', 'area_total_cm2',
+    'gramos_total', 'gramos_por_cm2', 'costo_por_gramo', 'material',
+    'total_material', 'total_armado', 'otros_materiales_total', 'cif_8',
+    'cif_10', 'cif_15', 'admon', 'precio_utilidad_45', 'precio_utilidad_17',
+    'precio_utilidad_11',
+)
+
+
+def copiar_a_detalle(apps, schema_editor):
+    """Copia las columnas con un único INSERT ... SELECT en la base de datos."""
+    q = schema_editor.quote_name
+    columnas = ', '.join(q(c) for c in CAMPOS_DETALLE)
+    schema_editor.execute(
+        f"INSERT INTO {q('quotation_detalle')} ({q('cotizacion_id')}, {columnas}) "
+        f"SELECT {q('id')}, {columnas} FROM {q('quotation')}"
+    )
+
+
+def copiar_desde_detalle(apps, schema_editor):
+    """Devuelve las columnas a `quotation` (por lotes) al revertir."""
+    Quotation = apps.get_model('quotations', 'Quotation')
+    QuotationDetalle = apps.get_model('quotations', 'QuotationDetalle')
+
+    lote = []
+    for fila in QuotationDetalle.objects.values('cotizacion_id', *CAMPOS_DETALLE).iterator(chunk_size=1000):
+        lote.append(Quotation(id=fila.pop('cotizacion_id'), **fila))
+        if len(lote) == 1000:
+            Quotation.objects.bulk_update(lote, CAMPOS_DETALLE)
+            lote = []
+    if lote:
+        Quotation.objects.bulk_update(lote, CAMPOS_DETALLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0005_cliente_descripcion'),
+        ('quotations', '0014_revision_cotizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuotationDetalle',
+            fields=[
+                ('cotizacion', models.OneToOneField(help_text='Cotización a la que pertenece el detalle', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='detalle', serialize=False, to='quotations.quotation')),
+                ('bolsa_individual', models.FloatField(default=0, help_text='Costo de bolsa individual', verbose_name='Bolsa individual')),
+                ('sellada', models.FloatField(default=0, help_text='Costo de sellado', verbose_name='Sellada')),
+                ('cortada', models.FloatField(default=0, help_text='Costo de corte', verbose_name='Cortada')),
+                ('empaque_final', models.FloatField(default=0, help_text='Costo de empaque final', verbose_name='Empaque final')),
+                ('llenada_gel', models.FloatField(default=0, help_text='Costo de llenado de gel', verbose_name='Llenada gel')),
+                ('pin_soporte', models.FloatField(default=0, help_text='Costo de pin soporte', verbose_name='Pin soporte')),
+                ('samblasted', models.FloatField(default=0, help_text='Costo de proceso samblasted', verbose_name='Samblasted')),
+                ('mo_rubber', models.FloatField(default=0, help_text='Costo de mano de obra en rubber', verbose_name='MO Rubber')),
+                ('numero_plotter', models.FloatField(default=0, help_text='Costo de número plotter', verbose_name='Número Plotter')),
+                ('perforada', models.FloatField(default=0, help_text='Costo de perforado', verbose_name='Perforada')),
+                ('guillotina', models.FloatField(default=0, help_text='Costo de guillotina', verbose_name='Guillotina')),
+                ('largo_total_cm', models.FloatField(blank=True, help_text='Largo total del molde incluyendo márgenes', null=True, verbose_name='Largo total del molde (cm)')),
+                ('alto_total_cm', models.FloatField(blank=True, help_text='Alto total del molde incluyendo márgenes', null=True, verbose_name='Alto total del molde (cm)')),
+                ('area_total_cm2', models.FloatField(blank=True, help_text='Área total del molde en centímetros cuadrados', null=True, verbose_name='Área total (cm²)')),
+                ('gramos_total', models.FloatField(blank=True, help_text='Gramos totales de material del molde', null=True, verbose_name='Gramos totales')),
+                ('gramos_por_cm2', models.FloatField(blank=True, help_text='Gramos de material por centímetro cuadrado', null=True, verbose_name='Gramos por cm²')),
+                ('costo_por_gramo', models.FloatField(blank=True, help_text='Costo unitario por gramo de material', null=True, verbose_name='Costo por gramo')),
+                ('material', models.FloatField(blank=True, help_text='Costo de material por marquilla', null=True, verbose_name='Costo de material (por unidad)')),
+                ('total_material', models.FloatField(blank=True, help_text='Total de material (material + montaje + medida)', null=True, verbose_name='Total material')),
+                ('total_armado', models.FloatField(blank=True, help_text='Total de costos de armado/empaquetado', null=True, verbose_name='Total armado')),
+                ('otros_materiales_total', models.FloatField(blank=True, help_text='Total de otros materiales y procesos', null=True, verbose_name='Total otros materiales')),
+                ('cif_8', models.FloatField(blank=True, help_text='CIF calculado al 8%', null=True, verbose_name='CIF 8%')),
+                ('cif_10', models.FloatField(blank=True, help_text='CIF calculado al 10%', null=True, verbose_name='CIF 10%')),
+                ('cif_15', models.FloatField(blank=True, help_text='CIF calculado al 15%', null=True, verbose_name='CIF 15%')),
+                ('admon', models.FloatField(blank=True, help_text='Costos de administración', null=True, verbose_name='Administración')),
+                ('precio_utilidad_45', models.FloatField(blank=True, help_text='Precio de venta con 45% de utilidad', null=True, verbose_name='Precio con utilidad 45%')),
+                ('precio_utilidad_17', models.FloatField(blank=True, help_text='Precio de venta con 17% de utilidad', null=True, verbose_name='Precio con utilidad 17%')),
+                ('precio_utilidad_11', models.FloatField(blank=True, help_text='Precio de venta con 11% de utilidad', null=True, verbose_name='Precio con utilidad 11%')),
+            ],
+            options={
+                'verbose_name': 'Detalle de cotización',
+                'verbose_name_plural': 'Detalles de cotización',
+                'db_table': 'quotation_detalle',
+            },
+        ),
+        migrations.RunPython(copiar_a_detalle, copiar_desde_detalle),
+        migrations.RemoveIndex(
+            model_name='quotation',
+            name='quotation_cliente_estado_idx',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='admon',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='alto_total_cm',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='area_total_cm2',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='bolsa_individual',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='cif_10',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='cif_15',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='cif_8',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='cortada',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='costo_por_gramo',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='empaque_final',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='gramos_por_cm2',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='gramos_total',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='guillotina',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='largo_total_cm',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='llenada_gel',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='material',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='mo_rubber',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='numero_plotter',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='otros_materiales_total',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='perforada',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='pin_soporte',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='precio_utilidad_11',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='precio_utilidad_17',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='precio_utilidad_45',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='samblasted',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='sellada',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='total_armado',
+        ),
+        migrations.RemoveField(
+            model_name='quotation',
+            name='total_material',
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['cliente', 'estado'], include=('precio_utilidad_28',), name='quotation_cliente_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(fields=['-fecha_creacion'], include=('cliente', 'estado', 'cantidad', 'precio_utilidad_28'), name='quotation_lista_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# En PostgreSQL el archivo es una tabla particionada por rango mensual de
+# fecha_creacion. La clave primaria de una tabla particionada debe incluir la
+# columna de partición, por eso es (id, fecha_creacion). Las particiones de
+# cada mes las crea business_logic/archivo.py antes de mover cotizaciones; la
+# partición por defecto recibe cualquier fila fuera de ellas.
+TABLA_PARTICIONADA = (
+    """CREATE TABLE "quotation_archivo" (
+    "id" bigint NOT NULL,
+    "cliente_id" bigint NOT NULL
+        REFERENCES "interfaz_crud_cliente" ("id") DEFERRABLE INITIALLY DEFERRED,
+    "ancho_cm" double precision NOT NULL,
+    "alto_cm" double precision NOT NULL,
+    "espacio_entre_cm" double precision NOT NULL,
+    "cantidad_horizontal" integer NOT NULL,
+    "cantidad_vertical" integer NOT NULL,
+    "cantidad" integer NOT NULL,
+    "valor_por_troquelada" double precision NOT NULL,
+    "montaje" double precision NOT NULL,
+    "medida" double precision NOT NULL,
+    "espesor" varchar(10) NOT NULL,
+    "costo_total" double precision NULL,
+    "precio_utilidad_28" double precision NULL,
+    "estado" varchar(20) NOT NULL,
+    "fecha_creacion" timestamp with time zone NOT NULL,
+    "fecha_modificacion" timestamp with time zone NOT NULL,
+    "detalle" jsonb NOT NULL,
+    "historial" jsonb NOT NULL,
+    "fecha_archivo" timestamp with time zone NOT NULL,
+    PRIMARY KEY ("id", "fecha_creacion")
+) PARTITION BY RANGE ("fecha_creacion")""",
+    'CREATE TABLE "quotation_archivo_default" PARTITION OF "quotation_archivo" DEFAULT',
+    'CREATE INDEX "quotation_archivo_fecha_idx" ON "quotation_archivo" ("fecha_creacion" DESC)',
+    'CREATE INDEX "quotation_archivo_cliente_idx" ON "quotation_archivo" ("cliente_id", "fecha_creacion" DESC)',
+)
+
+
+def particionar_en_postgresql(apps, schema_editor):
+    """Reemplaza la tabla recién creada por la versión particionada."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE "quotation_archivo" CASCADE')
+        for sentencia in TABLA_PARTICIONADA:
+            schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0005_cliente_descripcion'),
+        ('quotations', '0015_quotation_detalle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CotizacionArchivada',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Id que tenía la cotización en `quotation`', primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancho_cm', models.FloatField(verbose_name='Ancho (cm)')),
+                ('alto_cm', models.FloatField(verbose_name='Alto (cm)')),
+                ('espacio_entre_cm', models.FloatField(verbose_name='Espacio entre marquillas (cm)')),
+                ('cantidad_horizontal', models.IntegerField(verbose_name='Cantidad horizontal')),
+                ('cantidad_vertical', models.IntegerField(verbose_name='Cantidad vertical')),
+                ('cantidad', models.IntegerField(verbose_name='Cantidad total')),
+                ('valor_por_troquelada', models.FloatField(verbose_name='Valor por troquelada')),
+                ('montaje', models.FloatField(verbose_name='Valor del montaje')),
+                ('medida', models.FloatField(verbose_name='Valor de la medida')),
+                ('espesor', models.CharField(choices=[('2_mm', '2mm'), ('3_mm', '3mm'), ('1_mm', '1mm'), ('1.2_mm', '1.2mm'), ('1.5_mm', '1.5mm'), ('5_mm', '5mm')], max_length=10, verbose_name='Espesor')),
+                ('costo_total', models.FloatField(blank=True, null=True, verbose_name='Costo total de producción')),
+                ('precio_utilidad_28', models.FloatField(blank=True, null=True, verbose_name='Precio con utilidad 28%')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviada', 'Enviada'), ('aprobada', 'Aprobada')], max_length=20, verbose_name='Estado')),
+                ('fecha_creacion', models.DateTimeField(verbose_name='Fecha de creación')),
+                ('fecha_modificacion', models.DateTimeField(verbose_name='Fecha de modificación')),
+                ('detalle', models.JSONField(help_text='Campos de QuotationDetalle al archivar', verbose_name='Detalle')),
+                ('historial', models.JSONField(help_text='Transiciones de estado y revisiones de la cotización al archivar', verbose_name='Historial')),
+                ('fecha_archivo', models.DateTimeField(help_text='Momento en que la cotización se movió al archivo', verbose_name='Fecha de archivo')),
+                ('cliente', models.ForeignKey(db_index=False, help_text='Cliente al que pertenece la cotización', on_delete=django.db.models.deletion.CASCADE, related_name='cotizaciones_archivadas', to='interfaz_crud.cliente')),
+            ],
+            options={
+                'verbose_name': 'Cotización archivada',
+                'verbose_name_plural': 'Cotizaciones archivadas',
+                'db_table': 'quotation_archivo',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['-fecha_creacion'], name='quotation_archivo_fecha_idx'), models.Index(fields=['cliente', '-fecha_creacion'], name='quotation_archivo_cliente_idx')],
+            },
+        ),
+        migrations.RunPython(particionar_en_postgresql, migrations.RunPython.noop),
+    ]
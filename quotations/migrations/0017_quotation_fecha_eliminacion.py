@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interfaz_crud', '0006_cliente_fecha_eliminacion'),
+        ('quotations', '0016_cotizacion_archivada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quotation',
+            name='fecha_eliminacion',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Momento en que se eliminó la cotización (vacío si está activa); la fila se borra al purgar (ver business_logic/eliminacion.py)', null=True, verbose_name='Fecha de eliminación'),
+        ),
+        migrations.AddIndex(
+            model_name='quotation',
+            index=models.Index(condition=models.Q(('fecha_eliminacion__isnull', False)), fields=['fecha_eliminacion'], name='quotation_eliminadas_idx'),
+        ),
+    ]
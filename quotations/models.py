@@ -1,10 +1,23 @@
-from django.db import models
+from django.db import models, router, transaction
 from interfaz_crud.models import Cliente
 
 
+class CotizacionesActivasManager(models.Manager):
+    """Manager por defecto: excluye las cotizaciones eliminadas (borrado lógico)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(fecha_eliminacion__isnull=True)
+
+
 class Quotation(models.Model):
     """
     Cotización completa con todos los datos de entrada y resultados calculados.
+
+    La tabla `quotation` guarda solo las columnas que usan los listados y la
+    analítica. Los costos de armado, otros materiales y el desglose calculado
+    (gramos, CIF, precios con otras utilidades) están en `quotation_detalle`
+    (QuotationDetalle, relación 1:1); se leen y asignan como atributos de la
+    cotización (`cotizacion.cif_8`) y save() escribe las dos tablas.
     """
     # ========== RELACIÓN CON CLIENTE ==========
     cliente = models.ForeignKey(
@@ -83,6 +96,301 @@ class Quotation(models.Model):
         help_text="Espesor del material"
     )
     
+    # ========== COSTO TOTAL ==========
+    costo_total = models.FloatField(
+        "Costo total de producción",
+        null=True,
+        blank=True,
+        help_text="Costo total de producir la marquilla"
+    )
+    
+    # ========== PRECIOS DE VENTA ==========
+    precio_utilidad_28 = models.FloatField(
+        "Precio con utilidad 28%",
+        null=True,
+        blank=True,
+        help_text="Precio de venta con 28% de utilidad"
+    )
+    
+    # ========== METADATOS ==========
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviada', 'Enviada'),
+        ('aprobada', 'Aprobada'),
+    ]
+    
+    estado = models.CharField(
+        "Estado",
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='pendiente',
+        help_text="Estado de la cotización"
+    )
+    
+    fecha_creacion = models.DateTimeField(
+        "Fecha de creación",
+        auto_now_add=True,
+        help_text="Fecha y hora en que se creó la cotización"
+    )
+    
+    fecha_modificacion = models.DateTimeField(
+        "Fecha de modificación",
+        auto_now=True,
+        help_text="Fecha y hora de la última modificación"
+    )
+    
+    clave_idempotencia = models.CharField(
+        "Clave de idempotencia",
+        max_length=100,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Clave enviada por el cliente de la API para evitar duplicados al reintentar un lote"
+    )
+    
+    fecha_eliminacion = models.DateTimeField(
+        "Fecha de eliminación",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Momento en que se eliminó la cotización (vacío si está activa); "
+                  "la fila se borra al purgar (ver business_logic/eliminacion.py)"
+    )
+    
+    # `objects` no devuelve las cotizaciones eliminadas; `todos` incluye todas
+    objects = CotizacionesActivasManager()
+    todos = models.Manager()
+    
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'quotation'
+        verbose_name = "Cotización"
+        verbose_name_plural = "Cotizaciones"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            # Historial y estadísticas por cliente (ver interfaz_crud.views)
+            models.Index(fields=['cliente', '-fecha_creacion'], name='quotation_cliente_fecha_idx'),
+            # Incluye el precio para que las sumas y promedios por cliente se
+            # resuelvan solo con el índice (index-only scan en PostgreSQL)
+            models.Index(fields=['cliente', 'estado'], name='quotation_cliente_estado_idx',
+                         include=['precio_utilidad_28']),
+            # Listado por fecha con las columnas del resumen de cada fila
+            models.Index(fields=['-fecha_creacion'], name='quotation_lista_idx',
+                         include=['cliente', 'estado', 'cantidad', 'precio_utilidad_28']),
+            # Solo las filas pendientes de purgar
+            models.Index(fields=['fecha_eliminacion'], name='quotation_eliminadas_idx',
+                         condition=models.Q(fecha_eliminacion__isnull=False)),
+        ]
+    
+    # Columnas que muestra la lista de cotizaciones (todas en `quotation`)
+    CAMPOS_LISTA = (
+        'id', 'cliente__nombre', 'cliente__correo', 'ancho_cm', 'alto_cm', 'espesor',
+        'cantidad', 'cantidad_horizontal', 'cantidad_vertical', 'costo_total',
+        'precio_utilidad_28', 'estado', 'fecha_creacion',
+    )
+    
+    # Si se asignó algún campo del detalle desde el último save()
+    _detalle_modificado = False
+    
+    # Las cotizaciones movidas al archivo (CotizacionArchivada) son de solo lectura
+    archivada = False
+    
+    # Campos cuyo valor leído de la BD se recuerda para calcular deltas en las señales
+    CAMPOS_SEGUIDOS = ('estado', 'cliente_id', 'fecha_creacion', 'costo_total', 'precio_utilidad_28')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Guarda los valores leídos de la base de datos para que las señales puedan
+        detectar cambios (estado, cliente, totales) sin volver a consultar la fila.
+        Con only()/defer() se guardan solo los campos cargados.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._originales = {
+            campo: instance.__dict__[campo] for campo in cls.CAMPOS_SEGUIDOS if campo in instance.__dict__
+        }
+        return instance
+
+    @classmethod
+    def campos_seguidos_guardados(cls, update_fields):
+        """CAMPOS_SEGUIDOS que escribe un save() con estos `update_fields` (None = todos)."""
+        if update_fields is None:
+            return cls.CAMPOS_SEGUIDOS
+        return tuple(campo for campo in cls.CAMPOS_SEGUIDOS
+                     if campo in update_fields or campo.removesuffix('_id') in update_fields)
+    
+    def obtener_detalle(self):
+        """
+        Fila de `quotation_detalle` de la cotización. Si todavía no existe (por
+        ejemplo en una cotización sin guardar) se crea en memoria y se guarda
+        junto con la cotización.
+        """
+        try:
+            return self.detalle
+        except QuotationDetalle.DoesNotExist:
+            self.detalle = QuotationDetalle()
+            return self.detalle
+    
+    def _bloquear_fila(self, using):
+        """
+        Bloquea la fila hasta el final de la transacción y toma de ella los
+        valores seguidos: dos guardados simultáneos de la misma cotización
+        calculan sus deltas sobre lo que hay en la BD, no sobre lo que cada
+        uno leyó antes.
+        """
+        fila = (type(self)._base_manager.using(using).select_for_update()
+                .filter(pk=self.pk).values('fecha_eliminacion', *self.CAMPOS_SEGUIDOS).first())
+        if fila is None:
+            return
+        eliminada = fila.pop('fecha_eliminacion')
+        if eliminada is not None:
+            # Se eliminó mientras tanto: sigue eliminada y ya se restó de los
+            # contadores y del resumen, así que las señales no aplican deltas
+            self.fecha_eliminacion = eliminada
+            self._originales = None
+        else:
+            self._originales = fila
+
+    def save(self, *args, update_fields=None, **kwargs):
+        """
+        Guarda la cotización y su detalle en la misma transacción.
+
+        `update_fields` puede mezclar campos de las dos tablas; cada tabla
+        recibe solo los suyos. El detalle se escribe si la cotización es
+        nueva o si se asignó alguno de sus campos. Al editar un campo seguido
+        (o todos, sin `update_fields`) la fila queda bloqueada hasta el final
+        de la transacción (ver `_bloquear_fila`); los demás guardados, que no
+        cambian contadores ni resumen, no la bloquean.
+        """
+        campos_detalle = None
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            campos_detalle = update_fields & set(CAMPOS_DETALLE)
+            update_fields -= campos_detalle
+
+        # El detalle solo se lee si hay que escribirlo (cotización nueva o
+        # campos del detalle asignados)
+        escribir_detalle = self._state.adding or campos_detalle or self._detalle_modificado
+        detalle = self.obtener_detalle() if escribir_detalle else None
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            if not self._state.adding and self.pk is not None and (
+                self.campos_seguidos_guardados(update_fields)
+                or 'fecha_eliminacion' in update_fields
+            ):
+                self._bloquear_fila(using)
+            if update_fields is None or update_fields:
+                super().save(*args, update_fields=update_fields, **kwargs)
+            if detalle is None:
+                return
+            if detalle._state.adding:
+                detalle.cotizacion = self
+                detalle.save(using=using, force_insert=True)
+            elif campos_detalle:
+                detalle.save(using=using, update_fields=campos_detalle)
+            elif update_fields is None:
+                detalle.save(using=using)
+            self._detalle_modificado = False
+    
+    @staticmethod
+    def campos_desde_resultado(datos, resultado):
+        """
+        Construye los valores de los campos del modelo a partir de los datos de
+        entrada y del resultado de QuotationProcessor.calcular_cotizacion().
+
+        Args:
+            datos: Diccionario de entrada (formato de armar_datos_cotizacion)
+            resultado: Resultado exitoso del procesador
+
+        Returns:
+            dict: Argumentos para Quotation(**campos) o para setattr en una edición
+        """
+        dimensiones = resultado['dimensiones']
+        gramos = resultado['gramos']
+        costos = resultado['costos']
+        armado_data = datos.get('armado', {})
+        otros_data = datos.get('otros_materiales', {})
+
+        return {
+            'cliente': datos['cliente'],
+            'ancho_cm': datos['ancho_cm'],
+            'alto_cm': datos['alto_cm'],
+            'espacio_entre_cm': datos['espacio_entre_cm'],
+            'cantidad_horizontal': datos['cantidad_horizontal'],
+            'cantidad_vertical': datos['cantidad_vertical'],
+            'cantidad': datos['cantidad'],
+            'valor_por_troquelada': datos['valor_por_troquelada'],
+            'montaje': datos['montaje'],
+            'medida': datos['medida'],
+            'espesor': datos.get('espesor', '2_mm'),
+            'bolsa_individual': armado_data.get('bolsa_individual', 0),
+            'sellada': armado_data.get('sellada', 0),
+            'cortada': armado_data.get('cortada', 0),
+            'empaque_final': armado_data.get('empaque_final', 0),
+            'llenada_gel': armado_data.get('llenada_gel', 0),
+            'pin_soporte': armado_data.get('pin_soporte', 0),
+            'samblasted': armado_data.get('samblasted', 0),
+            'mo_rubber': otros_data.get('mo_rubber', 0),
+            'numero_plotter': otros_data.get('numero_plotter', 0),
+            'perforada': otros_data.get('perforada', 0),
+            'guillotina': otros_data.get('guillotina', 0),
+            'largo_total_cm': dimensiones['largo_total'],
+            'alto_total_cm': dimensiones['alto_total'],
+            'area_total_cm2': dimensiones['area_total'],
+            'gramos_total': gramos['gramos_total'],
+            'gramos_por_cm2': gramos['gramos_por_cm2'],
+            'costo_por_gramo': resultado['costo_por_gramo'],
+            'material': costos['material'],
+            'total_material': costos['total_material'],
+            'total_armado': costos['total_armado'],
+            'otros_materiales_total': costos['otros_materiales_total'],
+            'cif_8': costos['cif_8'],
+            'cif_10': costos['cif_10'],
+            'cif_15': costos['cif_15'],
+            'admon': costos['admon'],
+            'costo_total': costos['costo_total'],
+            'precio_utilidad_45': costos['precio_utilidad_45'],
+            'precio_utilidad_28': costos['precio_utilidad_28'],
+            'precio_utilidad_17': costos['precio_utilidad_17'],
+            'precio_utilidad_11': costos['precio_utilidad_11']
+        }
+    
+    def __str__(self):
+        return f"Cotización #{self.id} - {self.cliente.nombre} ({self.cantidad} unidades)"
+    
+    @property
+    def nombre_cliente(self):
+        """Retorna el nombre del cliente desde la relación."""
+        return self.cliente.nombre if self.cliente else ""
+    
+    @property
+    def marquillas_por_molde(self):
+        """Calcula cuántas marquillas salen por molde."""
+        return self.cantidad_horizontal * self.cantidad_vertical
+    
+    @property
+    def precio_recomendado(self):
+        """Retorna el precio con utilidad media (28%)."""
+        return self.precio_utilidad_28 if self.precio_utilidad_28 else 0
+
+
+class QuotationDetalle(models.Model):
+    """
+    Columnas de la cotización que solo se usan al verla o editarla.
+
+    Separarlas de `quotation` deja la tabla principal angosta: los listados,
+    conteos y sumas leen muchas menos páginas. Se accede a estos campos como
+    atributos de Quotation (ver CAMPOS_DETALLE al final del módulo).
+    """
+    cotizacion = models.OneToOneField(
+        Quotation,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='detalle',
+        help_text="Cotización a la que pertenece el detalle"
+    )
+    
     # ========== COSTOS DE ARMADO ==========
     bolsa_individual = models.FloatField(
         "Bolsa individual",
@@ -254,14 +562,6 @@ class Quotation(models.Model):
         help_text="Costos de administración"
     )
     
-    # ========== COSTO TOTAL ==========
-    costo_total = models.FloatField(
-        "Costo total de producción",
-        null=True,
-        blank=True,
-        help_text="Costo total de producir la marquilla"
-    )
-    
     # ========== PRECIOS DE VENTA ==========
     precio_utilidad_45 = models.FloatField(
         "Precio con utilidad 45%",
@@ -270,13 +570,6 @@ class Quotation(models.Model):
         help_text="Precio de venta con 45% de utilidad"
     )
     
-    precio_utilidad_28 = models.FloatField(
-        "Precio con utilidad 28%",
-        null=True,
-        blank=True,
-        help_text="Precio de venta con 28% de utilidad"
-    )
-    
     precio_utilidad_17 = models.FloatField(
         "Precio con utilidad 17%",
         null=True,
@@ -291,54 +584,306 @@ class Quotation(models.Model):
         help_text="Precio de venta con 11% de utilidad"
     )
     
-    # ========== METADATOS ==========
-    ESTADO_CHOICES = [
-        ('pendiente', 'Pendiente'),
-        ('enviada', 'Enviada'),
-        ('aprobada', 'Aprobada'),
-    ]
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'quotation_detalle'
+        verbose_name = "Detalle de cotización"
+        verbose_name_plural = "Detalles de cotización"
+    
+    def __str__(self):
+        return f"Detalle de la cotización #{self.cotizacion_id}"
+
+
+def _campo_detalle(nombre):
+    """Propiedad de Quotation que lee y asigna `nombre` en su detalle."""
+    def obtener(self):
+        return getattr(self.obtener_detalle(), nombre)
+
+    def asignar(self, valor):
+        setattr(self.obtener_detalle(), nombre, valor)
+        self._detalle_modificado = True
+
+    return property(obtener, asignar)
+
+
+# Campos de QuotationDetalle accesibles como atributos de Quotation; también
+# se aceptan como argumentos de Quotation(...) y Quotation.objects.create(...)
+CAMPOS_DETALLE = tuple(
+    f.name for f in QuotationDetalle._meta.concrete_fields if f.name != 'cotizacion'
+)
+for _nombre in CAMPOS_DETALLE:
+    setattr(Quotation, _nombre, _campo_detalle(_nombre))
+
+
+class Contador(models.Model):
+    """
+    Contador mantenido incrementalmente para las estadísticas del inicio.
+
+    Cada fila guarda un valor agregado identificado por una clave, por ejemplo:
+    'clientes', 'cotizaciones', 'cotizaciones:estado:enviada' o
+    'cotizaciones:mes:2025-11'. Se actualiza desde las señales de Cliente y
+    Quotation (ver quotations/signals.py) para no ejecutar COUNT(*) en cada visita.
+    """
+    clave = models.CharField(
+        "Clave",
+        max_length=64,
+        unique=True,
+        help_text="Identificador del contador"
+    )
+    
+    valor = models.BigIntegerField(
+        "Valor",
+        default=0,
+        help_text="Valor actual del contador"
+    )
+    
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'contador'
+        verbose_name = "Contador"
+        verbose_name_plural = "Contadores"
+    
+    def __str__(self):
+        return f"{self.clave} = {self.valor}"
+
+
+class ResumenMensual(models.Model):
+    """
+    Totales mensuales de cotizaciones por estado y cliente.
+
+    Se actualiza con deltas en cada alta, edición, cambio de estado o borrado
+    de una cotización (ver business_logic/resumen_mensual.py), así las
+    consultas de analítica no recorren la tabla `quotation`.
+    """
+    mes = models.DateField(
+        "Mes",
+        help_text="Primer día del mes de creación de las cotizaciones"
+    )
     
     estado = models.CharField(
         "Estado",
         max_length=20,
-        choices=ESTADO_CHOICES,
-        default='pendiente',
-        help_text="Estado de la cotización"
+        choices=Quotation.ESTADO_CHOICES,
+        help_text="Estado de las cotizaciones agregadas"
     )
     
-    fecha_creacion = models.DateTimeField(
-        "Fecha de creación",
-        auto_now_add=True,
-        help_text="Fecha y hora en que se creó la cotización"
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='resumenes_mensuales',
+        help_text="Cliente de las cotizaciones agregadas"
     )
     
-    fecha_modificacion = models.DateTimeField(
-        "Fecha de modificación",
-        auto_now=True,
-        help_text="Fecha y hora de la última modificación"
+    cantidad_cotizaciones = models.IntegerField(
+        "Cantidad de cotizaciones",
+        default=0
+    )
+    
+    suma_costo_total = models.FloatField(
+        "Suma de costo total",
+        default=0
+    )
+    
+    suma_precio_utilidad_28 = models.FloatField(
+        "Suma de precio con utilidad 28%",
+        default=0
     )
     
     class Meta:
         app_label = 'quotations'
-        db_table = 'quotation'
-        verbose_name = "Cotización"
-        verbose_name_plural = "Cotizaciones"
-        ordering = ['-fecha_creacion']
+        db_table = 'resumen_mensual'
+        verbose_name = "Resumen mensual"
+        verbose_name_plural = "Resúmenes mensuales"
+        constraints = [
+            models.UniqueConstraint(fields=['mes', 'estado', 'cliente'], name='resumen_mensual_unico'),
+        ]
     
     def __str__(self):
-        return f"Cotización #{self.id} - {self.cliente.nombre} ({self.cantidad} unidades)"
+        return f"{self.mes:%Y-%m} {self.estado} cliente {self.cliente_id}: {self.cantidad_cotizaciones}"
+
+
+class TransicionEstado(models.Model):
+    """
+    Registro de solo inserción con cada cambio de estado de una cotización.
+
+    La primera fila de cada cotización (estado_anterior vacío) marca su
+    creación. Se escribe en la misma transacción que el cambio de estado y
+    alimenta la analítica del embudo pendiente → enviada → aprobada.
+    """
+    cotizacion = models.ForeignKey(
+        Quotation,
+        on_delete=models.CASCADE,
+        related_name='transiciones',
+        help_text="Cotización que cambió de estado"
+    )
     
-    @property
-    def nombre_cliente(self):
-        """Retorna el nombre del cliente desde la relación."""
-        return self.cliente.nombre if self.cliente else ""
+    estado_anterior = models.CharField(
+        "Estado anterior",
+        max_length=20,
+        choices=Quotation.ESTADO_CHOICES,
+        null=True,
+        blank=True,
+        help_text="Estado previo (vacío en la creación)"
+    )
     
-    @property
-    def marquillas_por_molde(self):
-        """Calcula cuántas marquillas salen por molde."""
-        return self.cantidad_horizontal * self.cantidad_vertical
+    estado_nuevo = models.CharField(
+        "Estado nuevo",
+        max_length=20,
+        choices=Quotation.ESTADO_CHOICES,
+        help_text="Estado al que pasó la cotización"
+    )
     
-    @property
-    def precio_recomendado(self):
-        """Retorna el precio con utilidad media (28%)."""
-        return self.precio_utilidad_28 if self.precio_utilidad_28 else 0
+    fecha = models.DateTimeField(
+        "Fecha",
+        help_text="Momento de la transición"
+    )
+    
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'transicion_estado'
+        verbose_name = "Transición de estado"
+        verbose_name_plural = "Transiciones de estado"
+        indexes = [
+            models.Index(fields=['fecha'], name='transicion_fecha_idx'),
+            models.Index(fields=['cotizacion', 'fecha'], name='transicion_cotizacion_idx'),
+            models.Index(fields=['estado_nuevo', 'fecha'], name='transicion_estado_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.cotizacion_id}: {self.estado_anterior or '-'} → {self.estado_nuevo} ({self.fecha:%Y-%m-%d %H:%M})"
+
+
+class RevisionCotizacion(models.Model):
+    """
+    Versión de una cotización editada.
+
+    Cada revisión guarda solo los campos que cambiaron respecto a la anterior
+    (`datos`); cada cierto número de revisiones se guarda una copia completa
+    (`es_completa`) para que reconstruir cualquier versión lea pocas filas.
+    Ver business_logic/revisiones.py.
+    """
+    cotizacion = models.ForeignKey(
+        Quotation,
+        on_delete=models.CASCADE,
+        related_name='revisiones',
+        help_text="Cotización a la que pertenece la revisión"
+    )
+    
+    numero = models.PositiveIntegerField(
+        "Número de revisión",
+        help_text="Versión de la cotización, empezando en 1"
+    )
+    
+    es_completa = models.BooleanField(
+        "Copia completa",
+        default=False,
+        help_text="Si `datos` contiene todos los campos o solo los cambiados"
+    )
+    
+    datos = models.JSONField(
+        "Datos",
+        help_text="Campos de la cotización en esta revisión (completos o solo los cambiados)"
+    )
+    
+    fecha = models.DateTimeField(
+        "Fecha",
+        help_text="Momento en que la cotización quedó con estos valores"
+    )
+    
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'revision_cotizacion'
+        verbose_name = "Revisión de cotización"
+        verbose_name_plural = "Revisiones de cotización"
+        ordering = ['cotizacion', 'numero']
+        constraints = [
+            models.UniqueConstraint(fields=['cotizacion', 'numero'], name='revision_cotizacion_unica'),
+        ]
+    
+    def __str__(self):
+        return f"Cotización #{self.cotizacion_id} v{self.numero}"
+
+
+class ArchivadasActivasManager(models.Manager):
+    """Manager por defecto del archivo: excluye las de clientes eliminados."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(cliente__fecha_eliminacion__isnull=True)
+
+
+class CotizacionArchivada(models.Model):
+    """
+    Cotización antigua movida fuera de `quotation` (ver business_logic/archivo.py).
+
+    Conserva el id original y las columnas de los listados; el detalle y el
+    historial (transiciones de estado y revisiones) se guardan empaquetados
+    en JSON porque una cotización archivada ya no se edita.
+
+    En PostgreSQL la tabla está particionada por rango mensual de
+    `fecha_creacion` (clave primaria física: id, fecha_creacion); en otras
+    bases es una tabla normal.
+    """
+    id = models.BigIntegerField(
+        "ID",
+        primary_key=True,
+        help_text="Id que tenía la cotización en `quotation`"
+    )
+    
+    cliente = models.ForeignKey(
+        Cliente,
+        on_delete=models.CASCADE,
+        related_name='cotizaciones_archivadas',
+        db_index=False,
+        help_text="Cliente al que pertenece la cotización"
+    )
+    
+    ancho_cm = models.FloatField("Ancho (cm)")
+    alto_cm = models.FloatField("Alto (cm)")
+    espacio_entre_cm = models.FloatField("Espacio entre marquillas (cm)")
+    cantidad_horizontal = models.IntegerField("Cantidad horizontal")
+    cantidad_vertical = models.IntegerField("Cantidad vertical")
+    cantidad = models.IntegerField("Cantidad total")
+    valor_por_troquelada = models.FloatField("Valor por troquelada")
+    montaje = models.FloatField("Valor del montaje")
+    medida = models.FloatField("Valor de la medida")
+    espesor = models.CharField("Espesor", max_length=10, choices=Quotation.ESPESOR_CHOICES)
+    costo_total = models.FloatField("Costo total de producción", null=True, blank=True)
+    precio_utilidad_28 = models.FloatField("Precio con utilidad 28%", null=True, blank=True)
+    estado = models.CharField("Estado", max_length=20, choices=Quotation.ESTADO_CHOICES)
+    fecha_creacion = models.DateTimeField("Fecha de creación")
+    fecha_modificacion = models.DateTimeField("Fecha de modificación")
+    
+    detalle = models.JSONField(
+        "Detalle",
+        help_text="Campos de QuotationDetalle al archivar"
+    )
+    
+    historial = models.JSONField(
+        "Historial",
+        help_text="Transiciones de estado y revisiones de la cotización al archivar"
+    )
+    
+    fecha_archivo = models.DateTimeField(
+        "Fecha de archivo",
+        help_text="Momento en que la cotización se movió al archivo"
+    )
+    
+    archivada = True
+    
+    # `objects` excluye las de clientes eliminados (se borran al purgar)
+    objects = ArchivadasActivasManager()
+    todos = models.Manager()
+    
+    class Meta:
+        app_label = 'quotations'
+        db_table = 'quotation_archivo'
+        verbose_name = "Cotización archivada"
+        verbose_name_plural = "Cotizaciones archivadas"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['-fecha_creacion'], name='quotation_archivo_fecha_idx'),
+            models.Index(fields=['cliente', '-fecha_creacion'], name='quotation_archivo_cliente_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Cotización archivada #{self.id} - {self.cliente.nombre} ({self.cantidad} unidades)"
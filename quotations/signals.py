@@ -0,0 +1,113 @@
+"""
+Señales de la app quotations
+
+Mantienen actualizados, con deltas, los contadores de estadísticas (ver
+business_logic/contadores.py) y el resumen mensual (ver
+business_logic/resumen_mensual.py) cuando se crean, editan o eliminan
+clientes y cotizaciones (los borrados lógicos se restan en
+business_logic/eliminacion.py), y registran cada cambio de estado en
+`transicion_estado` para la analítica del embudo.
+
+Los deltas parten de los valores de la fila bloqueada en la misma
+transacción (ver Quotation._bloquear_fila), no de lo leído antes: dos
+escrituras simultáneas de la misma cotización no los aplican dos veces.
+"""
+
+from django.db import router
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from interfaz_crud.models import Cliente
+from .business_logic import contadores, resumen_mensual
+from .models import CotizacionArchivada, Quotation, TransicionEstado
+
+
+def cotizaciones_creadas_en_lote(cotizaciones):
+    """
+    Aplica a un lote insertado con bulk_create lo que post_save haría con
+    cada cotización (bulk_create no dispara señales).
+    """
+    contadores.registrar_cotizaciones_creadas(cotizaciones)
+    resumen_mensual.registrar_cotizaciones_creadas(cotizaciones)
+    TransicionEstado.objects.bulk_create([
+        TransicionEstado(cotizacion=c, estado_nuevo=c.estado, fecha=c.fecha_creacion)
+        for c in cotizaciones
+    ], batch_size=500)
+
+
+@receiver(post_save, sender=Quotation)
+def cotizacion_guardada(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Suma la cotización nueva o aplica el cambio respecto a lo leído de la BD.
+    Los guardados que no escriben campos seguidos no cambian nada.
+    """
+    if raw:
+        return
+    guardados = Quotation.campos_seguidos_guardados(None if created else update_fields)
+    if not guardados:
+        return
+    originales = None if created else getattr(instance, '_originales', None)
+    # Los campos que no se escribieron siguen con el valor de la fila bloqueada
+    actuales = {**(originales or {}), **{campo: getattr(instance, campo) for campo in guardados}}
+    if created:
+        contadores.ajustar_contadores(contadores.deltas_cotizacion(instance, 1))
+        TransicionEstado.objects.create(
+            cotizacion=instance, estado_nuevo=instance.estado, fecha=instance.fecha_creacion
+        )
+    elif originales is not None and originales['estado'] != actuales['estado']:
+        contadores.ajustar_contadores({
+            contadores.clave_estado(originales['estado']): -1,
+            contadores.clave_estado(actuales['estado']): 1,
+        })
+        TransicionEstado.objects.create(
+            cotizacion=instance,
+            estado_anterior=originales['estado'],
+            estado_nuevo=actuales['estado'],
+            fecha=timezone.now(),
+        )
+    if created or originales is not None:
+        resumen_mensual.registrar_cambio(instance, originales, actuales)
+    instance._originales = actuales
+
+
+@receiver(pre_delete, sender=Quotation)
+def cotizacion_por_eliminar(sender, instance, origin=None, **kwargs):
+    """
+    Al eliminar una sola cotización (instance.delete()), bloquea su fila y
+    toma los valores que hay en la BD para restar esos y no los que se
+    leyeron antes (ver Quotation._bloquear_fila). En los borrados en cascada
+    las filas las acaba de leer el propio borrado.
+    """
+    if origin is not instance:
+        return
+    instance._bloquear_fila(router.db_for_write(sender, instance=instance))
+    if instance._originales is not None:
+        for campo, valor in instance._originales.items():
+            setattr(instance, campo, valor)
+
+
+@receiver(post_delete, sender=Quotation)
+@receiver(post_delete, sender=CotizacionArchivada)
+def cotizacion_eliminada(sender, instance, **kwargs):
+    """
+    Resta la cotización eliminada (también en borrados en cascada y las
+    archivadas al eliminar su cliente). Si la cotización o su cliente ya
+    estaban marcados como eliminados, ya se restó al marcarlos.
+    """
+    if getattr(instance, 'fecha_eliminacion', None) is not None:
+        return
+    contadores.ajustar_contadores(contadores.deltas_cotizacion(instance, -1))
+    resumen_mensual.registrar_eliminacion(instance)
+
+
+@receiver(post_save, sender=Cliente)
+def cliente_guardado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        contadores.ajustar_contadores({contadores.CLAVE_CLIENTES: 1})
+
+
+@receiver(post_delete, sender=Cliente)
+def cliente_eliminado(sender, instance, **kwargs):
+    if instance.fecha_eliminacion is None:
+        contadores.ajustar_contadores({contadores.CLAVE_CLIENTES: -1})
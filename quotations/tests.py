@@ -1,3 +1,398 @@
-from django.test import TestCase
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from interfaz_crud.models import Cliente
+from quotation_project.coalescencia import compartir
+from quotation_project.consultas import max_consultas
+from quotation_project.memoria import PerfilMemoria
+from quotation_project.replicas import COOKIE_PRIMARIA, PrimariaTrasEscrituraMiddleware, alias_de_lectura, en_replica
+from quotations.business_logic.archivo import archivar_cotizaciones
+from quotations.business_logic.contadores import CLAVE_CORTE_ARCHIVO, recalcular_contadores
+from quotations.business_logic.datos_sinteticos import generar_entradas, sembrar
+from quotations.business_logic.eliminacion import eliminar_cliente, eliminar_cotizaciones, purgar_eliminados
+from quotations.business_logic.estados import cambiar_estados
+from quotations.business_logic.quotation_processor import QuotationProcessor
+from quotations.business_logic.resumen_mensual import reconstruir_resumen
+from quotations.business_logic.revisiones import (
+    REVISIONES_ENTRE_COPIAS, campos_versionados, guardar_con_revision, reconstruir_version,
+)
+from quotations.forms.quotation_form import armar_datos_cotizacion
+from quotations.management.commands.revisar_consultas import PRESUPUESTOS, peticiones_presupuestadas
+from quotations.management.commands.revisar_memoria import TECHOS_MB, escenarios_memoria
+from quotations.models import Contador, CotizacionArchivada, Quotation, ResumenMensual, RevisionCotizacion
+from quotations.utils.calculo_en_vivo import CambioInvalido, Canal
+
+
+def crear_cotizacion(cliente, semilla=0, **campos):
+    """Calcula una entrada sintética y la guarda con create() (con señales)."""
+    entrada = generar_entradas(1, [cliente.pk], semilla)[0]
+    datos = armar_datos_cotizacion({**entrada, 'cliente': cliente})
+    resultado = QuotationProcessor().calcular_cotizacion(datos)
+    return Quotation.objects.create(**{**Quotation.campos_desde_resultado(datos, resultado), **campos})
+
+
+def contadores_y_resumen():
+    """Contadores y filas del resumen mensual distintos de cero."""
+    contadores = dict(Contador.objects.exclude(clave=CLAVE_CORTE_ARCHIVO).exclude(valor=0)
+                      .values_list('clave', 'valor'))
+    resumen = {
+        (f.mes, f.estado, f.cliente_id): (f.cantidad_cotizaciones, round(f.suma_costo_total, 2),
+                                          round(f.suma_precio_utilidad_28, 2))
+        for f in ResumenMensual.objects.exclude(cantidad_cotizaciones=0)
+    }
+    return contadores, resumen
+
+
+# Sin réplicas ni caché de estadísticas: cada vista consulta la base de prueba
+@override_settings(REPLICAS_LECTURA=[], ESTADISTICAS_CACHE_SEGUNDOS=0,
+                   DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False)
+class PresupuestoConsultasTests(TestCase):
+    """Cada vista de PRESUPUESTOS (ver manage.py revisar_consultas) dentro de su máximo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(5, 50)
+
+    def test_vistas_dentro_de_su_presupuesto(self):
+        cliente_http = Client()
+        for nombre, metodo, url, datos, cabeceras in peticiones_presupuestadas(semilla=0):
+            with self.subTest(vista=nombre):
+                with max_consultas(PRESUPUESTOS[nombre]):
+                    respuesta = getattr(cliente_http, metodo)(url, datos, **cabeceras)
+                self.assertLess(respuesta.status_code, 400)
+
+
+# Sin réplicas ni instrumentación que agregue memoria por consulta
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False,
+                   TIEMPOS_ETAPAS=False, GRABACION_ARCHIVO=None)
+class TechosMemoriaTests(TestCase):
+    """
+    Memoria pico de la lista, la API y el cálculo por lotes dentro de
+    TECHOS_MB. El crecimiento con bases grandes lo mide manage.py revisar_memoria.
+    """
+
+    ESCENARIOS = ('lista_cotizaciones', 'api_cotizaciones', 'api_clientes', 'calculo_lote')
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(25, 500)
+
+    def test_escenarios_dentro_de_su_techo(self):
+        escenarios = escenarios_memoria(semilla=0)
+        for nombre in self.ESCENARIOS:
+            with self.subTest(escenario=nombre):
+                escenarios[nombre]()  # calentamiento: cachés, plantillas, YAML
+                with PerfilMemoria(top=3) as perfil:
+                    escenarios[nombre]()
+                self.assertLessEqual(perfil.pico_mb, TECHOS_MB[nombre], perfil.informe())
+
+
+@override_settings(DETECTOR_CONSULTAS=True, DETECTOR_CONSULTAS_LENTA_MS=0,
+                   REPLICAS_LECTURA=[], ESTADISTICAS_CACHE_SEGUNDOS=0)
+class DetectorConsultasTests(TestCase):
+    """El origen de cada consulta es la línea del proyecto, no la envoltura de las métricas."""
+
+    def test_origen_con_metricas_activas(self):
+        # Con LENTA_MS = 0 cada consulta se registra con su origen
+        with self.assertLogs('quotation_project.consultas', 'WARNING') as registros:
+            self.client.get(reverse('quotations:inicio'))
+        self.assertTrue(registros.output)
+        for linea in registros.output:
+            self.assertNotIn('quotation_project/metricas.py', linea)
+            self.assertIn('desde quotations/business_logic/contadores.py:', linea)
+
+
+@override_settings(METRICAS_IPS=('10.0.0.5',), METRICAS_TOKEN='secreto')
+class AccesoMetricasTests(TestCase):
+    """/metrics responde a las IP permitidas, al token bearer y al staff; al resto, 403."""
+
+    def test_acceso(self):
+        url = reverse('metricas')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False)
+class ConsistenciaContadoresTests(TestCase):
+    """
+    Los contadores y el resumen mensual mantenidos con deltas coinciden con
+    los que se reconstruyen desde las tablas tras cada tipo de escritura.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(3, 20)
+        cls.clientes = list(Cliente.objects.order_by('pk'))
+
+    def assertIgualAReconstruido(self):
+        mantenidos = contadores_y_resumen()
+        recalcular_contadores()
+        reconstruir_resumen()
+        self.assertEqual(mantenidos, contadores_y_resumen())
+
+    def test_escrituras(self):
+        cotizacion = crear_cotizacion(self.clientes[0])
+        self.assertIgualAReconstruido()
+
+        # Edición completa: cliente y totales
+        cotizacion.cliente = self.clientes[1]
+        cotizacion.costo_total += 100
+        cotizacion.save()
+        self.assertIgualAReconstruido()
+
+        # Edición de una instancia cargada con only()
+        parcial = Quotation.objects.only('id', 'estado').get(pk=cotizacion.pk)
+        parcial.estado = 'enviada'
+        parcial.save()
+        self.assertIgualAReconstruido()
+
+        cambiar_estados([cotizacion.pk, *Quotation.objects.values_list('pk', flat=True)[:5]], 'aprobada')
+        self.assertIgualAReconstruido()
+
+        eliminar_cotizaciones([cotizacion.pk])
+        self.assertIgualAReconstruido()
+        Quotation.objects.exclude(cliente=self.clientes[2]).first().delete()
+        self.assertIgualAReconstruido()
+        eliminar_cliente(self.clientes[2].pk)
+        self.assertIgualAReconstruido()
+
+        borradas = purgar_eliminados(dias=0)
+        self.assertEqual(borradas['clientes'], 1)
+        self.assertFalse(Quotation.todos.filter(pk=cotizacion.pk).exists())
+        self.assertIgualAReconstruido()
+
+
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False)
+class RevisionesTests(TestCase):
+    """Cada versión se reconstruye igual a como quedó, antes y después de una copia completa."""
+
+    def test_reconstruir_cada_version(self):
+        sembrar(1, 0)
+        cotizacion = crear_cotizacion(Cliente.objects.get())
+
+        def valores():
+            guardada = Quotation.objects.get(pk=cotizacion.pk)
+            return {campo: getattr(guardada, campo) for campo in campos_versionados()}
+
+        esperadas = {1: valores()}
+        ediciones = REVISIONES_ENTRE_COPIAS + 3
+        for numero in range(2, ediciones + 2):
+            cambios = {'cantidad': 100 * numero, 'costo_total': 1000.5 + numero}
+            self.assertEqual(sorted(guardar_con_revision(cotizacion, cambios)), sorted(cambios))
+            esperadas[numero] = valores()
+        # Sin cambios no se crea revisión
+        self.assertEqual(guardar_con_revision(cotizacion, cambios), [])
+
+        completas = set(RevisionCotizacion.objects.filter(cotizacion=cotizacion, es_completa=True)
+                        .values_list('numero', flat=True))
+        self.assertEqual(completas, {1, REVISIONES_ENTRE_COPIAS + 1})
+        for numero, esperada in esperadas.items():
+            with self.subTest(version=numero):
+                self.assertEqual(reconstruir_version(cotizacion.pk, numero), esperada)
+        with self.assertRaises(RevisionCotizacion.DoesNotExist):
+            reconstruir_version(cotizacion.pk, ediciones + 2)
+
+
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False,
+                   ARCHIVO_ESTADOS=('aprobada',))
+class ArchivoTests(TestCase):
+    """Solo se archivan las cerradas antiguas y la lista las vuelve a mostrar al filtrar por fecha."""
+
+    def test_archivar_y_listar(self):
+        sembrar(1, 0)
+        cliente = Cliente.objects.get()
+        aprobada = crear_cotizacion(cliente, estado='aprobada')
+        pendiente = crear_cotizacion(cliente, semilla=1)
+        reciente = crear_cotizacion(cliente, semilla=2, estado='aprobada')
+        antigua = timezone.now() - timedelta(days=800)
+        Quotation.objects.filter(pk__in=[aprobada.pk, pendiente.pk]).update(
+            fecha_creacion=antigua, fecha_modificacion=antigua)
+        # El UPDATE directo no pasa por las señales
+        recalcular_contadores()
+        reconstruir_resumen()
+        antes = contadores_y_resumen()
+
+        self.assertEqual(archivar_cotizaciones(dias=730), 1)
+        self.assertTrue(CotizacionArchivada.objects.filter(pk=aprobada.pk).exists())
+        self.assertEqual(set(Quotation.objects.values_list('pk', flat=True)), {pendiente.pk, reciente.pk})
+        # Las archivadas siguen contando en las estadísticas
+        self.assertEqual(contadores_y_resumen(), antes)
+
+        respuesta = self.client.get(reverse('quotations:lista_cotizaciones'),
+                                    {'fecha_creacion': timezone.localdate(antigua).isoformat()})
+        filas = {c.pk: c.archivada for c in respuesta.context['cotizaciones']}
+        self.assertEqual(filas, {aprobada.pk: True, pendiente.pk: False})
+
+
+@override_settings(REPLICAS_LECTURA=['replica'], REPLICA_PEGAJOSA_SEGUNDOS=10)
+class PrimariaTrasEscrituraTests(SimpleTestCase):
+    """Tras una escritura, el mismo navegador lee de la primaria aunque la vista use réplicas."""
+
+    def alias_de(self, request):
+        leidos = []
+
+        def vista(request):
+            with en_replica():
+                leidos.append(alias_de_lectura())
+            return HttpResponse()
+
+        respuesta = PrimariaTrasEscrituraMiddleware(vista)(request)
+        return leidos[0], respuesta
+
+    def test_cookie_tras_escribir(self):
+        fabrica = RequestFactory()
+        _, respuesta = self.alias_de(fabrica.post('/cotizaciones/'))
+        cookie = respuesta.cookies[COOKIE_PRIMARIA]
+        self.assertEqual(cookie['max-age'], 10)
+
+        self.assertEqual(self.alias_de(fabrica.get('/cotizaciones/'))[0], 'replica')
+        fabrica.cookies[COOKIE_PRIMARIA] = cookie.value
+        alias, respuesta = self.alias_de(fabrica.get('/cotizaciones/'))
+        self.assertEqual(alias, 'default')
+        self.assertNotIn(COOKIE_PRIMARIA, respuesta.cookies)
+
+
+@override_settings(REPLICAS_LECTURA=[], DETECTOR_CONSULTAS=False, TIEMPOS_ETAPAS=False)
+class ContratoJSONTests(TestCase):
+    """Respuesta JSON v1 de cotizar/ (ver quotations/utils/respuesta_calculo.py)."""
+
+    AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(1, 0)
+        cls.entrada = generar_entradas(1, [Cliente.objects.get().pk])[0]
+
+    def calcular(self, datos, **cabeceras):
+        return self.client.post(reverse('quotations:cotizar'), datos, **self.AJAX, **cabeceras)
+
+    def test_calculo_correcto(self):
+        respuesta = self.calcular(self.entrada)
+        self.assertEqual(respuesta.status_code, 200)
+        cuerpo = respuesta.json()
+        self.assertEqual(set(cuerpo), {'v', 'ok', 'cliente', 'cantidad', 'dimensiones', 'gramos',
+                                       'costo_por_gramo', 'costos'})
+        self.assertEqual((cuerpo['v'], cuerpo['ok'], cuerpo['cliente']), (1, True, self.entrada['cliente']))
+        self.assertEqual(set(cuerpo['dimensiones']), {'largo_total', 'alto_total', 'area_total'})
+        self.assertEqual(set(cuerpo['gramos']), {'total', 'por_cm2'})
+
+    def test_errores(self):
+        invalida = {**self.entrada, 'ancho_cm': ''}
+        respuesta = self.calcular(invalida)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.json()['tipo'], 'validation_error')
+        self.assertIn('ancho_cm', respuesta.json()['errores'])
+
+        respuesta = self.calcular(self.entrada, HTTP_X_VERSION_ESQUEMA='99')
+        self.assertEqual(respuesta.status_code, 406)
+        self.assertEqual(respuesta.json()['tipo'], 'version_error')
+
+        with mock.patch.object(QuotationProcessor, 'calcular_layout', side_effect=ValueError('sin layout')):
+            respuesta = self.calcular(self.entrada)
+        self.assertEqual(respuesta.status_code, 422)
+        self.assertEqual(respuesta.json()['tipo'], 'calculation_error')
+        self.assertFalse(respuesta.json()['ok'])
+
+
+@override_settings(COALESCENCIA=True, COALESCENCIA_ENTRE_PROCESOS=False, COALESCENCIA_ESPERA_SEGUNDOS=10)
+class CoalescenciaTests(SimpleTestCase):
+    """Las llamadas simultáneas con la misma clave comparten un cálculo, y también su error."""
+
+    SEGUIDORAS = 4
+
+    def simultaneas(self, calcular):
+        """Resultados (o excepciones) de una llamada líder y SEGUIDORAS llamadas mientras calcula."""
+        empezo, liberar = threading.Event(), threading.Event()
+        llamadas = []
+
+        def lider():
+            llamadas.append(1)
+            empezo.set()
+            liberar.wait(5)
+            return calcular()
+
+        def llamar(funcion):
+            try:
+                return compartir('prueba', 'clave', funcion)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(self.SEGUIDORAS + 1) as ejecutor:
+            futuros = [ejecutor.submit(llamar, lider)]
+            empezo.wait(5)
+            futuros += [ejecutor.submit(llamar, lambda: llamadas.append(1)) for _ in range(self.SEGUIDORAS)]
+            # Margen para que las seguidoras lleguen a esperar al cálculo en curso
+            time.sleep(0.2)
+            liberar.set()
+            resultados = [f.result() for f in futuros]
+        return resultados, len(llamadas)
+
+    def test_resultado_compartido(self):
+        valor = {'total': 1}
+        resultados, llamadas = self.simultaneas(lambda: valor)
+        self.assertEqual(llamadas, 1)
+        self.assertTrue(all(r is valor for r in resultados))
+        # Terminado el cálculo la clave se libera: no es una caché
+        self.assertEqual(compartir('prueba', 'clave', lambda: 2), 2)
+
+    def test_error_compartido(self):
+        def fallar():
+            raise ValueError('sin datos')
+
+        resultados, llamadas = self.simultaneas(fallar)
+        self.assertEqual(llamadas, 1)
+        self.assertTrue(all(isinstance(r, ValueError) for r in resultados))
+
+
+@override_settings(EN_VIVO_ESPERA_MS=50, EN_VIVO_LATIDO_SEGUNDOS=0.3)
+class CalculoEnVivoTests(SimpleTestCase):
+    """El canal junta los cambios seguidos en un cálculo y descarta los que llegan tarde."""
+
+    async def test_espera_y_secuencia(self):
+        canal = Canal(1)
+        calculados = []
+
+        def recalcular(_canal, campos):
+            calculados.append(campos)
+            return {'campos': campos}
+
+        with mock.patch.object(Canal, 'recalcular', recalcular):
+            eventos = canal.eventos()
+            try:
+                self.assertEqual(await anext(eventos), 'retry: 2000\n\n')
+                canal.aplicar({'ancho_cm': '4'}, 1)
+                canal.aplicar({'ancho_cm': 5, 'alto_cm': '3'}, 3)
+                # POST anterior que llega después: su ancho ya no se aplica
+                canal.aplicar({'ancho_cm': '4.5', 'cantidad': '100'}, 2)
+                evento = await asyncio.wait_for(anext(eventos), 5)
+                self.assertTrue(evento.startswith('event: calculo\n'))
+                self.assertEqual(calculados, [{'ancho_cm': '5', 'alto_cm': '3', 'cantidad': '100'}])
+
+                # Mismos valores que el último cálculo: no se recalcula, llega el latido
+                canal.aplicar({'ancho_cm': '5'}, 4)
+                self.assertEqual(await asyncio.wait_for(anext(eventos), 5), ': latido\n\n')
+                self.assertEqual(len(calculados), 1)
+
+                canal.aplicar({'cantidad': None}, 5)
+                await asyncio.wait_for(anext(eventos), 5)
+                self.assertEqual(calculados[-1], {'ancho_cm': '5', 'alto_cm': '3'})
+            finally:
+                await eventos.aclose()
+
+    def test_cambios_invalidos(self):
+        canal = Canal(1)
+        for cambios in (['ancho_cm'], {'desconocido': '1'}, {'ancho_cm': {'valor': 1}}):
+            with self.subTest(cambios=cambios), self.assertRaises(CambioInvalido):
+                canal.aplicar(cambios, 1)
+        self.assertEqual(canal.campos, {})
@@ -6,8 +6,10 @@ app_name = 'quotations'
 urlpatterns = [
     path('', views.inicio, name='inicio'),
     path('cotizar/', views.cotizacion, name='cotizar'),
+    path('cotizar/en-vivo/<uuid:canal>/', views.calculo_en_vivo, name='calculo_en_vivo'),
     path('cotizaciones/', views.lista_cotizaciones, name='lista_cotizaciones'),
     path('editar/<int:cotizacion_id>/', views.cotizacion, name='editar_cotizacion'),
     path('eliminar/<int:cotizacion_id>/', views.eliminar_cotizacion, name='eliminar_cotizacion'),
     path('cambiar-estado/<int:cotizacion_id>/', views.cambiar_estado, name='cambiar_estado'),
+    path('cambiar-estado/', views.cambiar_estado_masivo, name='cambiar_estado_masivo'),
 ]
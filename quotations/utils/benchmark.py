@@ -0,0 +1,205 @@
+"""
+Benchmarks del motor, las vistas, la API y el PDF
+
+Cada escenario es reproducible: corre sobre una base de datos de prueba
+sembrada con datos sintéticos deterministas (business_logic/datos_sinteticos.py)
+y registra, por escenario, latencia (p50, p95, máximo), rendimiento
+(operaciones por segundo) y memoria pico (tracemalloc, en una pasada aparte
+para no alterar los tiempos).
+
+Los resultados se guardan como JSON; `comparar()` los contrasta con una base
+guardada y marca como regresión todo escenario cuya latencia p50 o memoria
+pico empeore más que la tolerancia. Lo ejecuta
+`python manage.py benchmark` (ver management/commands/benchmark.py).
+"""
+
+import math
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from interfaz_crud.models import Cliente
+from ..business_logic.bulk_quotations import crear_cotizaciones_en_lote
+from ..business_logic.datos_sinteticos import generar_entradas, sembrar
+from ..business_logic.quotation_processor import QuotationProcessor
+from ..forms.quotation_form import armar_datos_cotizacion
+from ..models import Quotation
+from ..views import COTIZACIONES_POR_PAGINA
+
+# Métricas comparadas contra la base: mayor es peor
+METRICAS_COMPARADAS = ('p50_ms', 'pico_mb')
+
+
+class Escenario:
+    """
+    Un escenario de benchmark.
+
+    `ejecutar` hace una repetición y procesa `operaciones` unidades (una
+    cotización, una página, un PDF...); la latencia se informa por repetición
+    y el rendimiento por operación.
+    """
+
+    def __init__(self, nombre: str, descripcion: str, ejecutar: Callable[[], None],
+                 repeticiones: int, operaciones: int = 1):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.ejecutar = ejecutar
+        self.repeticiones = repeticiones
+        self.operaciones = operaciones
+
+
+def preparar_datos(filas: int, clientes: int, semilla: int) -> Dict[str, int]:
+    """Siembra la base hasta tener al menos `filas` cotizaciones."""
+    faltan = filas - Quotation.objects.count()
+    if faltan <= 0:
+        return {'clientes': 0, 'cotizaciones': 0}
+    return sembrar(0 if Cliente.objects.exists() else clientes, faltan, semilla)
+
+
+def escenarios(lote: int, semilla: int) -> List[Escenario]:
+    """Escenarios disponibles, en el orden en que se ejecutan."""
+    ids = list(Cliente.objects.values_list('pk', flat=True)[:1000])
+    entrada = generar_entradas(1, ids, semilla)[0]
+    datos = armar_datos_cotizacion({**entrada, 'cliente': Cliente.objects.get(pk=entrada['cliente'])})
+    entradas_lote = generar_entradas(lote, ids, semilla + 1)
+    procesador = QuotationProcessor()
+    cliente_http = Client()
+
+    def cotizacion_individual():
+        procesador.calcular_cotizacion(datos)
+
+    def calculo_lote():
+        procesador.calcular_cotizaciones(
+            [armar_datos_cotizacion({**e, 'cliente': datos['cliente']}) for e in entradas_lote]
+        )
+
+    def guardado_lote():
+        # Se deshace al terminar para que cada repetición parta del mismo estado
+        with transaction.atomic():
+            crear_cotizaciones_en_lote(entradas_lote)
+            transaction.set_rollback(True)
+
+    def vista_calcular():
+        cliente_http.post(reverse('quotations:cotizar'), entrada, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def vista_lista():
+        cliente_http.get(reverse('quotations:lista_cotizaciones'))
+
+    # La última página cuenta y salta todas las filas (COUNT y OFFSET)
+    ultima_pagina = max(math.ceil(Quotation.objects.count() / COTIZACIONES_POR_PAGINA), 1)
+
+    def vista_lista_ultima():
+        cliente_http.get(reverse('quotations:lista_cotizaciones'), {'page': ultima_pagina})
+
+    def api_cotizaciones():
+        cliente_http.get(reverse('quotation-list'))
+
+    def api_clientes():
+        cliente_http.get(reverse('cliente-list'))
+
+    def pdf():
+        from .pdf_generator import generar_pdf_cotizacion
+
+        resultado = procesador.calcular_cotizacion(datos)
+        ruta = generar_pdf_cotizacion(resultado['dimensiones'], resultado, resultado['gramos'],
+                                      datos, resultado['costos'])
+        os.remove(ruta)
+
+    return [
+        Escenario('cotizacion_individual', 'QuotationProcessor.calcular_cotizacion', cotizacion_individual, 2000),
+        Escenario('calculo_lote', f'calcular_cotizaciones de {lote} entradas', calculo_lote, 3, lote),
+        Escenario('guardado_lote', f'crear_cotizaciones_en_lote de {lote} entradas', guardado_lote, 3, lote),
+        Escenario('vista_calcular', 'POST cotizar/ (JSON)', vista_calcular, 200),
+        Escenario('vista_lista', f'GET cotizaciones/, primera página de {COTIZACIONES_POR_PAGINA}',
+                  vista_lista, 20),
+        Escenario('vista_lista_ultima', f'GET cotizaciones/?page={ultima_pagina} (la última)',
+                  vista_lista_ultima, 5),
+        Escenario('api_cotizaciones', 'GET /api/cotizaciones/', api_cotizaciones, 3),
+        Escenario('api_clientes', 'GET /api/clientes/', api_clientes, 5),
+        Escenario('pdf', 'generar_pdf_cotizacion', pdf, 20),
+    ]
+
+
+def _percentil(tiempos: List[float], p: int) -> float:
+    if len(tiempos) == 1:
+        return tiempos[0]
+    return statistics.quantiles(tiempos, n=100, method='inclusive')[p - 1]
+
+
+def medir(escenario: Escenario) -> Dict[str, float]:
+    """Ejecuta el escenario y devuelve sus métricas."""
+    escenario.ejecutar()  # calentamiento (cachés, plantillas, YAML)
+    tiempos = []
+    for _ in range(escenario.repeticiones):
+        inicio = time.perf_counter()
+        escenario.ejecutar()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        escenario.ejecutar()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    total_s = sum(tiempos) / 1000
+    return {
+        'repeticiones': escenario.repeticiones,
+        'operaciones': escenario.operaciones * escenario.repeticiones,
+        'p50_ms': round(statistics.median(tiempos), 3),
+        'p95_ms': round(_percentil(tiempos, 95), 3),
+        'max_ms': round(max(tiempos), 3),
+        'ops_s': round(escenario.operaciones * escenario.repeticiones / total_s, 2) if total_s else None,
+        'pico_mb': round(pico / 1024 / 1024, 3),
+    }
+
+
+def entorno() -> Dict[str, str]:
+    """Datos del entorno guardados junto a los resultados."""
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base_de_datos': connection.vendor,
+        'debug': settings.DEBUG,
+        'cotizaciones': Quotation.objects.count(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def comparar(actual: Dict, base: Dict, tolerancia: float) -> List[Dict]:
+    """
+    Compara los escenarios de `actual` con los de `base`.
+
+    Returns:
+        Una fila por escenario y métrica comparados, con `regresion` True si
+        el valor actual supera al de la base en más de `tolerancia` (0.1 = 10%)
+    """
+    filas = []
+    for nombre, metricas in actual['escenarios'].items():
+        anterior: Optional[Dict] = base.get('escenarios', {}).get(nombre)
+        if not anterior:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            antes, ahora = anterior.get(metrica), metricas.get(metrica)
+            if not antes or ahora is None:
+                continue
+            cambio = (ahora - antes) / antes
+            filas.append({
+                'escenario': nombre,
+                'metrica': metrica,
+                'base': antes,
+                'actual': ahora,
+                'cambio': round(cambio, 4),
+                'regresion': cambio > tolerancia,
+            })
+    return filas
@@ -0,0 +1,159 @@
+"""
+Canal de recalculación en vivo (Server-Sent Events)
+
+La página de cotización abre un EventSource en `cotizar/en-vivo/<canal>/`
+(GET, el canal es un UUID elegido por la página) y envía a la misma URL,
+por POST JSON, solo los campos que cambiaron:
+
+    {"ancho_cm": "4.5"}        (null quita el campo)
+
+Cada POST lleva la cabecera `X-Secuencia`, un número que la página
+incrementa en cada envío. Los POST pueden llegar desordenados (el navegador
+usa varias conexiones), así que un campo solo se actualiza con un número
+mayor que el del último valor aplicado para ese campo.
+
+El servidor junta los cambios de cada canal y, cuando pasan
+EN_VIVO_ESPERA_MS sin cambios nuevos, recalcula una sola vez y envía un
+evento `calculo` con el contrato de la recalculación JSON (ver
+respuesta_calculo.py):
+
+    event: calculo
+    data: {"v": 1, "ok": true, "costos": {...}, ...}
+
+Cada escritura cuesta poco:
+  - el procesador (y su YAML) se carga una vez por canal;
+  - el layout y los gramos se reutilizan si sus campos no cambiaron (ver
+    QuotationProcessor.calcular_cotizacion con `anterior`);
+  - si los datos quedan como en el último cálculo no se envía nada.
+
+Cada EN_VIVO_LATIDO_SEGUNDOS sin cálculos se envía un comentario para que
+los proxies no cierren la conexión.
+
+Los canales viven en la memoria del proceso y usan asyncio. Requieren un
+servidor ASGI, y con varios workers, que el balanceador envíe las peticiones
+de un canal al mismo worker. Cada proceso acepta a lo sumo
+EN_VIVO_MAX_CANALES canales abiertos.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+import orjson
+from django.conf import settings
+from django.db import close_old_connections
+
+from quotation_project.asincronia import en_ejecutor
+from ..business_logic.quotation_processor import QuotationProcessor
+from ..forms.quotation_form import QuotationForm
+from .respuesta_calculo import cuerpo_calculo, cuerpo_errores
+
+_canales: Dict[str, 'Canal'] = {}
+
+
+class CambioInvalido(ValueError):
+    """El cuerpo de un POST al canal no es un objeto de campos del formulario."""
+
+
+class Canal:
+    """Campos actuales de un formulario de cotización y su último cálculo."""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.campos = {}
+        self.secuencias = {}    # campo -> número del último cambio aplicado
+        self.cambio = asyncio.Event()
+        self.ultimo_cambio = 0.0
+        self.procesador = None
+        self.anterior = None    # último resultado correcto, para reutilizar etapas
+        self.calculado = None   # campos del último evento enviado
+
+    def aplicar(self, cambios, secuencia: Optional[int] = None) -> None:
+        """
+        Aplica los campos que cambiaron (de un POST) y despierta al flujo.
+
+        Con `secuencia`, se ignoran los campos que ya tienen un cambio más
+        reciente (de un POST que llegó antes que este).
+        """
+        if not isinstance(cambios, dict):
+            raise CambioInvalido('Se esperaba un objeto JSON con los campos que cambiaron')
+        desconocidos = set(cambios) - set(QuotationForm.base_fields)
+        if desconocidos:
+            raise CambioInvalido(f"Campos desconocidos: {', '.join(sorted(desconocidos))}")
+        for campo, valor in cambios.items():
+            if valor is not None and not isinstance(valor, (str, int, float)):
+                raise CambioInvalido(f'Valor inválido para {campo}')
+        for campo, valor in cambios.items():
+            if secuencia is not None:
+                if secuencia <= self.secuencias.get(campo, -1):
+                    continue
+                self.secuencias[campo] = secuencia
+            if valor is None:
+                self.campos.pop(campo, None)
+            else:
+                self.campos[campo] = str(valor)
+        self.ultimo_cambio = time.monotonic()
+        self.cambio.set()
+
+    def recalcular(self, campos) -> Dict:
+        """Cuerpo del evento para `campos`. Valida contra la base: corre en el pool de cálculo."""
+        # Hilo fuera del ciclo de una petición: conexiones como en una petición
+        close_old_connections()
+        try:
+            if self.procesador is None:
+                self.procesador = QuotationProcessor()
+            form = QuotationForm(campos)
+            if not form.is_valid():
+                return cuerpo_errores(self.version, form)
+            datos = form.get_datos_cotizacion()
+            resultado = self.procesador.calcular_cotizacion(datos, self.anterior)
+            if resultado.get('success'):
+                self.anterior = resultado
+            return cuerpo_calculo(self.version, datos, resultado)
+        finally:
+            close_old_connections()
+
+    async def eventos(self):
+        """Texto SSE del canal: un cálculo tras cada pausa en los cambios, y latidos."""
+        espera = getattr(settings, 'EN_VIVO_ESPERA_MS', 150) / 1000
+        latido = getattr(settings, 'EN_VIVO_LATIDO_SEGUNDOS', 15)
+        yield 'retry: 2000\n\n'
+        while True:
+            try:
+                await asyncio.wait_for(self.cambio.wait(), latido)
+            except asyncio.TimeoutError:
+                yield ': latido\n\n'
+                continue
+            # Se espera a que pase `espera` desde el último cambio
+            restante = self.ultimo_cambio + espera - time.monotonic()
+            while restante > 0:
+                await asyncio.sleep(restante)
+                restante = self.ultimo_cambio + espera - time.monotonic()
+            self.cambio.clear()
+            if self.campos == self.calculado:
+                continue
+            self.calculado = dict(self.campos)
+            cuerpo = await en_ejecutor(self.recalcular, self.calculado)
+            yield f'event: calculo\ndata: {orjson.dumps(cuerpo).decode()}\n\n'
+
+
+def abrir_canal(clave: str, version: int) -> Optional[Canal]:
+    """Crea (o reemplaza, si la página se reconecta) el canal; None si no hay lugar."""
+    if clave not in _canales and len(_canales) >= getattr(settings, 'EN_VIVO_MAX_CANALES', 200):
+        return None
+    canal = _canales[clave] = Canal(version)
+    return canal
+
+
+def obtener_canal(clave: str) -> Optional[Canal]:
+    return _canales.get(clave)
+
+
+async def flujo(clave: str, canal: Canal):
+    """Eventos del canal hasta que el cliente se desconecta; entonces se cierra."""
+    try:
+        async for evento in canal.eventos():
+            yield evento
+    finally:
+        if _canales.get(clave) is canal:
+            del _canales[clave]
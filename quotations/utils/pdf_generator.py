@@ -13,6 +13,9 @@ from decimal import Decimal
 
 from django.conf import settings
 
+from quotation_project.metricas import PDF_DURACION
+from quotation_project.tiempos import etapa, medido
+
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -42,6 +45,8 @@ def _format_money(v):
         return str(v)
 
 
+@PDF_DURACION.time()
+@medido('pdf.generar')
 def generar_pdf_cotizacion(dimensiones, resultado, gramos, datos, costos):
     """Genera un PDF con los datos de la cotización.
 
@@ -205,6 +210,7 @@ def generar_pdf_cotizacion(dimensiones, resultado, gramos, datos, costos):
     story.append(footer)
 
     # Build PDF
-    doc.build(story)
+    with etapa('pdf.build'):
+        doc.build(story)
 
     return filename
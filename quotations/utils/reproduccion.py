@@ -0,0 +1,277 @@
+"""
+Reproducción de peticiones grabadas contra un servidor
+
+Lee peticiones en el formato de quotation_project/grabacion.py (o las
+genera con `peticiones_sinteticas()`) y las envía concurrentemente a un
+servidor en marcha, a una tasa fija, a la velocidad en que se grabaron o sin
+límite. `resumir()` agrupa los resultados por etiqueta: peticiones, errores
+(código >= 400 o fallo de conexión), latencia p50/p95/p99 y rendimiento.
+
+Cada hilo tiene su propia sesión (cookies). Antes del primer POST de
+formulario pide la página con GET para obtener la cookie `csrftoken` y la
+envía como `csrfmiddlewaretoken` y en X-CSRFToken, igual que el navegador.
+Las redirecciones no se siguen: el 302 tras guardar cuenta como respuesta.
+
+Con --tasa o --velocidad la latencia se mide desde el instante en que la
+petición debía salir, no desde que un hilo la toma: si el servidor se
+atrasa y las peticiones esperan en la cola del reproductor, esa espera
+cuenta (omisión coordinada) y además se informa aparte como `cola`. Sin
+límite de tasa no hay horario: se mide desde el envío.
+
+Solo usa la biblioteca estándar; lo ejecuta `python manage.py reproducir`.
+"""
+
+import json
+import random
+import statistics
+import threading
+import time
+from http.client import HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from typing import Dict, Iterable, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from quotation_project.grabacion import etiqueta
+from ..business_logic.datos_sinteticos import generar_entradas
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def leer_grabacion(ruta: str) -> List[Dict]:
+    """Peticiones de una grabación en el orden en que llegaron."""
+    with open(ruta, encoding='utf-8') as archivo:
+        peticiones = [json.loads(linea) for linea in archivo if linea.strip()]
+    # Cada línea se escribe al terminar la respuesta: se ordena por llegada
+    return sorted(peticiones, key=lambda p: p.get('t', 0))
+
+
+def _peticion(metodo, ruta, vista, tipo=None, cuerpo=None, cabeceras=None):
+    cabeceras = cabeceras or {}
+    return {'t': 0, 'metodo': metodo, 'ruta': ruta, 'query': '', 'tipo': tipo, 'cuerpo': cuerpo,
+            'cabeceras': cabeceras, 'etiqueta': etiqueta(metodo, vista, cuerpo, cabeceras)}
+
+
+def peticiones_sinteticas(cantidad: int, clientes_ids: List[int], semilla: int = 0,
+                          guardados: bool = True) -> List[Dict]:
+    """
+    Mezcla de tráfico típico: recálculos en vivo, cálculos, guardados y PDF
+    de cotizar/, la lista de cotizaciones y las listas de la API.
+
+    Con `guardados=False` la mezcla no escribe en la base de datos.
+    """
+    azar = random.Random(semilla)
+    entradas = iter(generar_entradas(cantidad, clientes_ids, semilla))
+    mezcla = {
+        'calcular_json': 50, 'calcular': 10, 'guardar': 8, 'generar_pdf': 2,
+        'lista': 15, 'api_cotizaciones': 10, 'api_clientes': 5,
+    }
+    if not guardados:
+        del mezcla['guardar']
+    lecturas = {
+        'lista': ('/cotizaciones/', 'quotations:lista_cotizaciones'),
+        'api_cotizaciones': ('/api/cotizaciones/', 'quotation-list'),
+        'api_clientes': ('/api/clientes/', 'cliente-list'),
+    }
+    peticiones = []
+    for tipo in azar.choices(list(mezcla), weights=list(mezcla.values()), k=cantidad):
+        if tipo in lecturas:
+            peticiones.append(_peticion('GET', *lecturas[tipo]))
+            continue
+        cuerpo = {campo: [str(valor)] for campo, valor in next(entradas).items()}
+        cabeceras = {}
+        if tipo == 'calcular_json':
+            cabeceras['X-Requested-With'] = 'XMLHttpRequest'
+        elif tipo in ('guardar', 'generar_pdf'):
+            cuerpo[tipo] = ['']
+        peticiones.append(_peticion('POST', '/cotizar/', 'quotations:cotizar', 'form', cuerpo, cabeceras))
+    return peticiones
+
+
+def remapear_clientes(peticiones: Iterable[Dict], clientes_ids: List[int]) -> None:
+    """Reemplaza los ids de cliente grabados por ids existentes en la base local."""
+    def nuevo(valor):
+        try:
+            return clientes_ids[int(valor) % len(clientes_ids)]
+        except (TypeError, ValueError):
+            return valor
+
+    def recorrer(cuerpo, es_form):
+        if isinstance(cuerpo, list):
+            for elemento in cuerpo:
+                recorrer(elemento, es_form)
+        elif isinstance(cuerpo, dict) and 'cliente' in cuerpo:
+            if es_form:
+                cuerpo['cliente'] = [str(nuevo(v)) for v in cuerpo['cliente']]
+            else:
+                cuerpo['cliente'] = nuevo(cuerpo['cliente'])
+
+    for peticion in peticiones:
+        recorrer(peticion.get('cuerpo'), peticion.get('tipo') == 'form')
+
+
+class _SinRedirecciones(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Reproductor:
+    """Envía peticiones a `base_url` con hasta `concurrencia` hilos."""
+
+    def __init__(self, base_url: str, concurrencia: int = 8, timeout: float = 30):
+        self.base_url = base_url.rstrip('/')
+        self.concurrencia = concurrencia
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _sesion(self):
+        if not hasattr(self._local, 'cookies'):
+            self._local.cookies = CookieJar()
+            self._local.abridor = build_opener(HTTPCookieProcessor(self._local.cookies), _SinRedirecciones)
+        return self._local
+
+    def _abrir(self, request):
+        """(código, bytes leídos) de la respuesta; los 3xx y 4xx/5xx también."""
+        try:
+            with self._sesion().abridor.open(request, timeout=self.timeout) as respuesta:
+                return respuesta.status, len(respuesta.read())
+        except HTTPError as e:
+            return e.code, len(e.read() or b'')
+
+    def _token_csrf(self, ruta):
+        sesion = self._sesion()
+        for intento in (ruta, '/cotizar/'):
+            token = next((c.value for c in sesion.cookies if c.name == 'csrftoken'), None)
+            if token:
+                return token
+            self._abrir(Request(self.base_url + intento))
+        return next((c.value for c in sesion.cookies if c.name == 'csrftoken'), '')
+
+    def _preparar(self, peticion):
+        metodo = peticion['metodo']
+        url = self.base_url + peticion['ruta']
+        if peticion.get('query'):
+            url += '?' + peticion['query']
+        cabeceras = dict(peticion.get('cabeceras') or {})
+        datos = None
+        if metodo not in METODOS_SEGUROS:
+            token = self._token_csrf(peticion['ruta'])
+            cabeceras['X-CSRFToken'] = token
+            cabeceras['Referer'] = url
+            if peticion.get('tipo') == 'form':
+                cuerpo = {**(peticion.get('cuerpo') or {}), 'csrfmiddlewaretoken': [token]}
+                datos = urlencode(cuerpo, doseq=True).encode()
+                cabeceras['Content-Type'] = 'application/x-www-form-urlencoded'
+            elif peticion.get('tipo') == 'json':
+                datos = json.dumps(peticion.get('cuerpo')).encode()
+                cabeceras['Content-Type'] = 'application/json'
+        return Request(url, data=datos, headers=cabeceras, method=metodo)
+
+    def _enviar(self, peticion, programada=None):
+        """`programada`: instante (perf_counter) en que debía salir, o None sin horario."""
+        codigo, error, ms, cola_ms = None, None, None, None
+        tomada = time.perf_counter()
+        if programada is not None:
+            cola_ms = max(tomada - programada, 0) * 1000
+        try:
+            # Fuera de la medición: puede pedir antes la página para el token CSRF
+            request = self._preparar(peticion)
+            inicio = time.perf_counter()
+            try:
+                codigo, _ = self._abrir(request)
+            finally:
+                ms = (time.perf_counter() - inicio) * 1000 + (cola_ms or 0)
+        except (URLError, OSError) as e:
+            error = str(e)
+        except HTTPException as e:
+            # IncompleteRead, BadStatusLine...: respuesta cortada o inválida
+            error = f'{type(e).__name__}: {str(e)!r}'
+        return {'etiqueta': peticion['etiqueta'], 'ms': ms, 'cola_ms': cola_ms, 'estado': codigo, 'error': error}
+
+    def reproducir(self, peticiones: List[Dict], tasa: float = 0,
+                   velocidad: Optional[float] = None) -> Dict:
+        """
+        Envía las peticiones en orden.
+
+        Args:
+            tasa: Peticiones por segundo (0 = sin límite)
+            velocidad: Si se indica, respeta los tiempos grabados (`t`)
+                       multiplicados por este factor (2 = el doble de rápido)
+
+        Con `tasa` o `velocidad` la latencia de cada resultado (`ms`) incluye
+        la espera en la cola del reproductor desde su hora programada (`cola_ms`).
+
+        Returns:
+            {'segundos': duración total, 'resultados': [...]}
+        """
+        t0 = peticiones[0].get('t', 0) if peticiones else 0
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as ejecutor:
+            futuros = []
+            for indice, peticion in enumerate(peticiones):
+                if velocidad:
+                    programada = (peticion.get('t', 0) - t0) / velocidad
+                elif tasa:
+                    programada = indice / tasa
+                else:
+                    programada = 0
+                espera = inicio + programada - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                horario = inicio + programada if velocidad or tasa else None
+                futuros.append(ejecutor.submit(self._enviar, peticion, horario))
+            resultados = [f.result() for f in futuros]
+        return {'segundos': time.perf_counter() - inicio, 'resultados': resultados}
+
+
+def _percentiles(tiempos):
+    if len(tiempos) == 1:
+        return {p: tiempos[0] for p in (50, 95, 99)}
+    cortes = statistics.quantiles(tiempos, n=100, method='inclusive')
+    return {50: cortes[49], 95: cortes[94], 99: cortes[98]}
+
+
+def _fila(resultados, segundos):
+    # Solo las que tuvieron respuesta: un fallo de conexión no mide latencia
+    tiempos = [r['ms'] for r in resultados if r['estado'] is not None]
+    errores = sum(1 for r in resultados if r['estado'] is None or r['estado'] >= 400)
+    percentiles = _percentiles(tiempos) if tiempos else dict.fromkeys((50, 95, 99))
+    colas = [r['cola_ms'] for r in resultados if r.get('cola_ms') is not None]
+    return {
+        'peticiones': len(resultados),
+        'errores': errores,
+        'tasa_error': round(errores / len(resultados), 4),
+        'p50_ms': _redondear(percentiles[50]),
+        'p95_ms': _redondear(percentiles[95]),
+        'p99_ms': _redondear(percentiles[99]),
+        'max_ms': _redondear(max(tiempos, default=None)),
+        'cola_p95_ms': _redondear(_percentiles(colas)[95]) if colas else None,
+        'cola_max_ms': _redondear(max(colas, default=None)),
+        'por_segundo': round(len(resultados) / segundos, 2) if segundos else None,
+    }
+
+
+def _redondear(ms):
+    return None if ms is None else round(ms, 2)
+
+
+def columnas_latencia(fila) -> str:
+    """Columnas p50, p95 y p99 de una fila de `resumir()` ('-' sin respuestas)."""
+    return ' '.join(f"{fila[c]:>9.1f}" if fila[c] is not None else f"{'-':>9}"
+                    for c in ('p50_ms', 'p95_ms', 'p99_ms'))
+
+
+def resumir(reproduccion: Dict) -> Dict:
+    """Métricas por etiqueta y totales de una reproducción."""
+    resultados, segundos = reproduccion['resultados'], reproduccion['segundos']
+    por_etiqueta = {}
+    for resultado in resultados:
+        por_etiqueta.setdefault(resultado['etiqueta'], []).append(resultado)
+    return {
+        'segundos': round(segundos, 3),
+        'total': _fila(resultados, segundos) if resultados else None,
+        'etiquetas': {nombre: _fila(grupo, segundos) for nombre, grupo in sorted(por_etiqueta.items())},
+        'errores_conexion': sorted({r['error'] for r in resultados if r['error']}),
+    }
@@ -0,0 +1,110 @@
+"""
+Respuesta JSON del cálculo de cotizaciones
+
+Contrato de la recalculación en vivo (`cotizar/` con X-Requested-With:
+XMLHttpRequest). Solo lleva valores calculados; el cliente va por id y los
+datos de entrada no se devuelven. Cada versión del esquema es una función
+registrada en ESQUEMAS; el front end elige una con la cabecera
+`X-Version-Esquema` o el parámetro `v` (por defecto, la más reciente) y la
+respuesta la indica en `v`. Los eventos del cálculo en vivo (ver
+calculo_en_vivo.py) usan el mismo contrato. Un cambio incompatible agrega una versión nueva en lugar de
+modificar una existente.
+
+Versión 1:
+    {"v": 1, "ok": true, "cliente": 12, "cantidad": 1000,
+     "dimensiones": {"largo_total": 46, "alto_total": 36, "area_total": 1697},
+     "gramos": {"total": 362.03, "por_cm2": 0.21},
+     "costo_por_gramo": 29,
+     "costos": {"costo_total": 1248.88, "precio_utilidad_28": 1734.56, ...}}
+
+    Errores: {"v": 1, "ok": false, "tipo": "validation_error",
+              "error": "...", "errores": {"campo": ["mensaje", ...]}}
+
+Se serializa con orjson, bastante más rápido que el codificador de Django.
+"""
+
+import orjson
+from django.http import HttpResponse
+
+
+def _esquema_v1(datos, resultado):
+    if not resultado.get('success'):
+        return {'v': 1, 'ok': False, 'tipo': resultado.get('error_type'),
+                'error': resultado.get('error')}
+    dimensiones = resultado['dimensiones']
+    gramos = resultado['gramos']
+    return {
+        'v': 1,
+        'ok': True,
+        'cliente': datos['cliente'].pk,
+        'cantidad': datos['cantidad'],
+        'dimensiones': {
+            'largo_total': dimensiones['largo_total'],
+            'alto_total': dimensiones['alto_total'],
+            'area_total': dimensiones['area_total'],
+        },
+        'gramos': {'total': gramos['gramos_total'], 'por_cm2': gramos['gramos_por_cm2']},
+        'costo_por_gramo': resultado['costo_por_gramo'],
+        'costos': resultado['costos'],
+    }
+
+
+def _errores_v1(errores):
+    return {'v': 1, 'ok': False, 'tipo': 'validation_error',
+            'error': 'Datos de la cotización inválidos',
+            'errores': {campo: [e['message'] for e in lista] for campo, lista in errores.items()}}
+
+
+# versión -> (cálculo correcto o fallido, errores del formulario)
+ESQUEMAS = {
+    1: (_esquema_v1, _errores_v1),
+}
+VERSION_ACTUAL = max(ESQUEMAS)
+
+
+class RespuestaJSON(HttpResponse):
+    """HttpResponse con el cuerpo serializado por orjson."""
+
+    def __init__(self, datos, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(orjson.dumps(datos), **kwargs)
+
+
+def version_pedida(request):
+    """Versión del esquema pedida por el front end, o None si no existe."""
+    # EventSource no envía cabeceras propias: el cálculo en vivo usa ?v=
+    valor = request.headers.get('X-Version-Esquema') or request.GET.get('v')
+    if not valor:
+        return VERSION_ACTUAL
+    try:
+        version = int(valor)
+    except ValueError:
+        return None
+    return version if version in ESQUEMAS else None
+
+
+def cuerpo_calculo(version, datos, resultado):
+    """Resultado de QuotationProcessor como dict del esquema `version`."""
+    return ESQUEMAS[version][0](datos, resultado)
+
+
+def cuerpo_errores(version, form):
+    """Errores de validación del formulario como dict del esquema `version`."""
+    return ESQUEMAS[version][1](form.errors.get_json_data())
+
+
+def respuesta_calculo(version, datos, resultado):
+    """Resultado de QuotationProcessor en el esquema `version`."""
+    cuerpo = cuerpo_calculo(version, datos, resultado)
+    return RespuestaJSON(cuerpo, status=200 if cuerpo['ok'] else 422)
+
+
+def respuesta_errores(version, form):
+    """Errores de validación del formulario en el esquema `version`."""
+    return RespuestaJSON(cuerpo_errores(version, form), status=400)
+
+
+def respuesta_version_invalida():
+    return RespuestaJSON({'ok': False, 'tipo': 'version_error',
+                          'error': f'Versiones de esquema disponibles: {sorted(ESQUEMAS)}'},
+                         status=406)
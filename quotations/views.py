@@ -1,68 +1,160 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse, FileResponse
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_http_methods
 import os
+import orjson
 from django.contrib import messages
-from django.db.models import Q
-from datetime import datetime, timedelta
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from datetime import date, datetime, timedelta
 from django.utils import timezone
 from .forms.quotation_form import QuotationForm
 from .business_logic.quotation_processor import QuotationProcessor
-from .models import Quotation
+from .business_logic.contadores import obtener_estadisticas
+from .business_logic.estados import cambiar_estados
+from .business_logic.revisiones import guardar_con_revision
+from .business_logic.archivo import requiere_archivo
+from .business_logic.eliminacion import eliminar_cotizaciones
+from .models import CotizacionArchivada, Quotation
+from .utils.calculo_en_vivo import CambioInvalido, abrir_canal, flujo, obtener_canal
+from .utils.respuesta_calculo import (
+    RespuestaJSON, respuesta_calculo, respuesta_errores, respuesta_version_invalida, version_pedida
+)
+from quotation_project.asincronia import en_ejecutor
+from quotation_project.coalescencia import compartir, huella
+from quotation_project.replicas import lectura_en_replica
+from quotation_project.tiempos import etapa
 from Filterss.quotation_filter_form import QuotationFilterForm # Importamos desde la nueva ubicación
 
 # Create your views here.
 
+# render() en el hilo de la petición: las plantillas pueden consultar la base
+arender = sync_to_async(render)
+
+# Filas por página de la lista: la página completa se renderiza en memoria
+COTIZACIONES_POR_PAGINA = 50
+
+# Totales que el motor agrega a los datos de entrada (ver Quotation.campos_desde_resultado)
+CAMPOS_DERIVADOS = ('material', 'total_material', 'total_armado', 'otros_materiales_total')
+
+
+def calcular_compartido(datos):
+    """
+    Calcula la cotización; las peticiones simultáneas con los mismos datos
+    comparten un único cálculo (ver quotation_project/coalescencia.py).
+    """
+    resultado = compartir('calculo', huella(datos), lambda: QuotationProcessor().calcular_cotizacion(datos))
+    entrada = resultado.get('datos_entrada')
+    if entrada is not None and entrada is not datos:
+        # Cálculo de otra petición: se copian los totales a los datos propios
+        datos.update({campo: entrada[campo] for campo in CAMPOS_DERIVADOS})
+        resultado = {**resultado, 'datos_entrada': datos}
+    return resultado
+
+
+def generar_pdf_compartido(datos, resultado):
+    """Ruta del PDF de la cotización; los PDF idénticos simultáneos se generan una vez."""
+    from .utils.pdf_generator import generar_pdf_cotizacion
+
+    return compartir(
+        'pdf', huella(datos),
+        lambda: generar_pdf_cotizacion(resultado['dimensiones'], resultado, resultado['gramos'],
+                                       datos, resultado['costos']),
+        valido=os.path.exists,
+    )
+
 
 def inicio(request):
     """Vista de inicio/home con plantilla HTML"""
-    return render(request, 'interfaz_crud/inicio.html')
+    return render(request, 'interfaz_crud/inicio.html', obtener_estadisticas())
 
 
-def lista_cotizaciones(request):
-    """Vista de lista de cotizaciones con filtros"""
-    cotizaciones = Quotation.objects.select_related('cliente').all()
-    
-    # Filtro por búsqueda de cliente
+@lectura_en_replica
+async def lista_cotizaciones(request):
+    """
+    Vista de lista de cotizaciones con filtros (asíncrona).
+
+    Las cotizaciones archivadas solo se consultan cuando el filtro de fecha cae
+    antes de la fecha de corte del archivo (ver business_logic/archivo.py).
+    """
     buscar = request.GET.get('buscar', '')
-    if buscar:
-        cotizaciones = cotizaciones.filter(
-            Q(cliente__nombre__icontains=buscar) |
-            Q(cliente__correo__icontains=buscar)
-        )
-    
-    # Filtro por estado
     estado = request.GET.get('estado', '')
-    if estado:
-        cotizaciones = cotizaciones.filter(estado=estado)
-    
-    # Filtro por fecha de creación
     fecha_creacion = request.GET.get('fecha_creacion', '')
-    if fecha_creacion:
-        cotizaciones = cotizaciones.filter(fecha_creacion__date=fecha_creacion)
-    
-    cotizaciones = cotizaciones.order_by('-fecha_creacion')
-    
+    try:
+        fecha = date.fromisoformat(fecha_creacion) if fecha_creacion else None
+    except ValueError:
+        fecha = None
+
+    def filtrar(cotizaciones):
+        # Filtro por búsqueda de cliente
+        if buscar:
+            cotizaciones = cotizaciones.filter(
+                Q(cliente__nombre__icontains=buscar) |
+                Q(cliente__correo__icontains=buscar)
+            )
+        # Filtro por estado
+        if estado:
+            cotizaciones = cotizaciones.filter(estado=estado)
+        # Filtro por fecha de creación
+        if fecha:
+            cotizaciones = cotizaciones.filter(fecha_creacion__date=fecha)
+        return cotizaciones.order_by('-fecha_creacion')
+
+    # Solo las columnas que muestra la tabla (todas en `quotation`, sin el detalle)
+    cotizaciones = filtrar(
+        Quotation.objects.select_related('cliente').only(*Quotation.CAMPOS_LISTA)
+    )
+
+    if fecha and await sync_to_async(requiere_archivo)(fecha):
+        archivadas = filtrar(
+            CotizacionArchivada.objects.select_related('cliente').only(*Quotation.CAMPOS_LISTA)
+        )
+        cotizaciones = sorted([c async for c in cotizaciones] + [c async for c in archivadas],
+                              key=lambda c: c.fecha_creacion, reverse=True)
+        paginador = Paginator(cotizaciones, COTIZACIONES_POR_PAGINA)
+    else:
+        paginador = Paginator(cotizaciones, COTIZACIONES_POR_PAGINA)
+        # El conteo y la página con el ORM asíncrono; el Paginator no los vuelve a pedir
+        paginador.count = await cotizaciones.acount()
+
+    pagina = paginador.get_page(request.GET.get('page'))
+    if isinstance(pagina.object_list, QuerySet):
+        pagina.object_list = [c async for c in pagina.object_list]
+    # Filtros actuales para los enlaces de paginación
+    filtros = request.GET.copy()
+    filtros.pop('page', None)
+
     context = {
-        'cotizaciones': cotizaciones,
+        'cotizaciones': pagina,
+        'page_obj': pagina,
+        'filtros': filtros.urlencode(),
         'buscar': buscar,
         'estado': estado,
         'fecha_creacion': fecha_creacion,
     }
-    return render(request, 'paginas/lista_cotizaciones.html', context)
+    with etapa('vista.lista.render'):
+        return await arender(request, 'paginas/lista_cotizaciones.html', context)
 
 
-def cotizacion(request, cotizacion_id=None):
+async def cotizacion(request, cotizacion_id=None):
     """
     Vista principal de cotización con diseño mejorado.
     Maneja el formulario, procesa los cálculos y opcionalmente guarda en BD.
     Si recibe cotizacion_id, edita la cotización existente.
+
+    Es asíncrona: el cálculo y el PDF se hacen en el pool de cálculo (ver
+    quotation_project/asincronia.py) y el resto en el hilo de la petición.
     """
     resultado = None
     cotizacion_existente = None
     
     # Si hay ID, estamos editando
     if cotizacion_id:
-        cotizacion_existente = get_object_or_404(Quotation, id=cotizacion_id)
+        cotizacion_existente = await aget_object_or_404(Quotation.objects.select_related('detalle', 'cliente'), id=cotizacion_id)
         form = QuotationForm(initial={
             'cliente': cotizacion_existente.cliente,
             'ancho_cm': cotizacion_existente.ancho_cm,
@@ -92,14 +184,30 @@ def cotizacion(request, cotizacion_id=None):
 
     if request.method == 'POST':
         form = QuotationForm(request.POST)
+        # Recalculación parcial: solo el panel de resultados (cabecera HX-Request)
+        parcial = request.headers.get('HX-Request') == 'true'
+        ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        if ajax:
+            # Contrato JSON versionado (ver utils/respuesta_calculo.py)
+            version = version_pedida(request)
+            if version is None:
+                return respuesta_version_invalida()
 
-        if form.is_valid():
+        with etapa('vista.cotizar.validar'):
+            # El campo cliente consulta la base al validar
+            valido = await sync_to_async(form.is_valid)()
+        if not valido:
+            if ajax:
+                return respuesta_errores(version, form)
+            if parcial:
+                return await arender(request, 'paginas/_panel_resultado.html', {'resultado': None}, status=422)
+        else:
             # Obtener datos del formulario
             datos = form.get_datos_cotizacion()
 
             # Procesar cotización
-            processor = QuotationProcessor()
-            resultado = processor.calcular_cotizacion(datos)
+            with etapa('vista.cotizar.calcular'):
+                resultado = await en_ejecutor(calcular_compartido, datos)
 
             # (La generación/descarga del PDF se realiza más abajo, luego de
             # intentar guardar la cotización si se solicitó.)
@@ -107,15 +215,14 @@ def cotizacion(request, cotizacion_id=None):
             # Verificar si se presionó el botón "Generar PDF"
             if 'generar_pdf' in request.POST and resultado.get('success'):
                 try:
-                    dimensiones = resultado['dimensiones']
-                    gramos = resultado['gramos']
-                    costos = resultado['costos']
-                    datos['usuario'] = request.user
-                    from .utils.pdf_generator import generar_pdf_cotizacion
-                    pdf_path = generar_pdf_cotizacion(dimensiones, resultado, gramos, datos, costos)
+                    datos['usuario'] = await request.auser()
+                    pdf_path = await en_ejecutor(generar_pdf_compartido, datos, resultado)
                     if os.path.exists(pdf_path):
-                        f = open(pdf_path, 'rb')
-                        return FileResponse(f, as_attachment=True, filename=os.path.basename(pdf_path))
+                        # Los PDF son pequeños: se envían enteros en lugar de en streaming
+                        contenido = await en_ejecutor(_leer_archivo, pdf_path)
+                        return HttpResponse(contenido, content_type='application/pdf', headers={
+                            'Content-Disposition': content_disposition_header(True, os.path.basename(pdf_path)),
+                        })
                     else:
                         messages.warning(request, '⚠️ PDF generado pero no se encontró el archivo para descargar.')
                 except Exception as e:
@@ -124,75 +231,32 @@ def cotizacion(request, cotizacion_id=None):
             # Verificar si se presionó el botón "Guardar"
             if 'guardar' in request.POST and resultado.get('success'):
                 try:
-                    # Extraer resultados calculados
-                    dimensiones = resultado['dimensiones']
-                    gramos = resultado['gramos']
-                    costos = resultado['costos']
-                    armado_data = datos.get('armado', {})
-                    otros_data = datos.get('otros_materiales', {})
-
                     # Datos comunes para crear o actualizar
-                    datos_cotizacion = {
-                        'cliente': datos['cliente'],
-                        'ancho_cm': datos['ancho_cm'],
-                        'alto_cm': datos['alto_cm'],
-                        'espacio_entre_cm': datos['espacio_entre_cm'],
-                        'cantidad_horizontal': datos['cantidad_horizontal'],
-                        'cantidad_vertical': datos['cantidad_vertical'],
-                        'cantidad': datos['cantidad'],
-                        'valor_por_troquelada': datos['valor_por_troquelada'],
-                        'montaje': datos['montaje'],
-                        'medida': datos['medida'],
-                        'espesor': datos.get('espesor', '2_mm'),
-                        'bolsa_individual': armado_data.get('bolsa_individual', 0),
-                        'sellada': armado_data.get('sellada', 0),
-                        'cortada': armado_data.get('cortada', 0),
-                        'empaque_final': armado_data.get('empaque_final', 0),
-                        'llenada_gel': armado_data.get('llenada_gel', 0),
-                        'pin_soporte': armado_data.get('pin_soporte', 0),
-                        'samblasted': armado_data.get('samblasted', 0),
-                        'mo_rubber': otros_data.get('mo_rubber', 0),
-                        'numero_plotter': otros_data.get('numero_plotter', 0),
-                        'perforada': otros_data.get('perforada', 0),
-                        'guillotina': otros_data.get('guillotina', 0),
-                        'largo_total_cm': dimensiones['largo_total'],
-                        'alto_total_cm': dimensiones['alto_total'],
-                        'area_total_cm2': dimensiones['area_total'],
-                        'gramos_total': gramos['gramos_total'],
-                        'gramos_por_cm2': gramos['gramos_por_cm2'],
-                        'costo_por_gramo': resultado['costo_por_gramo'],
-                        'material': costos['material'],
-                        'total_material': costos['total_material'],
-                        'total_armado': costos['total_armado'],
-                        'otros_materiales_total': costos['otros_materiales_total'],
-                        'cif_8': costos['cif_8'],
-                        'cif_10': costos['cif_10'],
-                        'cif_15': costos['cif_15'],
-                        'admon': costos['admon'],
-                        'costo_total': costos['costo_total'],
-                        'precio_utilidad_45': costos['precio_utilidad_45'],
-                        'precio_utilidad_28': costos['precio_utilidad_28'],
-                        'precio_utilidad_17': costos['precio_utilidad_17'],
-                        'precio_utilidad_11': costos['precio_utilidad_11']
-                    }
+                    datos_cotizacion = Quotation.campos_desde_resultado(datos, resultado)
 
                     # Actualizar o crear cotización
                     if cotizacion_existente:
-                        for key, value in datos_cotizacion.items():
-                            setattr(cotizacion_existente, key, value)
-                        cotizacion_existente.save()
+                        # Solo se escriben las columnas que cambiaron y se
+                        # registra la revisión (ver business_logic/revisiones.py)
+                        with etapa('vista.cotizar.guardar'):
+                            await sync_to_async(guardar_con_revision)(cotizacion_existente, datos_cotizacion)
                         messages.success(request, f'✅ Cotización actualizada exitosamente para {datos["cliente"].nombre}')
                         return redirect('quotations:lista_cotizaciones')
                     else:
-                        cotizacion = Quotation.objects.create(**datos_cotizacion)
+                        with etapa('vista.cotizar.guardar'):
+                            await sync_to_async(_crear_cotizacion)(datos_cotizacion)
                         messages.success(request, f'✅ Cotización guardada exitosamente para {datos["cliente"].nombre}')
                     
                 except Exception as e:
                     messages.error(request, f'❌ Error al guardar la cotización: {str(e)}')
 
-            # Si se pidió JSON response (para AJAX)
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse(resultado)
+            # Si se pidió JSON response (para AJAX): solo los valores calculados
+            if ajax:
+                with etapa('vista.cotizar.json'):
+                    return respuesta_calculo(version, datos, resultado)
+            if parcial:
+                with etapa('vista.cotizar.render'):
+                    return await arender(request, 'paginas/_panel_resultado.html', {'resultado': resultado})
             # NOTA: La generación y descarga del PDF solo debe ejecutarse cuando el usuario
             # guarde o cree explícitamente la cotización (esto se maneja en la rama de
             # 'guardar' más arriba). Para solicitudes que solo son de cálculo (por ejemplo,
@@ -204,10 +268,62 @@ def cotizacion(request, cotizacion_id=None):
     context = {
         'form': form,
         'resultado': resultado,
-        'editando': cotizacion_existente is not None
+        'editando': cotizacion_existente is not None,
+        # Los precios se actualizan al escribir solo con un servidor ASGI
+        'en_vivo': isinstance(request, ASGIRequest),
     }
 
-    return render(request, 'paginas/cotizaciones.html', context)
+    with etapa('vista.cotizar.render'):
+        return await arender(request, 'paginas/cotizaciones.html', context)
+
+
+@require_http_methods(['GET', 'POST'])
+async def calculo_en_vivo(request, canal):
+    """
+    Canal de recalculación en vivo (ver utils/calculo_en_vivo.py).
+
+    GET abre el flujo de eventos (text/event-stream); POST envía en JSON los
+    campos del formulario que cambiaron, numerados con X-Secuencia.
+    """
+    if not isinstance(request, ASGIRequest):
+        return RespuestaJSON({'ok': False, 'error': 'El cálculo en vivo requiere un servidor ASGI'},
+                             status=501)
+    clave = str(canal)
+
+    if request.method == 'GET':
+        version = version_pedida(request)
+        if version is None:
+            return respuesta_version_invalida()
+        abierto = abrir_canal(clave, version)
+        if abierto is None:
+            return RespuestaJSON({'ok': False, 'error': 'Demasiados canales abiertos'}, status=503)
+        respuesta = StreamingHttpResponse(flujo(clave, abierto), content_type='text/event-stream')
+        respuesta['Cache-Control'] = 'no-cache'
+        # nginx no debe acumular los eventos
+        respuesta['X-Accel-Buffering'] = 'no'
+        return respuesta
+
+    abierto = obtener_canal(clave)
+    if abierto is None:
+        raise Http404('Canal no encontrado')
+    secuencia = request.headers.get('X-Secuencia')
+    if secuencia is not None and not secuencia.isdigit():
+        return RespuestaJSON({'ok': False, 'error': 'X-Secuencia debe ser un entero'}, status=400)
+    try:
+        abierto.aplicar(orjson.loads(request.body), int(secuencia) if secuencia else None)
+    except (orjson.JSONDecodeError, CambioInvalido) as e:
+        return RespuestaJSON({'ok': False, 'error': str(e)}, status=400)
+    return HttpResponse(status=202)
+
+
+def _crear_cotizacion(datos_cotizacion):
+    with transaction.atomic():
+        return Quotation.objects.create(**datos_cotizacion)
+
+
+def _leer_archivo(ruta):
+    with open(ruta, 'rb') as archivo:
+        return archivo.read()
 
 
 def eliminar_cotizacion(request, cotizacion_id):
@@ -216,7 +332,8 @@ def eliminar_cotizacion(request, cotizacion_id):
     
     if request.method == 'POST':
         cliente_nombre = cotizacion.cliente.nombre
-        cotizacion.delete()
+        # Borrado lógico; la fila se purga después (ver business_logic/eliminacion.py)
+        eliminar_cotizaciones([cotizacion.id])
         messages.success(request, f'✅ Cotización eliminada exitosamente para {cliente_nombre}')
         return redirect('quotations:lista_cotizaciones')
     
@@ -228,20 +345,38 @@ def eliminar_cotizacion(request, cotizacion_id):
 
 def cambiar_estado(request, cotizacion_id):
     """Vista para cambiar el estado de una cotización entre Pendiente, Enviada y Aprobada"""
-    cotizacion = get_object_or_404(Quotation, id=cotizacion_id)
-    
     if request.method == 'POST':
         # Cambiar el estado en ciclo: pendiente -> enviada -> aprobada -> pendiente
-        if cotizacion.estado == 'pendiente':
-            cotizacion.estado = 'enviada'
-            messages.success(request, f'✅ Cotización marcada como Enviada para {cotizacion.cliente.nombre}')
-        elif cotizacion.estado == 'enviada':
-            cotizacion.estado = 'aprobada'
-            messages.success(request, f'✅ Cotización marcada como Aprobada para {cotizacion.cliente.nombre}')
+        # (UPDATE de una sola columna, ver business_logic/estados.py)
+        fila, = cambiar_estados([cotizacion_id])
+        if fila['resultado'] == 'no_encontrada':
+            raise Http404('Cotización no encontrada')
+        nombre_estado = dict(Quotation.ESTADO_CHOICES)[fila['estado_nuevo']]
+        messages.success(request, f'✅ Cotización marcada como {nombre_estado} para {fila["nombre_cliente"]}')
+    
+    return redirect('quotations:lista_cotizaciones')
+
+
+def cambiar_estado_masivo(request):
+    """
+    Vista para cambiar el estado de varias cotizaciones seleccionadas en la lista.
+
+    Recibe los ids marcados (`ids`) y opcionalmente el estado destino
+    (`estado`); sin estado, cada cotización avanza en el ciclo.
+    """
+    if request.method == 'POST':
+        ids = [i for i in request.POST.getlist('ids') if i.isdigit()]
+        estado_destino = request.POST.get('estado') or None
+        if not ids:
+            messages.warning(request, '⚠️ Seleccione al menos una cotización.')
+        elif estado_destino and estado_destino not in dict(Quotation.ESTADO_CHOICES):
+            messages.error(request, '❌ Estado no válido.')
         else:
-            cotizacion.estado = 'pendiente'
-            messages.success(request, f'✅ Cotización marcada como Pendiente para {cotizacion.cliente.nombre}')
-        
-        cotizacion.save()
+            filas = cambiar_estados(ids, estado_destino)
+            actualizadas = sum(1 for f in filas if f['resultado'] == 'actualizada')
+            omitidas = len(filas) - actualizadas
+            messages.success(request, f'✅ {actualizadas} cotizaciones actualizadas')
+            if omitidas:
+                messages.warning(request, f'⚠️ {omitidas} cotizaciones omitidas (no estaban en el estado previo o no existen)')
     
     return redirect('quotations:lista_cotizaciones')